@@ -0,0 +1,773 @@
+#!/usr/bin/env python
+
+"""
+Hardware-free benchmarks for the display drivers.
+
+Each benchmark drives a display object over a SimulatedI2C bus, which
+models an MCP2221's timing, so no hardware is needed. Run them all, or name the ones you want:
+
+    python3 benchmarks.py
+    python3 benchmarks.py alloc
+"""
+
+# IMPORTS
+import sys
+import math
+import time
+import random
+import tracemalloc
+from ssd1306_circuitpython import SSD1306OLED
+from htk1633segment_circuitpython import HT16K33Segment, HT16K33SegmentChain
+from i2c_transfer import TransferPlanner
+from render_worker import RenderWorker
+from mcp2221_sim import SimulatedI2C, SimulatedPin
+from ssd1306_emulator import SSD1306Emulator
+from ssd1306_widgets import StripChart, Screen, Label, ValueField
+from frame_pacer import FramePacer
+
+# CONSTANTS
+FRAMES = 200
+
+
+# FUNCTIONS
+def legacy_clear(display):
+    # The driver's original clear(): a new buffer every call
+    return bytearray(display.width * int(display.height / 8))
+
+
+def legacy_render(display):
+    # The driver's original render(): a new transmit buffer plus a bytes copy
+    buffer = bytearray(len(display.buffer) + 1)
+    buffer[0] = display.SSD1306_WRITETOBUFFER
+    buffer[1:] = display.buffer
+    display.i2c.writeto(display.address, bytes(buffer))
+
+
+def legacy_text(display, print_string):
+    # The driver's original text(): bit-by-bit, through flip() and coords_to_index()
+    x = display.x
+    y = display.y
+    for i in range(0, len(print_string)):
+        asc = ord(print_string[i]) - 32
+        glyph = display.CHARSET[asc]
+        for j in range(0, len(glyph) + 1):
+            if j == len(glyph) and x < 128:
+                c = 0x00
+            else:
+                c = display.flip(glyph[j])
+            z = -1
+            for k in range(0, 8):
+                if ((y + k) % 8) == 0 and k != 0:
+                    z = 0
+                else:
+                    z += 1
+                b = display.coords_to_index(x , y + k)
+                v = display.buffer[b]
+                if c & (1 << z) != 0: v = v | (1 << z)
+                display.buffer[b] = v
+            x += 1
+            if x > 127:
+                if y + 8 < display.height:
+                    x = 0
+                    y += 8
+                else:
+                    break
+
+
+def legacy_rect(display, x, y, width, height, fill=False):
+    # The driver's original rect(): plot() every pixel, outlines twice
+    if x < 0: x = 0
+    if x + width > display.width: width = display.width - x
+    if y < 0: y = 0
+    if y + height > display.height: height = display.height - y
+    for i in range(y, y + height):
+        for j in range(x, x + width):
+            display.plot(j, i)
+            if fill is False and x < j < x + width - 1 and y < i < y + height - 1:
+                display.plot(j, i, 0)
+
+
+def legacy_line(display, x, y, tox, toy, thick=1, color=1):
+    # The driver's original line(): float slope, x-only walk, plot() per pixel
+    if thick < 1: thick = 1
+    if x > tox:
+        a = x
+        x = tox
+        tox = a
+    m = float(toy - y) / float(tox - x)
+    for j in range(0, thick):
+        for i in range(x, tox):
+            dy = y + int(m * (i - x)) + j
+            if i >= 0 and i < display.width and dy >= 0 and dy < display.height:
+                display.plot(i, dy, color)
+
+
+# The driver's original trig tables, at two-degree steps
+LEGACY_SIN = [math.cos(math.radians(i * 2)) for i in range(0, 180)]
+LEGACY_COS = [math.sin(math.radians(i * 2)) for i in range(0, 180)]
+
+
+def legacy_circle(display, x, y, radius, color=1, fill=False):
+    # The driver's original circle(): 180 sampled points, filled pixel by pixel
+    for i in range(0, 180):
+        a = x - int(radius * LEGACY_SIN[i])
+        b = y - int(radius * LEGACY_COS[i])
+        if a >= 0 and a < display.width and b >= 0 and b < display.height:
+            display.plot(a, b, color)
+            if fill is True:
+                if a > x:
+                    j = x
+                    while True:
+                        display.plot(j, b, color)
+                        j += 1
+                        if j >= a: break
+                else:
+                    j = a + 1
+                    while True:
+                        display.plot(j, b, color)
+                        j += 1
+                        if j > x: break
+
+
+def reference_circle(x, y, radius):
+    # Textbook midpoint circle, plotting all eight octants point by point
+    points = set()
+    dx = radius
+    dy = 0
+    err = 1 - radius
+    while dy <= dx:
+        for (a, b) in ((dx, dy), (dy, dx)):
+            for (sa, sb) in ((1, 1), (1, -1), (-1, 1), (-1, -1)): points.add((x + sa * a, y + sb * b))
+        dy += 1
+        if err < 0:
+            err += 2 * dy + 1
+        else:
+            dx -= 1
+            err += 2 * (dy - dx) + 1
+    return points
+
+
+def lit_pixels(display):
+    # The set of pixels set in the display buffer
+    return set((x, y) for y in range(0, display.height) for x in range(0, display.width)
+               if display.buffer[(y >> 3) * display.width + x] & (1 << (y & 7)))
+
+
+def legacy_update(display):
+    # HT16K33Segment.update() as it was: all 16 bytes, every time
+    buffer = bytearray(17)
+    buffer[0] = 0
+    buffer[1:] = display.buffer
+    display.i2c.writeto(display.address, bytes(buffer))
+
+
+def legacy_init(bus, address=0x3D, width=128, height=64):
+    # The driver's original start-up writes: one transaction per command, then a full frame
+    commands = ((0xAE,), (0xD5, 0x80), (0xA8, height - 1), (0xD3, 0x00), (0x40,), (0x8D, 0x14),
+                (0x20, 0x00), (0xA1,), (0xC8,), (0xDA, 0x12), (0x81, 0x8F), (0xD9, 0xF1), (0xDB, 0x40),
+                (0xA4,), (0xA6,), (0xAF,), (0x21, 0x00, width - 1), (0x22, 0x00, height // 8 - 1))
+    for command in commands: bus.writeto(address, bytes((0x00,) + command))
+    bus.writeto(address, bytes(width * height // 8 + 1))
+
+
+def dashboard(display):
+    # A static screen, much like macinfo_128x64.py's labels
+    display.rect(0, 0, 128, 8, True)
+    display.rect(0, 12, 60, 20)
+    display.rect(64, 12, 60, 20, True)
+    display.plot(127, 63)
+
+
+def measure(label, frame, bus):
+    # Run 'frame' FRAMES times, reporting the time and I2C traffic per frame, how long
+    # the traffic would take through an MCP2221, and the largest amount of memory
+    # allocated within any one frame. The time is the best of several passes
+    elapsed = None
+    for attempt in range(0, 5):
+        bus.reset()
+        start_time = time.perf_counter()
+        for i in range(0, FRAMES): frame()
+        taken = time.perf_counter() - start_time
+        if elapsed is None or taken < elapsed: elapsed = taken
+    traffic = "{} bytes in {} transactions, {:.1f} ms on the bus".format(bus.bytes // FRAMES, bus.transactions // FRAMES, bus.elapsed / FRAMES * 1000)
+
+    peak = 0
+    tracemalloc.start()
+    for i in range(0, FRAMES):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame()
+        used = tracemalloc.get_traced_memory()[1] - base
+        if used > peak: peak = used
+    tracemalloc.stop()
+    print("  {:<28} {:8.1f} us/frame  {:6d} B allocated/frame  {}".format(label, elapsed / FRAMES * 1e6, peak, traffic))
+    return (elapsed / FRAMES * 1e6, peak)
+
+
+def bench_alloc():
+    """
+    clear() + redraw + draw() of an unchanging screen: original path vs double buffering
+    """
+    bus = SimulatedI2C(record=False)
+    display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64)
+
+    def legacy_frame():
+        legacy_clear(display)
+        dashboard(display)
+        legacy_render(display)
+
+    def single_frame():
+        display.clear()
+        dashboard(display)
+        display.draw()
+
+    def blank_frame():
+        display.clear()
+        display.draw()
+
+    print("Allocation: clear() + draw() of an unchanging 128x64 screen")
+    (original, original_peak) = measure("original clear/render", legacy_frame, bus)
+    (in_place, in_place_peak) = measure("in-place, partial windows", single_frame, bus)
+    (alone, alone_peak) = measure("  clear() + draw() alone", blank_frame, bus)
+    display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64, double_buffer=True)
+    (double, double_peak) = measure("double-buffered", single_frame, bus)
+    (double_alone, double_alone_peak) = measure("  clear() + draw() alone", blank_frame, bus)
+    print("  In place, a frame takes {:.2f}x the original's time and allocates {} B where it allocated {} B;".format(
+        in_place / original, in_place_peak, original_peak))
+    print("  double-buffered, {:.2f}x and {} B. clear() + draw() alone account for {} B and {} B: the".format(
+        double / original, double_peak, alone_peak, double_alone_peak))
+    print("  rest is the drawing's, as part-byte runs, eg. the top and bottom edges of an outline")
+    print("  rect(), are combined through int.from_bytes()")
+
+
+def bench_chunks():
+    """
+    Full-frame writes through a simulated MCP2221 at various maximum transaction sizes
+    """
+    print("Transfer planning: full 128x64 frames over a simulated MCP2221")
+    for failure_rate in (0.0, 0.02):
+        print("  HID report failure rate {:.0%}".format(failure_rate))
+        for limit in (False, None, 32, 60, 120, 256, 512):
+            random.seed(1)
+            bus = SimulatedI2C(record=False)
+            i2c = bus if limit is False else TransferPlanner(bus, limit, retries=5)
+            display = SSD1306OLED(SimulatedPin(), i2c, 0x3D, 128, 64)
+            bus.failure_rate = failure_rate
+            bus.reset()
+            frames = 50
+            lost = 0
+            for i in range(0, frames):
+                display.mark_dirty()
+                try:
+                    display.draw()
+                except RuntimeError:
+                    # Without a planner, one failed write loses the rest of the frame
+                    lost += 1
+            label = "plain bus" if limit is False else "planner, " + ("no limit" if limit is None else "{} B max".format(limit))
+            print("    {:<22} {:6.1f} ms/frame  {:5.1f} KB/s  {:3d} transactions/frame  {} frames lost".format(
+                label, bus.elapsed / frames * 1000, frames * 1024 / bus.elapsed / 1024, bus.transactions // frames, lost))
+
+
+def bench_text():
+    """
+    A full screen of text: the original bit-by-bit text() vs the glyph-table fast paths
+    """
+    display = SSD1306OLED(SimulatedPin(), SimulatedI2C(record=False), 0x3D, 128, 64)
+    lines = ["Line {}: quick brown fox".format(i) for i in range(0, 8)]
+
+    def legacy_screen():
+        for i in range(0, 8):
+            display.move(0, i * 8)
+            legacy_text(display, lines[i])
+
+    def aligned_screen():
+        for i in range(0, 8):
+            display.move(0, i * 8).text(lines[i])
+
+    def unaligned_screen():
+        for i in range(0, 7):
+            display.move(0, i * 8 + 3).text(lines[i])
+
+    # Check the fast path draws exactly what the original did
+    display.clear()
+    legacy_screen()
+    expected = bytes(display.buffer)
+    display.clear()
+    aligned_screen()
+    print("Text: 8 lines of {} characters on a 128x64 screen (output {})".format(
+        len(lines[0]), "identical" if bytes(display.buffer) == expected else "DIFFERS"))
+
+    def uncached_screen():
+        display.text_cache.clear()
+        aligned_screen()
+
+    results = []
+    runs = (("original text()", legacy_screen),
+            ("byte-aligned, uncached", uncached_screen),
+            ("byte-aligned", aligned_screen),
+            ("unaligned (y % 8 == 3)", unaligned_screen))
+    for (label, screen) in runs:
+        start_time = time.perf_counter()
+        for i in range(0, FRAMES):
+            display.clear()
+            screen()
+        elapsed = (time.perf_counter() - start_time) / FRAMES
+        results.append(elapsed)
+        print("  {:<28} {:8.1f} us/screen  {:5.1f}x".format(label, elapsed * 1e6, results[0] / elapsed))
+    print("  Text cache: {} hits, {} misses".format(display.text_cache_hits, display.text_cache_misses))
+
+
+def bench_rect():
+    """
+    Rectangles: the original per-pixel rect() vs page-span drawing
+    """
+    display = SSD1306OLED(SimulatedPin(), SimulatedI2C(record=False), 0x3D, 128, 64)
+
+    # A boxes_128x64.py-style workload: random, often part off-screen, rectangles
+    random.seed(1)
+    boxes = [(random.randint(-10, 137), random.randint(-10, 53), random.randint(10, 80), random.randint(10, 50), random.random() > 0.5) for i in range(0, 50)]
+
+    def legacy_boxes():
+        for box in boxes: legacy_rect(display, *box)
+
+    def span_boxes():
+        for box in boxes: display.rect(*box)
+
+    # Check the span drawing matches the original pixel for pixel
+    display.clear()
+    legacy_boxes()
+    expected = bytes(display.buffer)
+    display.clear()
+    span_boxes()
+    print("Rectangles (output {})".format("identical" if bytes(display.buffer) == expected else "DIFFERS"))
+
+    runs = (("50 random boxes", legacy_boxes, span_boxes),
+            ("full-screen fill", lambda: legacy_rect(display, 0, 0, 128, 64, True), lambda: display.fill_rect(0, 0, 128, 64)),
+            ("full-screen outline", lambda: legacy_rect(display, 0, 0, 128, 64), lambda: display.rect(0, 0, 128, 64)))
+    for (label, legacy, fast) in runs:
+        timings = []
+        for draw in (legacy, fast):
+            count = 10 if draw is legacy else FRAMES
+            start_time = time.perf_counter()
+            for i in range(0, count): draw()
+            timings.append((time.perf_counter() - start_time) / count)
+        print("  {:<22} original {:9.1f} us  spans {:7.1f} us  {:6.1f}x".format(label, timings[0] * 1e6, timings[1] * 1e6, timings[0] / timings[1]))
+
+
+def bench_line():
+    """
+    Lines: the original float line() vs integer Bresenham with span runs, and polyline() for charts
+    """
+    display = SSD1306OLED(SimulatedPin(), SimulatedI2C(record=False), 0x3D, 128, 64)
+
+    # A chart: 127 connected segments across the screen, and random lines,
+    # some running off the screen (none vertical, which the original can't draw)
+    random.seed(1)
+    points = [random.randint(0, 63) for i in range(0, 128)]
+    chart = [(i, points[i], i + 1, points[i + 1]) for i in range(0, 127)]
+    lines = []
+    while len(lines) < 100:
+        line = (random.randint(-40, 167), random.randint(-20, 83), random.randint(-40, 167), random.randint(-20, 83))
+        if line[0] != line[2]: lines.append(line)
+
+    print("Lines (the original draws fewer pixels: it skips end points and leaves gaps in steep lines)")
+    def each(draw, segments, thick):
+        # Draw the segments one at a time
+        return lambda: [draw(*segment, thick) for segment in segments]
+
+    original = lambda *args: legacy_line(display, *args)
+    polyline = [(i, points[i]) for i in range(0, 128)]
+    runs = (("chart, 127 line() calls", each(original, chart, 1), each(display.line, chart, 1)),
+            ("chart, one polyline()", each(original, chart, 1), lambda: display.polyline(polyline)),
+            ("100 random lines", each(original, lines, 1), each(display.line, lines, 1)),
+            ("100 random lines, 3px", each(original, lines, 3), each(display.line, lines, 3)))
+    for (label, old, new) in runs:
+        # Best of several runs, taken in turn: the times are short enough to be upset by other work
+        timings = [None, None]
+        for i in range(0, 20):
+            for (index, draw) in enumerate((old, new)):
+                start_time = time.perf_counter()
+                draw()
+                elapsed = time.perf_counter() - start_time
+                if timings[index] is None or elapsed < timings[index]: timings[index] = elapsed
+        print("  {:<24} original {:8.1f} us  Bresenham {:8.1f} us  {:5.1f}x".format(label, timings[0] * 1e6, timings[1] * 1e6, timings[0] / timings[1]))
+
+
+def bench_circle():
+    """
+    Circles: the original sampled circle() vs the midpoint rasteriser
+    """
+    display = SSD1306OLED(SimulatedPin(), SimulatedI2C(record=False), 0x3D, 128, 64)
+
+    # Count every bit the drawing writes, to show each pixel is written once
+    writes = [0]
+    span = display.span
+    def counting_span(page, x, count, mask, color):
+        writes[0] += bin(mask).count("1") * count
+        span(page, x, count, mask, color)
+    display.span = counting_span
+
+    exact = True
+    once = True
+    for radius in range(0, 32):
+        for fill in (False, True):
+            display.clear()
+            writes[0] = 0
+            display.circle(64, 32, radius, 1, fill)
+            lit = lit_pixels(display)
+            if fill is False and lit != reference_circle(64, 32, radius): exact = False
+            if writes[0] != len(lit): once = False
+    for x_radius in range(0, 64, 3):
+        for y_radius in range(0, 32, 3):
+            display.clear()
+            writes[0] = 0
+            display.ellipse(64, 32, x_radius, y_radius)
+            if writes[0] != len(lit_pixels(display)): once = False
+    display.span = span
+    print("Circles (outlines match textbook midpoint: {}; each pixel written once: {})".format(
+        "yes" if exact else "NO", "yes" if once else "NO"))
+
+    runs = (("radius 8 outline", 8, False), ("radius 30 outline", 30, False),
+            ("radius 8 filled", 8, True), ("radius 30 filled", 30, True))
+    for (label, radius, fill) in runs:
+        timings = []
+        for draw in (lambda: legacy_circle(display, 64, 32, radius, 1, fill), lambda: display.circle(64, 32, radius, 1, fill)):
+            count = 20
+            start_time = time.perf_counter()
+            for i in range(0, count): draw()
+            timings.append((time.perf_counter() - start_time) / count)
+        print("  {:<22} original {:8.1f} us  midpoint {:7.1f} us  {:5.1f}x".format(label, timings[0] * 1e6, timings[1] * 1e6, timings[0] / timings[1]))
+
+
+def bench_startup():
+    """
+    Display start-up: one transaction per command vs the batched command stream
+    """
+    print("Start-up of a 128x64 display over a simulated MCP2221 (bus time only; both also pause 11ms for RST)")
+    for label in ("original, command by command", "batched command stream"):
+        bus = SimulatedI2C(record=False)
+        if label.startswith("original"):
+            legacy_init(bus)
+        else:
+            SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64)
+        print("  {:<30} {:6.1f} ms  {:2d} transactions  {:5d} bytes".format(label, bus.elapsed * 1000, bus.transactions, bus.bytes))
+
+    # Runtime commands: a frame which also inverts the display
+    print("  A changed frame plus set_inverse():")
+    for deferred in (False, True):
+        bus = SimulatedI2C(record=False)
+        display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64)
+        display.defer_commands = deferred
+        bus.reset()
+        display.set_inverse()
+        display.move(0, 0).text("Hello")
+        display.draw()
+        print("    {:<28} {:6.1f} ms  {:2d} transactions".format("deferred commands" if deferred else "immediate commands", bus.elapsed * 1000, bus.transactions))
+
+
+def bench_worker():
+    """
+    A sampling loop like macinfo_128x64.py's: drawing inline vs through a RenderWorker
+    """
+    frames = 40
+    sample_time = 0.02
+    print("{} frames, each sampling for {:.0f}ms then redrawing half a 128x64 screen, over a real-time simulated MCP2221".format(frames, sample_time * 1000))
+    for threaded in (False, True):
+        bus = SimulatedI2C(realtime=True, record=False)
+        display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64)
+        worker = RenderWorker(display).start() if threaded is True else None
+        blocked = 0.0
+        start_time = time.perf_counter()
+        for i in range(0, frames):
+            # Stand-in for psutil sampling
+            time.sleep(sample_time)
+            display.fill_rect(0, 0, 128, 32, 0)
+            display.move(0, (i % 4) * 8).text("Frame {}".format(i))
+            display.rect(i, 16, 40, 16, True)
+            draw_start = time.perf_counter()
+            display.draw()
+            blocked += time.perf_counter() - draw_start
+        if worker is not None: worker.stop()
+        elapsed = time.perf_counter() - start_time
+        label = "background worker" if threaded is True else "inline draw()"
+        print("  {:<20} {:7.1f} ms/frame  {:7.2f} ms blocked in draw()".format(label, elapsed / frames * 1000, blocked / frames * 1000), end="")
+        if worker is not None: print("  sent {}  coalesced {}  dropped {}".format(worker.sent, worker.coalesced, worker.dropped), end="")
+        print()
+
+
+def bench_redundant():
+    """
+    Bytes sent which did not change the panel, for example-like workloads, checked
+    pixel-for-pixel against the driver's buffer on an emulated panel
+    """
+    def boxes(display, i):
+        display.rect(random.randint(-10, 137), random.randint(-10, 53), random.randint(10, 80), random.randint(10, 50), i % 2 == 0)
+
+    def readout(display, i):
+        # Fixed labels, redrawn every frame, with a changing value beside each
+        display.clear()
+        for row in range(0, 8):
+            display.move(1, row * 8).text("Value {}:".format(row))
+            display.move(64, row * 8).text(str((i * (row + 1)) % 997))
+
+    def terminal(display, i):
+        display.print_line("Line {}: quick brown fox".format(i))
+
+    print("Redundant bytes: 60 frames on an emulated 128x64 panel")
+    for (name, workload) in (("boxes_128x64-like", boxes), ("macinfo-like readout", readout), ("print_line() terminal", terminal)):
+        for double_buffer in (False, True):
+            random.seed(1)
+            bus = SimulatedI2C(record=False)
+            panel = SSD1306Emulator(128, 64)
+            bus.attach(0x3D, panel)
+            display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64, double_buffer=double_buffer)
+            panel.reset_counters()
+            exact = True
+            for i in range(0, 60):
+                workload(display, i)
+                if workload is not terminal: display.draw()
+                if not panel.matches(display): exact = False
+            label = "{}, {}".format(name, "double-buffered" if double_buffer is True else "single")
+            print("  {:<40} {:6d} data bytes  {:5.1f}% redundant  panel matches buffer: {}".format(
+                label, panel.data_bytes, 100 * panel.redundant_bytes / max(1, panel.data_bytes), "yes" if exact else "NO"))
+
+
+def bench_segment():
+    """
+    HT16K33Segment updates: the whole of display RAM every time vs only what changed
+    """
+    def countup(display, count):
+        bcd = int(str(count), 16)
+        display.set_number((bcd & 0xF000) >> 12, 0)
+        display.set_number((bcd & 0x0F00) >> 8, 1)
+        display.set_number((bcd & 0xF0) >> 4, 2)
+        display.set_number((bcd & 0x0F), 3)
+
+    def cpu(display, count):
+        # A reading which mostly holds steady between samples
+        percent = 20 + (count // 7) % 5
+        display.set_number(percent // 10, 2)
+        display.set_number(percent % 10, 3)
+
+    print("Seven-segment LED: 2000 updates over a simulated MCP2221")
+    for (name, workload) in (("countup.py-like", countup), ("cpu.py-like", cpu)):
+        for diffed in (False, True):
+            bus = SimulatedI2C(record=False)
+            display = HT16K33Segment(bus)
+            bus.reset()
+            start_time = time.perf_counter()
+            for count in range(0, 2000):
+                workload(display, count)
+                if diffed is True:
+                    display.update()
+                else:
+                    legacy_update(display)
+            elapsed = time.perf_counter() - start_time
+            label = "{}, {}".format(name, "changes only" if diffed is True else "original")
+            print("  {:<30} {:5d} transactions  {:6d} bytes  {:7.1f} ms on the bus  {:5.1f} us/update".format(
+                label, bus.transactions, bus.bytes, bus.elapsed * 1000, elapsed / 2000 * 1e6))
+
+    # The Python side of each update: encoding the number into the buffer
+    # Best of five runs, as each takes only a few milliseconds
+    display = HT16K33Segment(SimulatedI2C(record=False))
+    bcd_time = value_time = math.inf
+    for run in range(0, 5):
+        start_time = time.perf_counter()
+        for count in range(0, 10000): countup(display, count)
+        bcd_time = min(bcd_time, time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        for count in range(0, 10000): display.set_value(count, pad="0")
+        value_time = min(value_time, time.perf_counter() - start_time)
+    print("  Encoding 0-9999: BCD and set_number() {:.2f} us/value, set_value() {:.2f} us/value ({:.1f}x)".format(
+        bcd_time / 10000 * 1e6, value_time / 10000 * 1e6, bcd_time / value_time))
+
+
+def bench_chain():
+    """
+    Eight HT16K33 modules as one 32-digit counter: every module, every time vs HT16K33SegmentChain
+    """
+    addresses = range(0x70, 0x78)
+    print("Eight-module LED chain: 1000 counter updates and a brightness fade over a simulated MCP2221")
+    for chained in (False, True):
+        bus = SimulatedI2C(record=False)
+        chain = HT16K33SegmentChain(bus, addresses)
+        bus.reset()
+        for count in range(0, 1000):
+            chain.set_value(12345678000 + count)
+            if chained is True:
+                chain.update()
+            else:
+                for module in chain.modules: legacy_update(module)
+        updates = (bus.transactions, bus.elapsed)
+        bus.reset()
+        # Set every module's brightness each step, as a fade loop would
+        for step in range(0, 200):
+            level = 15 - (step // 20)
+            if chained is True:
+                chain.set_brightness(level)
+            else:
+                for module in chain.modules: module.set_brightness(level)
+        label = "chain" if chained is True else "original"
+        print("  {:<10} updates: {:5d} transactions {:8.1f} ms on the bus  brightness: {:5d} transactions {:7.1f} ms".format(
+            label, updates[0], updates[1] * 1000, bus.transactions, bus.elapsed * 1000))
+
+
+def bench_marquee():
+    """
+    Scrolling text on HT16K33Segment: a set_char() loop vs a compiled marquee
+    """
+    text = "0123456789abcdef-"
+    steps = 2000
+
+    def hand_loop(display):
+        # Re-encode four characters at every step
+        for step in range(0, steps):
+            for digit in range(0, 4):
+                display.set_char(text[(step + digit) % len(text)], digit)
+            display.update()
+
+    def compiled(display):
+        frames = display.compile_marquee(text, 0)
+        display.start_marquee(frames, 1.0, None)
+        now = display.marquee_deadline
+        for step in range(0, steps):
+            display.step_marquee(now)
+            now += 1.0
+
+    print("Marquee: {} scroll steps over a simulated MCP2221".format(steps))
+    for (name, run) in (("set_char() loop", hand_loop), ("compiled marquee", compiled)):
+        bus = SimulatedI2C(record=False)
+        display = HT16K33Segment(bus)
+        bus.reset()
+        start_time = time.perf_counter()
+        run(display)
+        elapsed = time.perf_counter() - start_time
+        print("  {:<20} {:5d} transactions  {:6d} bytes  {:7.1f} ms on the bus  {:5.1f} us/step".format(
+            name, bus.transactions, bus.bytes, bus.elapsed * 1000, elapsed / steps * 1e6))
+
+
+def bench_strip():
+    """
+    A live 100x40 chart: replotting it with polyline() vs a scrolling and a sweeping StripChart
+    """
+    random.seed(1)
+    readings = [random.uniform(0, 100) for i in range(0, 300)]
+
+    def replot(display, chart, history, value):
+        # Clear the chart and draw the whole trace again
+        history.append(value)
+        del history[0]
+        display.fill_rect(10, 16, 100, 40, 0)
+        display.polyline([(10 + i, 55 - int(history[i] / 100 * 39 + 0.5)) for i in range(0, 100)])
+
+    def push(display, chart, history, value):
+        chart.push(value)
+
+    print("Strip chart, 100x40 pixels: 300 readings over a simulated MCP2221")
+    for (name, update, sweep) in (("polyline() replot", replot, False), ("StripChart, scroll", push, False),
+                                  ("StripChart, sweep", push, True)):
+        bus = SimulatedI2C(record=False)
+        display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64)
+        chart = StripChart(display, 10, 16, 100, 40, sweep=sweep)
+        history = [0] * 100
+        bus.reset()
+        drawing = 0.0
+        for value in readings:
+            start_time = time.perf_counter()
+            update(display, chart, history, value)
+            drawing += time.perf_counter() - start_time
+            display.draw()
+        print("  {:<20} {:7.1f} us drawing  {:6.1f} bytes  {:6.2f} ms on the bus per reading".format(
+            name, drawing / len(readings) * 1e6, bus.bytes / len(readings), bus.elapsed / len(readings) * 1000))
+
+
+def bench_widgets():
+    """
+    A macinfo-style dashboard: clearing and redrawing everything each frame vs a widget Screen
+    """
+    labels = ((1, 8, "CPU:"), (1, 16, "Mem:"), (58, 16, "Swap:"), (1, 24, "Disk:"), (1, 40, "Pkts in:"), (1, 48, "Pkts out:"))
+    fields = ((30, 8, 26), (24, 16, 34), (90, 16, 38), (58, 24, 70), (58, 40, 70), (58, 48, 70))
+
+    def readings(frame):
+        # CPU wanders, memory and swap change now and then, disk never, packets climb
+        return ("{}%".format(20 + frame % 7), "{:.1f}%".format(40 + (frame // 10) * 0.1), "0.0%",
+                "61.2%", str(frame * 13), str(frame * 5))
+
+    def redraw(display, screen, widgets, frame):
+        display.clear()
+        for (x, y, text) in labels: display.move(x, y).text(text)
+        for (field, text) in zip(fields, readings(frame)): display.move(field[0], field[1]).text(text)
+        display.draw()
+
+    def retained(display, screen, widgets, frame):
+        for (widget, text) in zip(widgets, readings(frame)): widget.set_text(text)
+        screen.draw()
+
+    print("Dashboard: 200 frames over a simulated MCP2221")
+    for (name, update) in (("clear and redraw", redraw), ("widget Screen", retained)):
+        bus = SimulatedI2C(record=False)
+        display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64)
+        screen = Screen(display)
+        for (x, y, text) in labels: screen.add(Label(display, x, y, text))
+        widgets = [screen.add(ValueField(display, x, y, width)) for (x, y, width) in fields]
+        bus.reset()
+        start_time = time.perf_counter()
+        for frame in range(0, 200): update(display, screen, widgets, frame)
+        elapsed = time.perf_counter() - start_time
+        print("  {:<18} {:7.1f} us/frame  {:7.1f} bytes/frame  {:6.2f} ms on the bus per frame".format(
+            name, elapsed / 200 * 1e6, bus.bytes / 200, bus.elapsed / 200 * 1000))
+
+
+def bench_pacing():
+    """
+    countup.py at 100 fps on a real-time simulated MCP2221: time.sleep(DELAY) vs FramePacer
+    """
+    delay = 0.01
+    frames = 100
+    print("Frame pacing: {} frames at a {:.0f} ms interval, each updating the LED over a simulated MCP2221 in real time".format(
+        frames, delay * 1000))
+    for paced in (False, True):
+        display = HT16K33Segment(SimulatedI2C(realtime=True, record=False))
+        pacer = FramePacer(delay)
+        start_time = time.monotonic()
+        for count in range(0, frames):
+            display.set_value(count, pad="0")
+            display.update()
+            if paced is True:
+                pacer.wait()
+            else:
+                time.sleep(delay)
+        elapsed = time.monotonic() - start_time
+        label = "FramePacer" if paced is True else "time.sleep(DELAY)"
+        print("  {:<18} {:6.1f} fps  {:+6.1f} ms drift after {} frames".format(
+            label, frames / elapsed, (elapsed - frames * delay) * 1000, frames))
+        if paced is True: print("  " + pacer.report())
+
+
+BENCHMARKS = {
+    "alloc": bench_alloc,
+    "chunks": bench_chunks,
+    "rect": bench_rect,
+    "line": bench_line,
+    "circle": bench_circle,
+    "startup": bench_startup,
+    "text": bench_text,
+    "worker": bench_worker,
+    "redundant": bench_redundant,
+    "segment": bench_segment,
+    "chain": bench_chain,
+    "marquee": bench_marquee,
+    "strip": bench_strip,
+    "widgets": bench_widgets,
+    "pacing": bench_pacing
+}
+
+# START
+if __name__ == '__main__':
+    names = sys.argv[1:] if len(sys.argv) > 1 else list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print("Unknown benchmark '{}'. Choose from: {}".format(name, ", ".join(BENCHMARKS)))
+            sys.exit(1)
+        BENCHMARKS[name]()
+        print()
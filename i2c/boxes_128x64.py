@@ -1,13 +1,13 @@
 #!/usr/bin/env python
 
 # IMPORTS
-import time
 import board
 import busio
 import digitalio
 from ssd1306_circuitpython import SSD1306OLED
 from random import seed
 from random import randint
+from frame_pacer import FramePacer
 
 # CONSTANTS
 DELAY = 0.5
@@ -31,6 +31,8 @@ if __name__ == '__main__':
     # Set up the OLED display
     display = SSD1306OLED(reset, i2c, 0x3D, 128, 64)
 
+    pacer = FramePacer(DELAY)
+
     # Draw boxes in a loop
     while True:
         r = randint(0, 100)
@@ -44,4 +46,4 @@ if __name__ == '__main__':
             display.rect(rect[0], rect[1], rect[2], rect[3], is_full)
 
         display.draw()
-        time.sleep(DELAY)
\ No newline at end of file
+        pacer.wait()
\ No newline at end of file
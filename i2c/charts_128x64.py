@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+# IMPORTS
+import board
+import busio
+import digitalio
+from ssd1306_circuitpython import SSD1306OLED
+from ssd1306_widgets import StripChart
+from metrics_sampler import MetricsSampler, psutil_metrics
+from frame_pacer import FramePacer
+
+# CONSTANTS
+DELAY = 0.5
+# The packet rate at the top of its chart, in packets per second
+MAX_PACKETS = 1000
+
+# START
+if __name__ == '__main__':
+    # Set up I2C on the MCP2221 Breakout
+    i2c = busio.I2C(board.SCL, board.SDA)
+
+    # Set up the RST pin
+    reset = digitalio.DigitalInOut(board.G0)
+    reset.direction = digitalio.Direction.OUTPUT
+
+    display = SSD1306OLED(reset, i2c, 0x3D, 128, 64)
+
+    # Read CPU utilization and the network counters in the background
+    (metrics, static) = psutil_metrics(cpu=DELAY, network=DELAY)
+    sampler = MetricsSampler({"cpu": metrics["cpu"], "network": metrics["network"]}).start()
+
+    # Two charts, one above the other, each with its label to the left
+    display.move(0, 8).text("CPU")
+    display.move(0, 40).text("Pkts")
+    cpu_chart = StripChart(display, 32, 0, 96, 32, maximum=100, fill=True)
+    packet_chart = StripChart(display, 32, 32, 96, 32, maximum=MAX_PACKETS)
+
+    last = sampler.snapshot()["network"]
+
+    pacer = FramePacer(DELAY)
+
+    while True:
+        # A figure which has yet to be read is left off its chart
+        values = sampler.snapshot()
+        if values["cpu"] is not None: cpu_chart.push(values["cpu"])
+
+        data = values["network"]
+        if data is not None:
+            if last is not None:
+                packets = (data.packets_recv + data.packets_sent) - (last.packets_recv + last.packets_sent)
+                packet_chart.push(packets / DELAY)
+            last = data
+
+        # Each chart sends only its own area
+        display.draw()
+
+        # Wait for the next frame
+        pacer.wait()
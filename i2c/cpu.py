@@ -1,11 +1,11 @@
 #!/usr/bin/env python
 
 # IMPORTS
-import time
 import board
 import busio
-import psutil
 from htk1633segment_circuitpython import HT16K33Segment
+from metrics_sampler import MetricsSampler, psutil_metrics
+from frame_pacer import FramePacer
 
 # CONSTANTS
 DELAY = 0.5
@@ -18,17 +18,20 @@ if __name__ == '__main__':
     display = HT16K33Segment(i2c)
     display.set_brightness(2)
 
+    # Read the CPU utilization in the background
+    (metrics, static) = psutil_metrics(cpu=DELAY)
+    sampler = MetricsSampler({"cpu": metrics["cpu"]}).start()
+
+    pacer = FramePacer(DELAY)
+
     while True:
-        # Get the CPU utilization and calculate
-        # the Binary-Coded Decimal (BCD) form
-        cpu = int(psutil.cpu_percent())
-        bcd = int(str(cpu), 16)
+        # Get the latest CPU utilization, once there is one
+        cpu = sampler.snapshot()["cpu"]
 
         # Display the percentage as decimal digits
-        display.set_number((bcd & 0x0F00) >> 8, 1)
-        display.set_number((bcd & 0xF0) >> 4, 2)
-        display.set_number((bcd & 0x0F), 3)
-        display.update()
+        if cpu is not None:
+            display.set_value(int(cpu))
+            display.update()
 
-        # Pause for breath
-        time.sleep(DELAY)
\ No newline at end of file
+        # Wait for the next frame
+        pacer.wait()
\ No newline at end of file
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+
+"""
+Share one SSD1306 OLED between several processes.
+
+A DisplayServer owns the I2C bus and the SSD1306OLED driver, and publishes a
+framebuffer in shared memory, divided into regions. Each client process takes a
+region with a DisplayClient, draws into it with the usual SSD1306OLED methods, and
+calls draw() to publish what changed. Once per tick the server copies every region
+which has changed into the driver's buffer and sends them all in one update.
+
+    # Server, eg. 'python3 display_server.py 0,0,128,32 0,32,128,32'
+    server = DisplayServer(display, [(0, 0, 128, 32), (0, 32, 128, 32)])
+    server.serve()
+
+    # Client
+    client = DisplayClient(1)
+    client.display.move(0, 0).text("Hello")
+    client.display.draw()
+
+Shared memory layout: a header, one slot per region, then the framebuffer, laid out
+page by page as in SSD1306OLED.buffer. Each slot holds:
+    sequence  Written by the client: odd while it is copying a frame in, even otherwise
+    ack       Written by the server: the last even sequence number it has taken
+    region    Written by the server: x, y, width, height
+    dirty     Written by the client: x, y, width, height of the area changed since 'ack'
+"""
+
+# IMPORTS
+import sys
+import time
+import struct
+from multiprocessing import shared_memory
+from ssd1306_circuitpython import SSD1306OLED
+
+# CONSTANTS
+MAGIC = b"SSD1"
+HEADER = struct.Struct("<4sHHH6x")
+SLOT = struct.Struct("<II8H")
+DEFAULT_NAME = "ssd1306"
+
+
+# FUNCTIONS
+def open_shared(name):
+    # Attach to existing shared memory without registering it with this process'
+    # resource tracker, which would otherwise remove it when the client exits
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Python 3.12 and earlier
+        from multiprocessing import resource_tracker
+        memory = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
+
+
+# CLASSES
+class DisplayServer:
+    """
+    Owns an SSD1306OLED and merges the regions drawn by client processes into it
+    """
+
+    def __init__(self, display, regions, name=DEFAULT_NAME):
+        """
+        Args:
+            display (SSD1306OLED) The display to draw on
+            regions (list) An (x, y, width, height) tuple for each client. Regions must not
+                           overlap, and 'y' and 'height' must be multiples of 8
+            name (string) The name of the shared memory block. Default: 'ssd1306'
+        """
+        for (x, y, width, height) in regions:
+            if x < 0 or y < 0 or width < 1 or height < 8 or x + width > display.width or y + height > display.height:
+                raise ValueError("region ({}, {}, {}, {}) does not fit the display".format(x, y, width, height))
+            if y % 8 != 0 or height % 8 != 0:
+                raise ValueError("region ({}, {}, {}, {}) is not aligned to 8-pixel pages".format(x, y, width, height))
+
+        self.display = display
+        self.regions = list(regions)
+        self.base = HEADER.size + SLOT.size * len(regions)
+        self.memory = shared_memory.SharedMemory(name, create=True, size=self.base + len(display.buffer))
+        self.framebuffer = self.memory.buf[self.base:self.base + len(display.buffer)]
+        self.framebuffer[:] = display.buffer
+        HEADER.pack_into(self.memory.buf, 0, MAGIC, display.width, display.height, len(regions))
+        for slot in range(0, len(regions)):
+            SLOT.pack_into(self.memory.buf, HEADER.size + SLOT.size * slot, 0, 0, *regions[slot], 0, 0, 0, 0)
+
+        self.seen = [0] * len(regions)
+        self.frames = 0
+        self.merged = 0
+        self.torn = 0
+
+    def tick(self):
+        """
+        Copy every region which has a new frame into the display buffer, then send
+        all the changes together
+
+        Returns:
+            The number of regions updated
+        """
+        buf = self.memory.buf
+        display = self.display
+        width = display.width
+        updated = 0
+        for slot in range(0, len(self.regions)):
+            offset = HEADER.size + SLOT.size * slot
+            sequence = struct.unpack_from("<I", buf, offset)[0]
+            if sequence == self.seen[slot] or sequence & 1: continue
+            (x, y, w, h) = struct.unpack_from("<4H", buf, offset + 16)
+            if w > 0 and h > 0:
+                for page in range(y >> 3, ((y + h - 1) >> 3) + 1):
+                    start = page * width + x
+                    display.buffer[start:start + w] = self.framebuffer[start:start + w]
+
+            # The client started another frame while it was being copied:
+            # take it on a later tick, once it is complete
+            if struct.unpack_from("<I", buf, offset)[0] != sequence:
+                self.torn += 1
+                continue
+            self.seen[slot] = sequence
+            struct.pack_into("<I", buf, offset + 4, sequence)
+            if w > 0 and h > 0: display.mark_dirty(x, y, w, h)
+            updated += 1
+
+        if updated > 0:
+            display.draw()
+            self.frames += 1
+            self.merged += updated
+        return updated
+
+    def serve(self, interval=0.05):
+        """
+        Update the display from its clients until interrupted
+
+        Args:
+            interval (float) The time between ticks, in seconds. Default: 0.05
+        """
+        try:
+            while True:
+                self.tick()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+    def close(self):
+        """
+        Remove the shared framebuffer. Clients should close theirs first
+        """
+        self.framebuffer.release()
+        self.memory.close()
+        self.memory.unlink()
+
+
+class DisplayClient:
+    """
+    Draws into one region of a DisplayServer's framebuffer from another process.
+    'display' is an off-screen SSD1306OLED the size of the region, so drawing
+    co-ordinates are relative to the region's top left. Its draw() copies the
+    area changed since the last draw() into the shared framebuffer
+    """
+
+    def __init__(self, slot, name=DEFAULT_NAME):
+        """
+        Args:
+            slot (int) The index of the region, as listed to the server
+            name (string) The name of the server's shared memory block. Default: 'ssd1306'
+        """
+        self.memory = open_shared(name)
+        (magic, width, height, slots) = HEADER.unpack_from(self.memory.buf, 0)
+        if magic != MAGIC:
+            self.memory.close()
+            raise ValueError("shared memory '{}' does not hold a display".format(name))
+        if not 0 <= slot < slots:
+            self.memory.close()
+            raise ValueError("there is no region {}: the server has {}".format(slot, slots))
+
+        self.slot = slot
+        self.offset = HEADER.size + SLOT.size * slot
+        self.panel_width = width
+        base = HEADER.size + SLOT.size * slots
+        self.framebuffer = self.memory.buf[base:base + width * (height >> 3)]
+        (self.sequence, ack, x, y, w, h) = struct.unpack_from("<II4H", self.memory.buf, self.offset)
+        self.sequence += self.sequence & 1
+        self.region = (x, y, w, h)
+        self.published = None
+
+        # Start with the whole region dirty, so the first draw() replaces whatever was there
+        self.display = SSD1306OLED(None, None, width=w, height=h)
+        self.display.worker = self
+
+    def submit(self, data=True):
+        """
+        Called by the display's draw(): copy its changes into the shared framebuffer
+        and tell the server that a new frame is ready. The server owns the panel, so
+        commands, eg. from set_inverse() or set_start_line(), cannot be sent from a client
+
+        Args:
+            data (bool) Copy the buffer's changes (True), or send only the queued commands,
+                        as SSD1306OLED.command() does (False). Default: True
+        """
+        display = self.display
+        if len(display.cmd_starts) > 0:
+            # Drop them, so the next draw() is not refused too
+            del display.cmd_queue[1:]
+            display.cmd_starts = []
+            raise RuntimeError("a DisplayClient cannot send commands: the DisplayServer controls the panel")
+        if data is False: return
+        x0 = display.width
+        x1 = -1
+        p0 = None
+        for page in range(0, display.pages):
+            if display.dirty_lo[page] > display.dirty_hi[page]: continue
+            if p0 is None: p0 = page
+            p1 = page
+            if display.dirty_lo[page] < x0: x0 = display.dirty_lo[page]
+            if display.dirty_hi[page] > x1: x1 = display.dirty_hi[page]
+        if p0 is None: return
+
+        # Anything published which the server has not yet taken must be sent with this frame
+        buf = self.memory.buf
+        if self.published is not None and struct.unpack_from("<I", buf, self.offset + 4)[0] != self.sequence:
+            (px0, px1, pp0, pp1) = self.published
+            (x0, x1, p0, p1) = (min(x0, px0), max(x1, px1), min(p0, pp0), max(p1, pp1))
+
+        (rx, ry) = self.region[0:2]
+        span = x1 - x0 + 1
+        struct.pack_into("<I", buf, self.offset, self.sequence + 1)
+        for page in range(p0, p1 + 1):
+            source = page * display.width + x0
+            target = ((ry >> 3) + page) * self.panel_width + rx + x0
+            self.framebuffer[target:target + span] = display.buffer[source:source + span]
+        struct.pack_into("<4H", buf, self.offset + 16, rx + x0, ry + (p0 << 3), span, (p1 - p0 + 1) << 3)
+        self.sequence += 2
+        struct.pack_into("<I", buf, self.offset, self.sequence)
+        self.published = (x0, x1, p0, p1)
+        display.clean(display)
+
+    def close(self):
+        """
+        Detach from the server's shared framebuffer
+        """
+        self.display.worker = None
+        self.framebuffer.release()
+        self.memory.close()
+
+
+# START
+if __name__ == '__main__':
+    import board
+    import busio
+    import digitalio
+
+    # Regions as x,y,width,height arguments. Default: top and bottom halves
+    regions = [tuple(int(v) for v in arg.split(",")) for arg in sys.argv[1:]]
+    if len(regions) == 0: regions = [(0, 0, 128, 32), (0, 32, 128, 32)]
+
+    # Set up I2C on the MCP2221 Breakout
+    i2c = busio.I2C(board.SCL, board.SDA)
+
+    # Set up the RST pin
+    reset = digitalio.DigitalInOut(board.G0)
+    reset.direction = digitalio.Direction.OUTPUT
+
+    display = SSD1306OLED(reset, i2c, 0x3D, 128, 64)
+    server = DisplayServer(display, regions)
+    print("Serving {} regions as '{}'. Press Ctrl-C to stop".format(len(regions), DEFAULT_NAME))
+    server.serve()
+    server.close()
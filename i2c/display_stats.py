@@ -0,0 +1,303 @@
+"""
+Instrumentation for SSD1306OLED and HT16K33Segment.
+
+DisplayStats.attach() wraps a display's I2C object, its render() and its drawing
+methods, on that display instance alone, to measure:
+
+    - transactions and bytes sent, in total and per frame
+    - render latency, with p50, p95 and p99 over recent frames
+    - time spent in the drawing methods against time spent on the bus
+    - frames skipped because nothing had changed
+
+Nothing is wrapped until a DisplayStats is attached, so a display without one runs
+exactly the code it always has. A hook, called every so many frames, streams the
+figures out, eg. to a log or a Prometheus text file:
+
+    stats = DisplayStats(hook=PrometheusFile("/tmp/oled.prom"), every=50)
+    stats.attach(display)
+    ...
+    print(stats.report())
+
+Attach a DisplayStats before starting a RenderWorker, and detach it after stopping
+the worker, as both wrap the display's I2C object.
+"""
+
+# IMPORTS
+import os
+import math
+import time
+import logging
+import threading
+from collections import deque
+
+# CONSTANTS
+# The drawing methods timed, where the display has them
+PRIMITIVES = ("clear", "plot", "line", "circle", "ellipse", "rect", "fill_rect", "hline", "vline",
+              "text", "blit", "print_line", "set_glyph", "set_number", "set_char", "set_colon")
+
+
+# CLASSES
+class CountingI2C:
+    """
+    Wraps an I2C object to count and time the transfers made through it
+    """
+
+    def __init__(self, i2c, stats):
+        self.i2c = i2c
+        self.stats = stats
+
+    def writeto(self, address, buffer, **kwargs):
+        stats = self.stats
+        start = time.perf_counter()
+        try:
+            self.i2c.writeto(address, buffer, **kwargs)
+        finally:
+            stats.io_time += time.perf_counter() - start
+        # Only a write which succeeded is counted
+        end = kwargs.get("end")
+        stats.count((len(buffer) if end is None else end) - kwargs.get("start", 0))
+
+    def __getattr__(self, name):
+        # Eg. 'max_transaction' and 'chunks()' from a TransferPlanner
+        return getattr(self.i2c, name)
+
+
+class ThreadCounts(threading.local):
+    """
+    Each thread's own drawing depth and transfer counts, so that a render on a
+    RenderWorker's thread is measured apart from drawing on the main thread
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.transactions = 0
+        self.bytes = 0
+
+
+class DisplayStats:
+    """
+    Collects performance figures from one display
+    """
+
+    def __init__(self, history=1000, hook=None, every=100):
+        """
+        Args:
+            history (int) The number of recent frames to keep render times for. Default: 1000
+            hook (callable) Called with the DisplayStats object every 'every' frames. Default: None
+            every (int) How many frames to render between calls to the hook. Default: 100
+        """
+        self.latencies = deque(maxlen=history)
+        self.hook = hook
+        self.every = every
+        self.display = None
+        self.local = ThreadCounts()
+        self.reset()
+
+    def reset(self):
+        """
+        Zero every figure
+        """
+        self.frames = 0
+        self.skipped = 0
+        self.transactions = 0
+        self.bytes = 0
+        self.frame_transactions = 0
+        self.frame_bytes = 0
+        self.io_time = 0.0
+        self.render_time = 0.0
+        self.primitive_time = 0.0
+        self.primitive_calls = {}
+        self.latencies.clear()
+
+    def attach(self, display):
+        """
+        Start measuring a display
+
+        Args:
+            display (SSD1306OLED or HT16K33Segment) The display to measure
+
+        Returns:
+            The DisplayStats object
+        """
+        if self.display is not None: self.detach()
+        self.display = display
+        display.i2c = CountingI2C(display.i2c, self)
+        display.render = self.wrap_render(display.render)
+        for name in PRIMITIVES:
+            if hasattr(display, name): setattr(display, name, self.wrap_primitive(name, getattr(display, name)))
+        display.stats = self
+        return self
+
+    def detach(self):
+        """
+        Stop measuring the display, restoring its methods and I2C object
+        """
+        display = self.display
+        if display is None: return
+        for name in PRIMITIVES + ("render",):
+            if name in display.__dict__: delattr(display, name)
+        if isinstance(display.i2c, CountingI2C): display.i2c = display.i2c.i2c
+        display.stats = None
+        self.display = None
+
+    def percentile(self, percent):
+        """
+        Args:
+            percent (float) The percentile, 0 to 100
+
+        Returns:
+            The render time, in seconds, below which that percentage of recent frames fell
+        """
+        if len(self.latencies) == 0: return 0.0
+        ordered = sorted(self.latencies)
+        # Nearest rank
+        index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self):
+        """
+        Returns:
+            A dictionary of the current figures. Times are in seconds
+        """
+        frames = max(1, self.frames)
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "transactions": self.transactions,
+            "bytes": self.bytes,
+            "frame_transactions": self.frame_transactions,
+            "frame_bytes": self.frame_bytes,
+            "mean_frame_bytes": self.bytes / frames,
+            "render_p50": self.percentile(50),
+            "render_p95": self.percentile(95),
+            "render_p99": self.percentile(99),
+            "render_time": self.render_time,
+            "io_time": self.io_time,
+            "primitive_time": self.primitive_time,
+            "primitive_calls": dict(self.primitive_calls)
+        }
+
+    def report(self):
+        """
+        Returns:
+            The current figures as a line of text
+        """
+        s = self.summary()
+        return ("{} frames ({} skipped), last {} B in {} transactions, mean {:.0f} B/frame; "
+                "render p50 {:.2f} ms p95 {:.2f} ms p99 {:.2f} ms; "
+                "drawing {:.1f} ms, bus {:.1f} ms").format(
+                    s["frames"], s["skipped"], s["frame_bytes"], s["frame_transactions"], s["mean_frame_bytes"],
+                    s["render_p50"] * 1000, s["render_p95"] * 1000, s["render_p99"] * 1000,
+                    s["primitive_time"] * 1000, s["io_time"] * 1000)
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def count(self, size):
+        # Count a completed transfer in the totals and in this thread's own counts
+        self.transactions += 1
+        self.bytes += size
+        local = self.local
+        local.transactions += 1
+        local.bytes += size
+
+    def wrap_render(self, render):
+        def timed_render(*args, **kwargs):
+            # A frame's figures are the transfers made by the thread rendering it
+            local = self.local
+            transactions = local.transactions
+            count = local.bytes
+            start = time.perf_counter()
+            try:
+                return render(*args, **kwargs)
+            finally:
+                taken = time.perf_counter() - start
+                self.render_time += taken
+                self.latencies.append(taken)
+                self.frames += 1
+                self.frame_transactions = local.transactions - transactions
+                self.frame_bytes = local.bytes - count
+                if self.frame_bytes == 0: self.skipped += 1
+                # Keep rendering out of the drawing time when a drawing method on this
+                # thread rendered, eg. print_line()
+                if local.depth > 0: self.primitive_time -= taken
+                if self.hook is not None and self.frames % self.every == 0: self.hook(self)
+        return timed_render
+
+    def wrap_primitive(self, name, method):
+        def timed_primitive(*args, **kwargs):
+            # Only the outermost call is timed: eg. rect() calls fill_rect()
+            local = self.local
+            if local.depth > 0: return method(*args, **kwargs)
+            local.depth = 1
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.primitive_time += time.perf_counter() - start
+                self.primitive_calls[name] = self.primitive_calls.get(name, 0) + 1
+                local.depth = 0
+        return timed_primitive
+
+
+class LogHook:
+    """
+    A DisplayStats hook which logs the figures as a line of text
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        """
+        Args:
+            logger (logging.Logger) Where to log. Default: the 'display_stats' logger
+            level (int) The level to log at. Default: logging.INFO
+        """
+        self.logger = logger if logger is not None else logging.getLogger("display_stats")
+        self.level = level
+
+    def __call__(self, stats):
+        self.logger.log(self.level, stats.report())
+
+
+class PrometheusFile:
+    """
+    A DisplayStats hook which writes the figures to a file in the Prometheus text
+    exposition format, eg. for the node exporter's textfile collector. The file is
+    replaced in one step, so a scrape never sees it half-written
+    """
+
+    def __init__(self, path, name="display"):
+        """
+        Args:
+            path (string) The file to write
+            name (string) The value of the 'display' label on every metric. Default: 'display'
+        """
+        self.path = path
+        self.name = name
+
+    def __call__(self, stats):
+        s = stats.summary()
+        label = 'display="{}"'.format(self.name)
+        lines = []
+
+        def metric(key, kind, text, value, extra=""):
+            lines.append("# HELP display_{} {}".format(key, text))
+            lines.append("# TYPE display_{} {}".format(key, kind))
+            lines.append("display_{}{{{}{}}} {}".format(key, label, extra, value))
+
+        metric("frames_total", "counter", "Frames rendered", s["frames"])
+        metric("frames_skipped_total", "counter", "Frames which sent nothing because nothing had changed", s["skipped"])
+        metric("transactions_total", "counter", "I2C transactions", s["transactions"])
+        metric("bytes_total", "counter", "I2C bytes written", s["bytes"])
+        metric("frame_bytes", "gauge", "Bytes written by the last frame", s["frame_bytes"])
+        metric("io_seconds_total", "counter", "Time spent in I2C transfers", s["io_time"])
+        metric("drawing_seconds_total", "counter", "Time spent in drawing methods", s["primitive_time"])
+        lines.append("# HELP display_render_seconds Render time over recent frames")
+        lines.append("# TYPE display_render_seconds summary")
+        for (quantile, key) in (("0.5", "render_p50"), ("0.95", "render_p95"), ("0.99", "render_p99")):
+            lines.append('display_render_seconds{{{},quantile="{}"}} {}'.format(label, quantile, s[key]))
+        lines.append("display_render_seconds_sum{{{}}} {}".format(label, s["render_time"]))
+        lines.append("display_render_seconds_count{{{}}} {}".format(label, s["frames"]))
+
+        temp = self.path + ".tmp"
+        with open(temp, "w") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temp, self.path)
@@ -0,0 +1,133 @@
+"""
+Run a display loop at a steady rate.
+
+Ending each pass of a loop with 'time.sleep(DELAY)' makes each frame take DELAY plus
+however long the frame's own work took, so the loop runs slower than intended, and
+by a varying amount. A FramePacer waits instead until a fixed deadline, each one
+'interval' after the last, timed from the start, so the time spent working comes
+out of the wait and errors never build up:
+
+    pacer = FramePacer(0.01)
+    while True:
+        display.set_value(count)
+        display.update()
+        pacer.wait()
+
+A frame which overruns its deadline is counted. The next frame then starts at once,
+and the policy decides what happens after it: 'skip' gives up the deadlines which
+have passed, so the loop keeps to its schedule by dropping frames; 'catch_up' keeps
+them, running frames back to back until the loop is back on time, so no frame is
+lost unless it falls more than 'max_catch_up' frames behind. 'report()' gives the
+rate achieved, the jitter of the frame start times and the overrun counts.
+"""
+
+# IMPORTS
+import math
+import time
+from collections import deque
+
+
+# CLASSES
+class FramePacer:
+    """
+    Paces a loop to absolute deadlines on the monotonic clock
+    """
+
+    def __init__(self, interval, policy="skip", max_catch_up=10, history=1000):
+        """
+        Args:
+            interval (float) The time between frames, in seconds
+            policy (string) After an overrun, 'skip' the missed frames or 'catch_up' with them. Default: 'skip'
+            max_catch_up (int) With 'catch_up', the most frames to fall behind before skipping. Default: 10
+            history (int) The number of recent frames to keep start times for. Default: 1000
+        """
+        if interval <= 0: raise ValueError("interval must be greater than zero")
+        if policy not in ("skip", "catch_up"): raise ValueError("policy must be 'skip' or 'catch_up'")
+        self.interval = interval
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        # How late each recent frame started, in seconds
+        self.lateness = deque(maxlen=history)
+        self.start()
+
+    def start(self):
+        """
+        Start timing from now, and zero the counters. The first frame is due one interval from now
+
+        Returns:
+            The pacer
+        """
+        self.started = time.monotonic()
+        self.deadline = self.started + self.interval
+        self.frames = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.lateness.clear()
+        return self
+
+    def wait(self):
+        """
+        Wait until the next frame is due. Call at the end of each frame
+
+        Returns:
+            The number of frames skipped to keep to the schedule: 0 unless the frame overran
+        """
+        self.frames += 1
+        skipped = 0
+        now = time.monotonic()
+        if now > self.deadline:
+            # Overrun: start the next frame at once
+            self.overruns += 1
+            behind = int((now - self.deadline) / self.interval)
+            if self.policy == "skip" or behind >= self.max_catch_up:
+                # Drop the deadlines which have passed, keeping to the original schedule
+                skipped = behind
+                self.deadline += behind * self.interval
+                self.skipped += skipped
+
+        # Always sleep, even if only for zero seconds, to let other threads run
+        time.sleep(max(0, self.deadline - now))
+        self.lateness.append(max(0, time.monotonic() - self.deadline))
+        self.deadline += self.interval
+        return skipped
+
+    def run(self, callback, frames=None):
+        """
+        Call a function once per frame, until it returns False or enough frames have run
+
+        Args:
+            callback (callable) Called with no arguments at the start of each frame
+            frames (int) The number of frames to run, or None to run until 'callback' returns False. Default: None
+        """
+        count = 0
+        while frames is None or count < frames:
+            if callback() is False: return
+            count += 1
+            self.wait()
+
+    def rate(self):
+        """
+        Returns:
+            The frame rate achieved since 'start()', in frames per second
+        """
+        elapsed = time.monotonic() - self.started
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def jitter(self):
+        """
+        Returns:
+            A (mean, p95, maximum) tuple of how late recent frames started, in seconds
+        """
+        if len(self.lateness) == 0: return (0.0, 0.0, 0.0)
+        ordered = sorted(self.lateness)
+        index = min(len(ordered) - 1, max(0, math.ceil(0.95 * len(ordered)) - 1))
+        return (sum(ordered) / len(ordered), ordered[index], ordered[-1])
+
+    def report(self):
+        """
+        Returns:
+            The figures as a line of text
+        """
+        (mean, p95, worst) = self.jitter()
+        return "{} frames at {:.1f} fps (target {:.1f}), {} overruns, {} skipped; late by mean {:.2f} ms p95 {:.2f} ms max {:.2f} ms".format(
+            self.frames, self.rate(), 1 / self.interval, self.overruns, self.skipped, mean * 1000, p95 * 1000, worst * 1000)
@@ -1,3 +1,20 @@
+import time
+
+
+def _digit_pairs(chars):
+    # The glyphs for every two-digit number, 00 to 99
+    return tuple(bytes((chars[i // 10], chars[i % 10])) for i in range(100))
+
+
+def _segments(chars):
+    # The glyph for each character which 'set_text()' can show
+    segments = {" ": 0x00, "-": chars[0x10], "\u00b0": chars[0x11]}
+    for i in range(0, 16):
+        segments["0123456789abcdef"[i]] = chars[i]
+        segments["0123456789ABCDEF"[i]] = chars[i]
+    return segments
+
+
 class HT16K33Segment:
     """
     A simple driver for the I2C-connected Holtek HT16K33 controller chip and a four-digit,
@@ -5,7 +22,7 @@ class HT16K33Segment:
     For example: https://learn.adafruit.com/adafruit-7-segment-led-featherwings/overview
     This release is written for CircuitPython
 
-    Version:   1.0.0
+    Version:   1.1.0
     Author:    smittytone
     Copyright: 2020, Tony Smith
     Licence:   MIT
@@ -26,11 +43,31 @@ class HT16K33Segment:
     # 0-9, A-F, minus, degree
     chars = b'\x3F\x06\x5B\x4F\x66\x6D\x7D\x07\x7F\x6F\x5F\x7C\x58\x5E\x7B\x71\x40\x63'
 
+    # Lookup tables for 'set_value()' and 'set_text()'
+    digit_pairs = _digit_pairs(chars)
+    segments = _segments(chars)
+
 
     def __init__(self, i2c, address=0x70):
         self.i2c = i2c
         self.address = address
         self.buffer = bytearray(16)
+        # What the display RAM was last sent, and whether it can be trusted
+        self.shadow = bytearray(16)
+        self.shadow_valid = False
+        # The transmit buffer: each byte of display RAM is sent from the index after its
+        # address, so the byte before any range is free to hold the range's address
+        self.tx_buffer = bytearray(17)
+        self.cmd_buffer = bytearray(1)
+        # Scratch space for 'set_value()' and 'set_text()'
+        self.glyphs = bytearray(4)
+        # A RenderWorker, or similar, which sends frames in the background. When set,
+        # update() hands the buffer to it rather than writing it out itself
+        self.worker = None
+        # A DisplayStats, while one is attached to measure the display
+        self.stats = None
+        # The frames of the marquee being played, if any
+        self.marquee_frames = None
         self._write_cmd(self.HT16K33_SYSTEM_ON)
         self.set_blink_rate()
         self.set_brightness(15)
@@ -46,9 +83,9 @@ class HT16K33Segment:
         """
         rates = (0, 2, 1, 0.5)
         if rate not in rates: return
-        rate = rate & 0x03
         self.blink_rate = rate
-        self._write_cmd(self.HT16K33_BLINK_CMD | self.HT16K33_BLINK_DISPLAY_ON | rate << 1)
+        # The rate's index is its register code
+        self._write_cmd(self.HT16K33_BLINK_CMD | self.HT16K33_BLINK_DISPLAY_ON | rates.index(rate) << 1)
 
     def set_brightness(self, brightness=15):
         """
@@ -139,6 +176,52 @@ class HT16K33Segment:
         self.buffer[self.pos[digit]] = self.chars[char_val]
         if has_dot is True: self.buffer[self.pos[digit]] |= 0b10000000
 
+    def set_value(self, value, decimals=None, pad=" "):
+        """
+        Present a number across all four digits, right-aligned.
+
+        Floats are shown with up to 'decimals' decimal places, or as many as fit if 'decimals'
+        is None; fewer places are shown if that many will not fit. Negative values take a minus
+        sign, and values which cannot be shown in four digits appear as '----'.
+
+        This method updates the display buffer, but does not send the buffer to the display itself.
+        Call 'update()' to render the buffer on the display.
+
+        Args:
+            value (int or float): The number to show.
+            decimals (int):       The number of decimal places to show. Default: 0 for ints, as many as fit for floats.
+            pad (string):         Fill unused leading digits with spaces (' ') or zeros ('0'). Default: ' '.
+        """
+        glyphs = self.glyphs
+        self._encode_value(glyphs, value, decimals, pad)
+        buff = self.buffer
+        buff[0] = glyphs[0]
+        buff[2] = glyphs[1]
+        buff[6] = glyphs[2]
+        buff[8] = glyphs[3]
+
+    def set_text(self, text):
+        """
+        Present a short string across all four digits, left-aligned.
+
+        Characters are drawn from the class' character set: 0-9, a-f, A-F, space, minus and degree (°).
+        Others appear as spaces. A '.' lights the decimal point of the character before it.
+        Text beyond four characters is not shown.
+
+        This method updates the display buffer, but does not send the buffer to the display itself.
+        Call 'update()' to render the buffer on the display.
+
+        Args:
+            text (string): The text to show.
+        """
+        glyphs = self.glyphs
+        self._encode_text(glyphs, text)
+        buff = self.buffer
+        buff[0] = glyphs[0]
+        buff[2] = glyphs[1]
+        buff[6] = glyphs[2]
+        buff[8] = glyphs[3]
+
     def set_colon(self, is_set=True):
         """
         Set or unset the display's central colon symbol.
@@ -166,11 +249,251 @@ class HT16K33Segment:
         Writes the current display buffer to the display itself.
 
         Call this method after clearing the buffer or writing characters to the buffer to update
-        the LED.
+        the LED. Only the bytes which have changed since the last update are sent, and nothing
+        is sent if nothing has changed.
+
+        If the I2C object is a TransferPlanner with a transaction size limit, the buffer is sent
+        in pieces, each starting with the display RAM address it is written to.
+
+        If a worker is attached, the buffer is passed to it to send, and the method returns at once.
+        """
+        if self.worker is not None:
+            self.worker.submit()
+        else:
+            self.render()
+
+    def snapshot(self, frame=None):
         """
-        buffer = bytearray(17)
-        buffer[1:] = self.buffer
-        self.i2c.writeto(self.address, bytes(buffer))
+        Take a copy of the display buffer to send later with 'render()'.
+
+        Args:
+            frame (bytearray): A 16-byte frame to copy the buffer into. Default: a new frame.
+
+        Returns:
+            The frame.
+        """
+        if frame is None: frame = bytearray(16)
+        frame[:] = self.buffer
+        return frame
+
+    def render(self, frame=None):
+        """
+        Write a frame to the display: the display buffer, or a copy of it made by 'snapshot()'.
+
+        Args:
+            frame (bytearray): The frame to send. Default: the display buffer.
+        """
+        if frame is None: frame = self.buffer
+        shadow = self.shadow
+        first = 0
+        last = 15
+        if self.shadow_valid is True:
+            if frame == shadow: return
+            while frame[first] == shadow[first]: first += 1
+            while frame[last] == shadow[last]: last -= 1
+
+        # Send the smallest run of RAM which covers every change, using the chip's
+        # auto-incrementing address pointer, from the transmit buffer
+        tx_buffer = self.tx_buffer
+        tx_buffer[first + 1:last + 2] = frame[first:last + 1]
+        chunks = self.i2c.chunks(last - first + 1, 1) if hasattr(self.i2c, "chunks") else [(0, last - first + 1)]
+        for (start, end) in chunks:
+            start += first
+            end += first
+            tx_buffer[start] = start
+            self.i2c.writeto(self.address, tx_buffer, start=start, end=end + 1)
+            shadow[start:end] = frame[start:end]
+        self.shadow_valid = True
+
+    def mark_dirty(self):
+        """
+        Forget what the display RAM holds, so the next update sends the whole buffer,
+        eg. after the display has been power-cycled.
+        """
+        self.shadow_valid = False
+
+    def compile_marquee(self, text, gap=4):
+        """
+        Prepare a string to scroll across the display, right to left, with 'play_marquee()'.
+
+        The text is encoded once, here, into a sequence of frames. The first frame sets all four
+        digits; each later frame holds only the digits which differ from the frame before it.
+        The text scrolls in from the right, and is followed by 'gap' blank digits before it
+        starts again. Characters are drawn as by 'set_text()'.
+
+        Args:
+            text (string): The text to scroll.
+            gap (int):     The number of blank digits between repeats of the text. Default: 4.
+
+        Returns:
+            A tuple of frames, each a tuple of (display buffer index, byte) pairs.
+        """
+        glyphs = bytearray(len(text))
+        length = self._encode_text(glyphs, text)
+        sequence = glyphs[0:length] + bytearray(max(0, gap))
+        if len(sequence) == 0: sequence = bytearray(1)
+
+        frames = []
+        last = None
+        for step in range(0, len(sequence)):
+            # Frame 'step' shows the four digits of the sequence ending at 'step', wrapping round
+            window = [sequence[(step + digit - 3) % len(sequence)] for digit in range(0, 4)]
+            frames.append(tuple((self.pos[digit], window[digit]) for digit in range(0, 4)
+                                if last is None or window[digit] != last[digit]))
+            last = window
+        return tuple(frames)
+
+    def play_marquee(self, frames, delay=0.25, loops=1):
+        """
+        Scroll a marquee prepared by 'compile_marquee()', returning when it has finished.
+
+        Args:
+            frames (tuple): The marquee's frames.
+            delay (float):  The time each frame is shown for, in seconds. Default: 0.25.
+            loops (int):    How many times to show the marquee, or None to repeat it until interrupted. Default: 1.
+        """
+        self.start_marquee(frames, delay, loops)
+        while self.step_marquee() is True:
+            wait = self.marquee_deadline - time.monotonic()
+            if wait > 0: time.sleep(wait)
+
+    def start_marquee(self, frames, delay=0.25, loops=1):
+        """
+        Start a marquee prepared by 'compile_marquee()', without waiting for it to finish.
+
+        Call 'step_marquee()' from the app's loop, at least once every 'delay' seconds, to
+        move the marquee on. The first frame is shown by the first call.
+
+        Args:
+            frames (tuple): The marquee's frames.
+            delay (float):  The time each frame is shown for, in seconds. Default: 0.25.
+            loops (int):    How many times to show the marquee, or None to repeat it until stopped. Default: 1.
+        """
+        self.marquee_frames = frames
+        self.marquee_index = 0
+        self.marquee_loops = loops
+        self.marquee_delay = delay
+        self.marquee_deadline = time.monotonic()
+        # Frames passed over to keep time, eg. because the app was busy
+        self.marquee_skipped = 0
+
+    def step_marquee(self, now=None):
+        """
+        Show the next frame of the marquee started by 'start_marquee()', if it is due.
+
+        Frames are due at fixed intervals from the start, so the scroll speed does not drift.
+        If more than one frame has fallen due since the last call, the display jumps straight
+        to the latest of them, and only that frame is written.
+
+        Args:
+            now (float): The time, from 'time.monotonic()'. Default: the current time.
+
+        Returns:
+            True while the marquee is playing, False once it has finished or been stopped.
+        """
+        frames = self.marquee_frames
+        if frames is None: return False
+        if now is None: now = time.monotonic()
+        if now < self.marquee_deadline: return True
+
+        buff = self.buffer
+        due = 1 + int((now - self.marquee_deadline) / self.marquee_delay)
+        self.marquee_skipped += due - 1
+        self.marquee_deadline += due * self.marquee_delay
+        while due > 0:
+            if self.marquee_index == len(frames):
+                if self.marquee_loops is not None:
+                    self.marquee_loops -= 1
+                    if self.marquee_loops <= 0: break
+                self.marquee_index = 0
+            for (index, byte) in frames[self.marquee_index]: buff[index] = byte
+            self.marquee_index += 1
+            due -= 1
+
+        self.update()
+        if due > 0:
+            self.marquee_frames = None
+            return False
+        return True
+
+    def stop_marquee(self):
+        """
+        Stop the marquee being played, leaving its current frame on the display.
+        """
+        self.marquee_frames = None
+
+    def _encode_value(self, glyphs, value, decimals, pad):
+        """
+        Fills a bytearray with the glyphs for a number, right-aligned. A private method.
+
+        Args:
+            glyphs (bytearray): One byte per digit, to receive the glyphs.
+            value (int or float): The number to encode.
+            decimals (int):       The number of decimal places to show, or None.
+            pad (string):         ' ' or '0'.
+        """
+        digits = len(glyphs)
+        negative = value < 0
+        if negative: value = -value
+        limit = 10 ** (digits - 1 if negative else digits) - 1
+
+        # Scale a float to an int, with as many decimal places as are wanted and fit
+        places = 0
+        if value != value or value == float("inf"):
+            # NaN or infinity
+            value = limit + 1
+        elif isinstance(value, float) or (decimals is not None and decimals > 0):
+            # Keep a digit in front of the point, and another for a minus sign
+            places = max(0, min(3 if decimals is None else decimals, digits - (2 if negative else 1)))
+            while places > 0 and round(value * 10 ** places) > limit: places -= 1
+            value = round(value * 10 ** places)
+            # A value which rounds to zero takes no sign
+            if value == 0: negative = False
+
+        minus = self.chars[self.HT16K33_MINUS_CHAR]
+        if value > limit:
+            for digit in range(0, digits): glyphs[digit] = minus
+            return
+
+        # Two digits at a time from the right
+        pairs = self.digit_pairs
+        remainder = value
+        index = digits
+        while index > 1:
+            index -= 2
+            glyphs[index:index + 2] = pairs[remainder % 100]
+            remainder //= 100
+        if index == 1: glyphs[0] = self.chars[remainder % 10]
+
+        # Blank or keep the leading zeros, but always show a digit before the point
+        length = len(str(value))
+        if length <= places: length = places + 1
+        if pad != "0" and length < digits: glyphs[0:digits - length] = bytes(digits - length)
+        if negative: glyphs[digits - 1 - length if pad != "0" else 0] = minus
+        if places > 0: glyphs[digits - 1 - places] |= 0b10000000
+
+    def _encode_text(self, glyphs, text):
+        """
+        Fills a bytearray with the glyphs for a string, left-aligned. A private method.
+
+        Args:
+            glyphs (bytearray): One byte per digit, to receive the glyphs.
+            text (string):      The text to encode.
+
+        Returns:
+            The number of digits the text fills.
+        """
+        digits = len(glyphs)
+        for digit in range(0, digits): glyphs[digit] = 0x00
+        digit = 0
+        for char in text:
+            if char == "." and digit > 0 and not glyphs[digit - 1] & 0b10000000:
+                glyphs[digit - 1] |= 0b10000000
+                continue
+            if digit >= digits: break
+            glyphs[digit] = 0b10000000 if char == "." else self.segments.get(char, 0x00)
+            digit += 1
+        return digit
 
     def _write_cmd(self, byte):
         """
@@ -179,6 +502,201 @@ class HT16K33Segment:
         Args:
             byte (int): The command value to send.
         """
-        temp = bytearray(1)
-        temp[0] = byte
-        self.i2c.writeto(self.address, temp)
+        self.cmd_buffer[0] = byte
+        self.i2c.writeto(self.address, self.cmd_buffer)
+
+
+class HT16K33SegmentChain:
+    """
+    A row of four-digit, seven-segment HT16K33 modules, each at its own I2C address,
+    driven as one long display. Digits are numbered from 0 at the left of the first
+    module, and numbers and text run across the module boundaries.
+
+    'update()' sends only the modules whose digits have changed, and of those only the
+    bytes which have changed. Brightness and blink settings are sent only to the modules
+    which are not already set that way, either at once or a few modules per 'update()'.
+    There is no broadcast: each of those modules takes a transaction of its own.
+    """
+
+    def __init__(self, i2c, addresses=(0x70, 0x71), stagger=None):
+        """
+        Args:
+            i2c (busio.I2C):   The bus the modules are on.
+            addresses (tuple): The modules' I2C addresses, from left to right. Default: (0x70, 0x71).
+            stagger (int):     How many modules' brightness and blink changes to send with each 'update()',
+                               or None to send them as soon as they are set. Default: None.
+        """
+        if len(addresses) == 0: raise ValueError("a chain needs at least one module")
+        self.modules = [HT16K33Segment(i2c, address) for address in addresses]
+        self.digits = len(self.modules) * 4
+        self.stagger = stagger
+        # The settings each module should have. They are sent by 'send_settings()'
+        self.brightness = [module.brightness for module in self.modules]
+        self.blink_rate = [module.blink_rate for module in self.modules]
+        self.glyphs = bytearray(self.digits)
+
+    def set_blink_rate(self, rate=0, module=None):
+        """
+        Set the flash rate of one module or all of them.
+
+        Only four values (in Hz) are permitted: 0, 2, 1, and 0.5. The modules are not
+        set with a single broadcast: each module which needs the change takes one
+        transaction of its own, now or, with 'stagger', during a later 'update()'.
+
+        Args:
+            rate (int or float): The chosen flash rate. Default: 0Hz.
+            module (int): The index of the module, from 0 at the left, or None for every module. Default: None.
+        """
+        if rate not in (0, 2, 1, 0.5): return
+        for index in self._indices(module): self.blink_rate[index] = rate
+        if self.stagger is None: self.send_settings()
+
+    def set_brightness(self, brightness=15, module=None):
+        """
+        Set the brightness of one module or all of them.
+
+        Brightness values range from 0 (dim, but not off) to 15 (max. brightness).
+        As with 'set_blink_rate()', each module which needs the change takes one transaction.
+
+        Args:
+            brightness (int): The chosen brightness. Default: 15 (100%).
+            module (int):     The index of the module, from 0 at the left, or None for every module. Default: None.
+        """
+        if brightness < 0 or brightness > 15: brightness = 15
+        for index in self._indices(module): self.brightness[index] = brightness
+        if self.stagger is None: self.send_settings()
+
+    def send_settings(self, limit=None):
+        """
+        Send brightness and blink settings to the modules which do not have them yet.
+
+        Args:
+            limit (int): The most modules to send settings to, or None for all of them. Default: None.
+
+        Returns:
+            The number of modules still waiting for their settings.
+        """
+        waiting = 0
+        for index in range(0, len(self.modules)):
+            module = self.modules[index]
+            if module.brightness == self.brightness[index] and module.blink_rate == self.blink_rate[index]: continue
+            if limit is not None and limit <= 0:
+                waiting += 1
+                continue
+            if module.brightness != self.brightness[index]: module.set_brightness(self.brightness[index])
+            if module.blink_rate != self.blink_rate[index]: module.set_blink_rate(self.blink_rate[index])
+            if limit is not None: limit -= 1
+        return waiting
+
+    def set_glyph(self, glyph, digit=0, has_dot=False):
+        """
+        Present a user-defined character glyph at the specified digit. See 'HT16K33Segment.set_glyph()'.
+
+        Args:
+            glyph (int):    The glyph pattern.
+            digit (int):    The digit to show the glyph, from 0 at the left of the chain. Default: 0.
+            has_dot (bool): Whether the decimal point to the right of the digit should be lit. Default: False.
+        """
+        if not 0 <= digit < self.digits: return
+        self.modules[digit >> 2].set_glyph(glyph, digit & 3, has_dot)
+
+    def set_number(self, number, digit=0, has_dot=False):
+        """
+        Present single decimal value (0-9) at the specified digit.
+
+        Args:
+            number (int):   The number to show.
+            digit (int):    The digit to show the number, from 0 at the left of the chain. Default: 0.
+            has_dot (bool): Whether the decimal point to the right of the digit should be lit. Default: False.
+        """
+        if not 0 <= digit < self.digits: return
+        self.modules[digit >> 2].set_number(number, digit & 3, has_dot)
+
+    def set_char(self, char, digit=0, has_dot=False):
+        """
+        Present single alphanumeric character at the specified digit. See 'HT16K33Segment.set_char()'.
+
+        Args:
+            char (string):  The character to show.
+            digit (int):    The digit to show the character, from 0 at the left of the chain. Default: 0.
+            has_dot (bool): Whether the decimal point to the right of the digit should be lit. Default: False.
+        """
+        if not 0 <= digit < self.digits: return
+        self.modules[digit >> 2].set_char(char, digit & 3, has_dot)
+
+    def set_value(self, value, decimals=None, pad=" "):
+        """
+        Present a number across every digit of the chain, right-aligned. See 'HT16K33Segment.set_value()'.
+
+        Args:
+            value (int or float): The number to show.
+            decimals (int):       The number of decimal places to show. Default: 0 for ints, up to three for floats.
+            pad (string):         Fill unused leading digits with spaces (' ') or zeros ('0'). Default: ' '.
+        """
+        self.modules[0]._encode_value(self.glyphs, value, decimals, pad)
+        self._show_glyphs()
+
+    def set_text(self, text):
+        """
+        Present a string across every digit of the chain, left-aligned. See 'HT16K33Segment.set_text()'.
+
+        Args:
+            text (string): The text to show.
+        """
+        self.modules[0]._encode_text(self.glyphs, text)
+        self._show_glyphs()
+
+    def set_colon(self, is_set=True, module=None):
+        """
+        Set or unset the central colon symbol of one module or all of them.
+
+        Args:
+            is_set (bool): Whether the colon is lit (True) or not (False). Default: True.
+            module (int):  The index of the module, from 0 at the left, or None for every module. Default: None.
+        """
+        for index in self._indices(module): self.modules[index].set_colon(is_set)
+
+    def clear(self):
+        """
+        Clears every module's display buffer. Call 'update()' to render the buffers.
+        """
+        for module in self.modules: module.clear()
+
+    def update(self):
+        """
+        Write the display buffers to the modules whose digits have changed, along with
+        up to 'stagger' modules' waiting brightness and blink settings.
+        """
+        if self.stagger is not None: self.send_settings(self.stagger)
+        for module in self.modules: module.update()
+
+    def mark_dirty(self):
+        """
+        Forget what every module's display RAM holds, so the next update sends every buffer in full.
+        """
+        for module in self.modules: module.mark_dirty()
+
+    def _indices(self, module):
+        """
+        The indices of the modules a setting applies to. A private method.
+
+        Args:
+            module (int): The index of one module, or None for every module.
+        """
+        if module is None: return range(0, len(self.modules))
+        if not 0 <= module < len(self.modules): return ()
+        return (module,)
+
+    def _show_glyphs(self):
+        """
+        Copies the chain's glyphs into the modules' buffers. A private method.
+        """
+        glyphs = self.glyphs
+        index = 0
+        for module in self.modules:
+            buff = module.buffer
+            buff[0] = glyphs[index]
+            buff[2] = glyphs[index + 1]
+            buff[6] = glyphs[index + 2]
+            buff[8] = glyphs[index + 3]
+            index += 4
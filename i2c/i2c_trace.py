@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+
+"""
+Record I2C traffic to a compact binary trace, and replay it against a bus.
+
+TraceRecorder wraps a busio.I2C object, or anything like it, and writes every
+transfer made through it to a file. replay() sends a recorded trace to a bus, real
+or simulated, either as fast as it will go or with the original timing, and reports
+throughput and per-transfer latency. One captured session can then be used to
+benchmark driver and bus changes against exactly the same workload.
+
+    python3 i2c_trace.py record macinfo.trace macinfo_128x64.py
+    python3 i2c_trace.py info macinfo.trace
+    python3 i2c_trace.py replay macinfo.trace
+    python3 i2c_trace.py replay macinfo.trace --realtime --hardware
+
+'record' runs the script with busio.I2C wrapped by a TraceRecorder; press Ctrl-C
+to end the session. If the script opens more than one bus, all of them record into
+the one trace, in the order their transfers were made. 'replay' uses a SimulatedI2C unless '--hardware' is given.
+
+File format: the header 'I2CT', a version byte and three bytes of padding, then one
+record per transfer: a 12-byte header (microseconds since the start of recording as
+an unsigned 64-bit value, the operation, the 7-bit address and the payload length as
+an unsigned 16-bit value, all little-endian) followed by the payload. A read's
+payload is the data read.
+"""
+
+# IMPORTS
+import sys
+import time
+import struct
+
+# CONSTANTS
+MAGIC = b"I2CT"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB3x")
+RECORD = struct.Struct("<QBBH")
+
+# Operations. FAILED is or-ed in when the transfer raised an error
+WRITE = 0x00
+READ = 0x01
+FAILED = 0x80
+
+
+# CLASSES
+class TraceRecorder:
+    """
+    Wraps an I2C object and writes each transfer made through it to a trace file
+    """
+
+    def __init__(self, i2c, path, shared=None):
+        """
+        Args:
+            i2c (busio.I2C) The bus to wrap
+            path (string) The trace file to write
+            shared (TraceRecorder) Another recorder whose trace file and clock to use, so that
+                                   several buses record into one trace; 'path' is then
+                                   ignored. Default: None
+        """
+        self.i2c = i2c
+        self.shared = shared
+        if shared is None:
+            self.file = open(path, "wb")
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+            self.start = time.perf_counter()
+        else:
+            self.file = shared.file
+            self.start = shared.start
+        self.records = 0
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        if end is None: end = len(buffer)
+        op = WRITE
+        stamp = time.perf_counter()
+        try:
+            self.i2c.writeto(address, buffer, start=start, end=end)
+        except Exception:
+            op |= FAILED
+            raise
+        finally:
+            self.record(stamp, op, address, buffer[start:end])
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        if end is None: end = len(buffer)
+        op = READ
+        stamp = time.perf_counter()
+        try:
+            self.i2c.readfrom_into(address, buffer, start=start, end=end)
+        except Exception:
+            op |= FAILED
+            raise
+        finally:
+            self.record(stamp, op, address, buffer[start:end])
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer, *, out_start=0, out_end=None, in_start=0, in_end=None):
+        # Recorded as a write and a read, though they go out as one transfer
+        if out_end is None: out_end = len(out_buffer)
+        if in_end is None: in_end = len(in_buffer)
+        stamp = time.perf_counter()
+        op = WRITE
+        try:
+            self.i2c.writeto_then_readfrom(address, out_buffer, in_buffer, out_start=out_start, out_end=out_end,
+                                           in_start=in_start, in_end=in_end)
+        except Exception:
+            op |= FAILED
+            raise
+        finally:
+            self.record(stamp, op, address, out_buffer[out_start:out_end])
+            self.record(stamp, READ | (op & FAILED), address, in_buffer[in_start:in_end])
+
+    def close(self):
+        """
+        Finish the trace file. A recorder which shares another's file leaves it to that one
+        """
+        if self.shared is None and self.file.closed is False: self.file.close()
+
+    def __getattr__(self, name):
+        # Eg. try_lock(), unlock() and scan()
+        return getattr(self.i2c, name)
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def record(self, stamp, op, address, payload):
+        # One write per record, so records from buses on other threads never interleave
+        self.file.write(RECORD.pack(int((stamp - self.start) * 1000000), op, address, len(payload)) + bytes(payload))
+        self.records += 1
+
+
+# FUNCTIONS
+def read_trace(path):
+    """
+    Read a trace file
+
+    Args:
+        path (string) The trace file
+
+    Returns:
+        A list of (seconds since the start, operation, address, payload) tuples
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    (magic, version) = FILE_HEADER.unpack_from(data, 0)
+    if magic != MAGIC: raise ValueError("{} is not an I2C trace".format(path))
+    if version != VERSION: raise ValueError("{} is a version {} trace; version {} is supported".format(path, version, VERSION))
+
+    records = []
+    index = FILE_HEADER.size
+    while index + RECORD.size <= len(data):
+        (stamp, op, address, length) = RECORD.unpack_from(data, index)
+        index += RECORD.size
+        records.append((stamp / 1000000, op, address, data[index:index + length]))
+        index += length
+    return records
+
+
+def replay(records, bus, realtime=False, skip_failed=True):
+    """
+    Send recorded transfers to a bus
+
+    Args:
+        records (list) Transfers, as returned by read_trace()
+        bus (busio.I2C) The bus to send them to, eg. a SimulatedI2C
+        realtime (bool) Keep the recorded gaps between transfers (True) or go as fast as possible (False). Default: False
+        skip_failed (bool) Leave out transfers which failed when recorded. Default: True
+
+    Returns:
+        A dictionary giving the number of transfers, bytes and errors, the time taken,
+        the latency of each transfer in seconds and, for a SimulatedI2C, its simulated time
+    """
+    latencies = []
+    count = 0
+    errors = 0
+    buffer = bytearray(65536)
+    simulated = getattr(bus, "elapsed", None)
+    start = time.perf_counter()
+    for (stamp, op, address, payload) in records:
+        if skip_failed is True and op & FAILED: continue
+        if realtime is True:
+            wait = start + stamp - time.perf_counter()
+            if wait > 0: time.sleep(wait)
+        began = time.perf_counter()
+        try:
+            if op & READ:
+                bus.readfrom_into(address, buffer, start=0, end=len(payload))
+            else:
+                bus.writeto(address, payload)
+            count += len(payload)
+        except (OSError, RuntimeError):
+            errors += 1
+        latencies.append(time.perf_counter() - began)
+    result = {"transfers": len(latencies), "bytes": count, "errors": errors,
+              "elapsed": time.perf_counter() - start, "latencies": latencies}
+    if simulated is not None: result["simulated"] = bus.elapsed - simulated
+    return result
+
+
+def summarise(result):
+    """
+    Returns:
+        A replay() result as text: throughput and latency percentiles
+    """
+    ordered = sorted(result["latencies"])
+    if len(ordered) == 0: return "No transfers"
+
+    def rank(percent):
+        return ordered[min(len(ordered) - 1, int(percent / 100 * len(ordered)))] * 1000
+
+    text = "{} transfers, {} bytes, {} errors in {:.3f} s: {:.1f} KB/s; latency p50 {:.3f} ms p95 {:.3f} ms max {:.3f} ms".format(
+        result["transfers"], result["bytes"], result["errors"], result["elapsed"],
+        result["bytes"] / result["elapsed"] / 1024 if result["elapsed"] > 0 else 0, rank(50), rank(95), ordered[-1] * 1000)
+    if "simulated" in result:
+        simulated = result["simulated"]
+        text += "\nSimulated MCP2221 time {:.3f} s: {:.1f} KB/s".format(simulated, result["bytes"] / simulated / 1024 if simulated > 0 else 0)
+    return text
+
+
+def record_script(path, script, args):
+    # Run an example script with every busio.I2C it creates wrapped by a recorder
+    import runpy
+    import busio
+    recorders = []
+    original = busio.I2C
+
+    def recording_i2c(*i2c_args, **i2c_kwargs):
+        # The first bus opens the trace file; any others record into it too
+        recorder = TraceRecorder(original(*i2c_args, **i2c_kwargs), path, recorders[0] if len(recorders) > 0 else None)
+        recorders.append(recorder)
+        return recorder
+
+    busio.I2C = recording_i2c
+    sys.argv = [script] + args
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        busio.I2C = original
+        for recorder in recorders: recorder.close()
+        print("Recorded {} transfers to {}".format(sum(recorder.records for recorder in recorders), path))
+
+
+# START
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Record and replay I2C traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="run a script, recording its I2C traffic")
+    record.add_argument("trace", help="the trace file to write")
+    record.add_argument("script", help="the script to run")
+    record.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the script")
+    info = commands.add_parser("info", help="summarise a trace")
+    info.add_argument("trace", help="the trace file to read")
+    play = commands.add_parser("replay", help="send a trace to a bus")
+    play.add_argument("trace", help="the trace file to read")
+    play.add_argument("--realtime", action="store_true", help="keep the recorded timing")
+    play.add_argument("--hardware", action="store_true", help="use the MCP2221 rather than a simulated bus")
+    play.add_argument("--frequency", type=int, default=100000, help="the simulated bus clock in Hz (default: 100000)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record_script(args.trace, args.script, args.args)
+    elif args.command == "info":
+        records = read_trace(args.trace)
+        addresses = sorted(set(r[2] for r in records))
+        length = records[-1][0] if len(records) > 0 else 0
+        print("{} transfers over {:.3f} s to {}".format(len(records), length, ", ".join("0x{:02X}".format(a) for a in addresses)))
+        for address in addresses:
+            ours = [r for r in records if r[2] == address]
+            written = sum(len(r[3]) for r in ours if r[1] & READ == 0)
+            read = sum(len(r[3]) for r in ours if r[1] & READ)
+            failed = sum(1 for r in ours if r[1] & FAILED)
+            print("  0x{:02X}: {} transfers, {} bytes written, {} bytes read, {} failed".format(address, len(ours), written, read, failed))
+    else:
+        if args.hardware is True:
+            import board
+            import busio
+            bus = busio.I2C(board.SCL, board.SDA)
+        else:
+            from mcp2221_sim import SimulatedI2C
+            bus = SimulatedI2C(frequency=args.frequency, record=False)
+        print(summarise(replay(read_trace(args.trace), bus, args.realtime)))
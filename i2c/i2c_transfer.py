@@ -0,0 +1,73 @@
+class TransferPlanner:
+    """
+    A thin layer between a display driver and a busio.I2C object which bounds the
+    size of each I2C transaction and retries a transaction that fails.
+
+    Pass a TransferPlanner to SSD1306OLED or HT16K33Segment in place of the I2C object.
+    The drivers read 'max_transaction' and split their writes into self-contained
+    transactions no larger than that: each carries its own display address, so a
+    failed one can be sent again on its own without re-sending the whole frame.
+    Everything else is passed through to the wrapped bus.
+    """
+
+    # The MCP2221 carries up to 60 bytes of I2C data in each USB HID report
+    MCP2221_REPORT_SIZE = 60
+
+    def __init__(self, i2c, max_transaction=None, retries=2):
+        """
+        Args:
+            i2c (busio.I2C) The bus to write to
+            max_transaction (int) The largest write, in bytes, to issue, or None for no limit. Default: None
+            retries (int) How many times to re-send a failed write before giving up. Default: 2
+        """
+        if max_transaction is not None and max_transaction < 16:
+            raise ValueError("max_transaction must be at least 16 bytes")
+        self.i2c = i2c
+        self.max_transaction = max_transaction
+        self.retries = retries
+        self.transactions = 0
+        self.retried = 0
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        """
+        Write bytes to a device, re-sending them if the write fails.
+        The caller is responsible for keeping writes within 'max_transaction'
+
+        Args:
+            address (int) The device's I2C address
+            buffer (bytes-like) The data to write
+            start (int) The index of the first byte to write. Default: 0
+            end (int) The index after the last byte to write. Default: the end of the buffer
+        """
+        if end is None: end = len(buffer)
+        attempt = 0
+        while True:
+            try:
+                self.i2c.writeto(address, buffer, start=start, end=end)
+                self.transactions += 1
+                return
+            except (OSError, RuntimeError):
+                # Blinka's MCP2221 backend reports bus errors as RuntimeError
+                if attempt >= self.retries: raise
+                attempt += 1
+                self.retried += 1
+
+    def chunks(self, length, overhead=0):
+        """
+        Split a write of 'length' bytes into pieces which, with 'overhead' bytes of
+        addressing added to each, fit within 'max_transaction'
+
+        Args:
+            length (int) The number of data bytes to send
+            overhead (int) The number of extra bytes each transaction carries. Default: 0
+
+        Returns:
+            A list of (start, end) offsets into the data
+        """
+        if self.max_transaction is None: return [(0, length)]
+        step = self.max_transaction - overhead
+        return [(i, min(i + step, length)) for i in range(0, length, step)]
+
+    def __getattr__(self, name):
+        # Anything else, eg. readfrom_into() or try_lock(), goes to the bus itself
+        return getattr(self.i2c, name)
@@ -6,12 +6,23 @@ import datetime
 import board
 import busio
 import digitalio
-import psutil
 from ssd1306_circuitpython import SSD1306OLED
+from render_worker import RenderWorker
+from ssd1306_widgets import Screen, Label, ValueField
+from metrics_sampler import MetricsSampler, psutil_metrics
+from frame_pacer import FramePacer
 
 # CONSTANTS
 DELAY = 0.5
 
+# FUNCTIONS
+def show(field, value):
+    # A figure which has yet to be read shows as a dash
+    if value is None:
+        field.set_text("-")
+    else:
+        field.set(value)
+
 # START
 if __name__ == '__main__':
     # Set up I2C on the MCP2221 Breakout
@@ -25,72 +36,82 @@ if __name__ == '__main__':
     display.set_inverse()
     display_is_inverse = True
 
-    # Get initial values
-    data = psutil.net_io_counters()
-    start_out_packets = data.packets_sent
-    start_in_packets = data.packets_recv
+    # Send frames from a background thread, so sampling continues during each transfer
+    RenderWorker(display).start()
+
+    # Read the system's figures in the background, so drawing never waits for them
+    sampler = MetricsSampler(*psutil_metrics()).start()
+    values = sampler.snapshot()
+
+    # Get initial values, if the network counters could be read
+    data = values["network"]
+    start_out_packets = None if data is None else data.packets_sent
+    start_in_packets = None if data is None else data.packets_recv
     out_packets = 0
     in_packets = 0
     head = "**SYSTEM INFORMATION**"
     length = display.length_of_string(head)
     head_centre = int((128 - length) / 2)
     if head_centre < 0: head_centre = 0
-    logical_cores = int(psutil.cpu_count())
-    physical_cores = int(psutil.cpu_count(False))
+    cores = "Cores: " + str(values["cores"]) + "/" + str(values["physical"])
+    boot = datetime.datetime.fromtimestamp(values["boot_time"]).strftime("%d/%m @ %H:%M")
+
+    # Lay out the screen. The labels are drawn once; each value is redrawn,
+    # and sent, only when its text changes
+    screen = Screen(display)
+    for (x, y, text) in ((head_centre, 0, head), (1, 8, "CPU:"), (58, 8, cores), (1, 16, "Mem:"),
+                         (58, 16, "Swap:"), (1, 24, "Disk:"), (1, 32, "Booted:"), (58, 32, boot),
+                         (1, 40, "Pkts in:"), (1, 48, "Pkts out:")):
+        screen.add(Label(display, x, y, text))
+    cpu = screen.add(ValueField(display, 30, 8, 26, "{:.0f}%"))
+    mem = screen.add(ValueField(display, 24, 16, 34, "{:.1f}%"))
+    swap = screen.add(ValueField(display, 90, 16, 38, "{:.1f}%"))
+    disk = screen.add(ValueField(display, 58, 24, 70, "{:.1f}%"))
+    packets_in = screen.add(ValueField(display, 58, 40, 70))
+    packets_out = screen.add(ValueField(display, 58, 48, 70))
+    # The battery line is one field across the screen, to fit "No battery (desktop)"
+    battery = screen.add(ValueField(display, 1, 56, 127, "Battery: {:.1f}%"))
+
+    pacer = FramePacer(DELAY)
 
     while True:
-        # Get the CPU utilization and calculate
-        # the Binary-Coded Decimal (BCD) form
-        display.clear()
-        display.move(head_centre, 0).text(head)
-        display.move(1, 8).text("CPU:")
-        display.move(58, 8).text("Cores: " + str(logical_cores) + "/" + str(physical_cores))
-        display.move(1, 16).text("Mem:")
-        display.move(58, 16).text("Swap:")
-        display.move(1, 24).text("Disk:")
-        display.move(1, 32).text("Booted:")
-        display.move(1, 40).text("Pkts in:")
-        display.move(1, 48).text("Pkts out:")
-
-        cpu = int(psutil.cpu_percent())
-        display.move(30, 8).text(str(cpu) + "%")
-
-        data = psutil.virtual_memory()
-        mem = (data.used / data.total) * 100
-        display.move(24, 16).text("{:.1f}%".format(mem))
-
-        data = psutil.swap_memory()
-        mem = 0 if data.total == 0 else (data.used / data.total) * 100
-        display.move(90, 16).text("{:.1f}%".format(mem))
-
-        data = psutil.disk_usage('/')
-        display.move(58, 24).text("{:.1f}%".format(data.percent))
-
-        data = psutil.boot_time()
-        boot = datetime.datetime.fromtimestamp(psutil.boot_time()).strftime("%d/%m @ %H:%M")
-        display.move(58, 32).text(boot)
-
-        data = psutil.net_io_counters()
-        in_packets = data.packets_recv - start_in_packets
-        if in_packets > 9999999:
-            start_in_packets = data.packets_recv
-            in_packets = 0
-        display.move(58, 40).text(str(in_packets))
-
-        out_packets = data.packets_sent - start_out_packets
-        if out_packets > 9999999:
-            start_out_packets = data.packets_sent
-            out_packets = 0
-        display.move(58, 48).text(str(out_packets))
-
-        batt = psutil.sensors_battery()
+        # Get the latest figures
+        values = sampler.snapshot()
+
+        show(cpu, None if values["cpu"] is None else int(values["cpu"]))
+        show(mem, values["memory"])
+        show(swap, values["swap"])
+        show(disk, values["disk"])
+
+        data = values["network"]
+        if data is None:
+            packets_in.set_text("-")
+            packets_out.set_text("-")
+        else:
+            if start_in_packets is None:
+                start_in_packets = data.packets_recv
+                start_out_packets = data.packets_sent
+
+            in_packets = data.packets_recv - start_in_packets
+            if in_packets > 9999999:
+                start_in_packets = data.packets_recv
+                in_packets = 0
+            packets_in.set(in_packets)
+
+            out_packets = data.packets_sent - start_out_packets
+            if out_packets > 9999999:
+                start_out_packets = data.packets_sent
+                out_packets = 0
+            packets_out.set(out_packets)
+
+        batt = values["battery"]
         if batt == None:
-            display.move(1, 56).text("No battery (desktop)")
+            battery.set_text("No battery (desktop)")
         else:
-            display.move(1, 56).text("Battery:")
-            display.move(58, 56).text("{:.1f}%".format(batt.percent))
+            battery.set(batt.percent)
 
-        display.draw()
+        # Repaint and send only the values which have changed
+        screen.draw()
 
-        # Pause for breath
-        time.sleep(DELAY)
\ No newline at end of file
+        # Wait for the next frame
+        pacer.wait()
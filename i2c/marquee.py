@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+# IMPORTS
+import socket
+import board
+import busio
+from htk1633segment_circuitpython import HT16K33Segment
+
+# CONSTANTS
+DELAY = 0.3
+
+
+# FUNCTIONS
+def get_address():
+    # The address of the interface used to reach the Internet. A UDP socket sends
+    # nothing when it connects, so this works offline too
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("10.254.254.254", 1))
+        return sock.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+    finally:
+        sock.close()
+
+
+# START
+if __name__ == '__main__':
+    # Set up I2C on the MCP2221 Breakout
+    # and instantiate the display
+    i2c = busio.I2C(board.SCL, board.SDA)
+    display = HT16K33Segment(i2c)
+    display.set_brightness(4)
+
+    # Scroll the Mac's IP address across the display until interrupted
+    frames = display.compile_marquee(get_address())
+    try:
+        display.play_marquee(frames, DELAY, None)
+    except KeyboardInterrupt:
+        display.clear()
+        display.update()
@@ -0,0 +1,201 @@
+"""
+A stand-in for busio.I2C on an MCP2221, for running the drivers without hardware.
+
+SimulatedI2C accepts the same calls as busio.I2C, so SSD1306OLED and HT16K33Segment
+take it unchanged. It records every transfer and works out how long each would have
+taken through an MCP2221, which carries I2C over USB HID:
+
+    - Each transfer starts with a USB round trip to set it up ('report_latency')
+    - Its data travels in 64-byte HID reports with up to 60 bytes of payload each,
+      one round trip per report
+    - On the bus, the address and every data byte take nine clocks at 'frequency'
+
+Devices can be attached at an address to receive writes and answer reads:
+
+    bus = SimulatedI2C(frequency=400000)
+    display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64)
+    display.draw()
+    print(bus.report())
+"""
+
+# IMPORTS
+import time
+import random
+from collections import namedtuple
+
+# CONSTANTS
+REPORT_PAYLOAD = 60
+
+# One recorded transfer. 'kind' is 'write' or 'read', 'data' the bytes written or
+# read, 'elapsed' the simulated time taken in seconds and 'ok' False if it failed
+Operation = namedtuple("Operation", ("kind", "address", "data", "elapsed", "ok"))
+
+
+# CLASSES
+class SimulatedPin:
+    """
+    Stands in for a digitalio.DigitalInOut, eg. the OLED's RST pin
+    """
+    def __init__(self):
+        self.value = False
+        self.direction = None
+
+
+class SimulatedI2C:
+    """
+    Stands in for busio.I2C connected through an MCP2221
+    """
+
+    def __init__(self, frequency=100000, report_latency=0.001, failure_rate=0.0, realtime=False, record=True):
+        """
+        Args:
+            frequency (int) The I2C clock, in Hz. Default: 100000
+            report_latency (float) The time for one USB HID report round trip, in seconds. Default: 0.001
+            failure_rate (float) The chance, 0 to 1, that any one HID report fails. Default: 0
+            realtime (bool) Make each transfer really take as long as it would on hardware. Default: False
+            record (bool) Keep a log of every transfer in 'log'. Default: True
+        """
+        self.frequency = frequency
+        self.report_latency = report_latency
+        self.failure_rate = failure_rate
+        self.realtime = realtime
+        self.record = record
+        self.devices = {}
+        self.locked = False
+        self.log = []
+        self.reset()
+
+    def reset(self):
+        """
+        Zero the counters and empty the log
+        """
+        self.elapsed = 0.0
+        self.transactions = 0
+        self.bytes = 0
+        self.reports = 0
+        self.failures = 0
+        del self.log[:]
+
+    def attach(self, address, device):
+        """
+        Put a device on the bus. Once any device is attached, transfers to an address
+        with no device fail, as they would on hardware
+
+        Args:
+            address (int) The device's I2C address
+            device (object) Has 'write(data)' to receive writes and/or 'read(count)',
+                            returning bytes, to answer reads
+        """
+        self.devices[address] = device
+
+    def scan(self):
+        """
+        Returns:
+            A list of the addresses of the attached devices
+        """
+        return sorted(self.devices)
+
+    def try_lock(self):
+        if self.locked is True: return False
+        self.locked = True
+        return True
+
+    def unlock(self):
+        self.locked = False
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.deinit()
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        """
+        Write bytes to a device
+
+        Args:
+            address (int) The device's I2C address
+            buffer (bytes-like) The data to write
+            start (int) The index of the first byte to write. Default: 0
+            end (int) The index after the last byte to write. Default: the end of the buffer
+        """
+        if end is None: end = len(buffer)
+        self.transfer("write", address, buffer, start, end)
+        device = self.devices.get(address)
+        if device is not None and hasattr(device, "write"): device.write(bytes(buffer[start:end]))
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        """
+        Read bytes from a device. With no device attached, zeros are read
+
+        Args:
+            address (int) The device's I2C address
+            buffer (bytearray) Where to put the data
+            start (int) The index of the first byte to fill. Default: 0
+            end (int) The index after the last byte to fill. Default: the end of the buffer
+        """
+        if end is None: end = len(buffer)
+        device = self.devices.get(address)
+        data = device.read(end - start) if device is not None and hasattr(device, "read") else bytes(end - start)
+        self.transfer("read", address, data, 0, len(data))
+        buffer[start:end] = data
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer, *, out_start=0, out_end=None, in_start=0, in_end=None):
+        """
+        Write bytes to a device, then read its reply, eg. the contents of a register
+        """
+        self.writeto(address, out_buffer, start=out_start, end=out_end)
+        self.readfrom_into(address, in_buffer, start=in_start, end=in_end)
+
+    def report(self):
+        """
+        Summarise the recorded transfers by kind
+
+        Returns:
+            A multi-line string giving, for each kind, the number of transfers, bytes,
+            simulated time and throughput
+        """
+        lines = ["{} transfers, {} bytes, {} HID reports, {:.1f} ms simulated, {} failed".format(
+            self.transactions, self.bytes, self.reports, self.elapsed * 1000, self.failures)]
+        for kind in ("write", "read"):
+            ops = [op for op in self.log if op.kind == kind]
+            if len(ops) == 0: continue
+            count = sum(len(op.data) for op in ops)
+            taken = sum(op.elapsed for op in ops)
+            lines.append("  {:<5} {:5d} x  {:7d} bytes  {:9.2f} ms  {:7.3f} ms each  {:6.1f} KB/s".format(
+                kind, len(ops), count, taken * 1000, taken * 1000 / len(ops), count / taken / 1024 if taken > 0 else 0))
+        return "\n".join(lines)
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def transfer(self, kind, address, data, start, end):
+        # Account for one transfer of data[start:end], failing it if its device is
+        # missing or one of its HID reports is lost
+        count = end - start
+        taken = self.report_latency
+        reports = 0
+        failed = len(self.devices) > 0 and address not in self.devices
+        if failed is False:
+            for offset in range(0, count, REPORT_PAYLOAD):
+                part = min(REPORT_PAYLOAD, count - offset)
+                taken += self.report_latency + ((part + (1 if offset == 0 else 0)) * 9) / self.frequency
+                reports += 1
+                if self.failure_rate > 0 and random.random() < self.failure_rate:
+                    failed = True
+                    break
+
+        self.elapsed += taken
+        self.reports += reports
+        if self.realtime is True: time.sleep(taken)
+        if self.record is True: self.log.append(Operation(kind, address, bytes(data[start:end]), taken, not failed))
+        if failed is True:
+            # As Blinka's MCP2221 backend reports it
+            self.failures += 1
+            if address not in self.devices and len(self.devices) > 0:
+                raise RuntimeError("I2C slave address was NACK'd")
+            raise RuntimeError("I2C write error" if kind == "write" else "I2C read error")
+        self.transactions += 1
+        self.bytes += count
@@ -0,0 +1,207 @@
+"""
+Collect system metrics on a background thread for the dashboard examples.
+
+A MetricsSampler calls each of its metric functions at that metric's own rate, on a
+thread of its own, so a display loop never waits for psutil. The loop reads the
+latest values with 'snapshot()', which returns at once: each new reading replaces
+the snapshot as a whole, so a snapshot is never half-updated and never changes
+after it has been taken. Recent readings of each metric are kept in a ring buffer
+for charts and rates. Values which do not change, such as the number of cores and
+the boot time, are read once, when the sampler is created. Every metric is in the
+snapshot from the start: until it has been read successfully, its value is None.
+
+    sampler = MetricsSampler(*psutil_metrics()).start()
+    while True:
+        values = sampler.snapshot()
+        if values["cpu"] is not None: display.move(30, 8).text(str(int(values["cpu"])) + "%")
+        ...
+"""
+
+# IMPORTS
+import time
+import threading
+from collections import deque
+
+
+# CLASSES
+class MetricsSampler:
+    """
+    Samples metric functions at their own rates on a background thread
+    """
+
+    def __init__(self, metrics=None, static=None, history=60):
+        """
+        Args:
+            metrics (dict) Metric name: (function, interval in seconds) for each metric to sample. Default: none
+            static (dict) Metric name: function for each value to read once, now. Default: none
+            history (int) The number of recent readings to keep for each metric. Default: 60
+        """
+        self.history = history
+        self.functions = {}
+        self.intervals = {}
+        self.due = {}
+        self.rings = {}
+        self.values = {}
+        self.thread = None
+        self.running = False
+        self.wake = threading.Event()
+        self.errors = 0
+        self.error = None
+
+        if static is not None:
+            for (name, function) in static.items(): self.values[name] = function()
+        if metrics is not None:
+            for (name, (function, interval)) in metrics.items(): self.add(name, function, interval)
+
+    def add(self, name, function, interval):
+        """
+        Add a metric, or change an existing one. It is first sampled at once; until then,
+        or until a reading succeeds, its value in the snapshot is None
+
+        Args:
+            name (string) The metric's key in the snapshot
+            function (callable) Called with no arguments to take a reading
+            interval (float) The time between readings, in seconds
+        """
+        self.functions[name] = function
+        self.intervals[name] = interval
+        self.due[name] = 0
+        if name not in self.rings: self.rings[name] = deque(maxlen=self.history)
+        if name not in self.values:
+            values = dict(self.values)
+            values[name] = None
+            self.values = values
+        self.wake.set()
+
+    def start(self):
+        """
+        Take a first reading of every metric, then continue sampling in the background
+
+        Returns:
+            The sampler
+        """
+        if self.running is True: return self
+        self.sample(time.monotonic())
+        self.running = True
+        self.wake.clear()
+        self.thread = threading.Thread(target=self.run, name="MetricsSampler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop sampling. The last snapshot remains available
+        """
+        if self.running is False: return
+        self.running = False
+        self.wake.set()
+        self.thread.join()
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def snapshot(self):
+        """
+        Returns:
+            A dictionary of the latest reading of every metric, and the static values.
+            A metric which has yet to be read successfully is None. It is not changed
+            by later readings
+        """
+        return self.values
+
+    def recent(self, name):
+        """
+        Args:
+            name (string) The metric
+
+        Returns:
+            A list of the metric's recent readings, oldest first
+        """
+        ring = self.rings.get(name)
+        return [] if ring is None else list(ring)
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def sample(self, now):
+        # Read every metric which is due, then publish the readings in a new snapshot
+        readings = {}
+        for name in list(self.functions):
+            if self.due[name] > now: continue
+            try:
+                readings[name] = self.functions[name]()
+            except Exception as error:
+                # Keep the last good reading
+                self.errors += 1
+                self.error = error
+            # Keep to the metric's own schedule, unless it has fallen a whole interval behind
+            self.due[name] += self.intervals[name]
+            if self.due[name] <= now: self.due[name] = now + self.intervals[name]
+
+        if len(readings) > 0:
+            values = dict(self.values)
+            values.update(readings)
+            for (name, value) in readings.items(): self.rings[name].append(value)
+            self.values = values
+
+    def run(self):
+        while self.running is True:
+            self.sample(time.monotonic())
+            wait = min(list(self.due.values()), default=time.monotonic() + 1) - time.monotonic()
+            if wait > 0: self.wake.wait(wait)
+            self.wake.clear()
+
+
+# FUNCTIONS
+def psutil_metrics(cpu=0.5, memory=1.0, disk=10.0, network=0.5, battery=30.0):
+    """
+    The metrics shown by the dashboard examples, read with psutil
+
+    Args:
+        cpu (float) Seconds between CPU utilization readings. Default: 0.5
+        memory (float) Seconds between memory and swap readings. Default: 1
+        disk (float) Seconds between disk usage readings. Default: 10
+        network (float) Seconds between network counter readings. Default: 0.5
+        battery (float) Seconds between battery readings. Default: 30
+
+    Returns:
+        A (metrics, static) tuple to pass to MetricsSampler, giving:
+            cpu       CPU utilization since the last reading, as a percentage
+            memory    Memory in use, as a percentage
+            swap      Swap in use, as a percentage
+            disk      Usage of the root volume, as a percentage
+            network   psutil's network I/O counters
+            battery   psutil's battery status, or None on a machine without one
+            cores     The number of logical cores
+            physical  The number of physical cores
+            boot_time The time the machine was started, in seconds since the epoch
+    """
+    import psutil
+
+    def swap():
+        data = psutil.swap_memory()
+        return 0.0 if data.total == 0 else data.used / data.total * 100
+
+    def memory_used():
+        data = psutil.virtual_memory()
+        return data.used / data.total * 100
+
+    # The first reading of cpu_percent() is meaningless: it starts the measurement
+    psutil.cpu_percent()
+    metrics = {
+        "cpu": (psutil.cpu_percent, cpu),
+        "memory": (memory_used, memory),
+        "swap": (swap, memory),
+        "disk": (lambda: psutil.disk_usage("/").percent, disk),
+        "network": (psutil.net_io_counters, network),
+        "battery": (psutil.sensors_battery, battery)
+    }
+    static = {
+        "cores": lambda: int(psutil.cpu_count()),
+        "physical": lambda: int(psutil.cpu_count(False)),
+        "boot_time": psutil.boot_time
+    }
+    return (metrics, static)
@@ -1,11 +1,11 @@
 #!/usr/bin/env python
 
 # IMPORTS
-import time
 import board
 import busio
-import psutil
 from htk1633segment_circuitpython import HT16K33Segment
+from metrics_sampler import MetricsSampler, psutil_metrics
+from frame_pacer import FramePacer
 
 # CONSTANTS
 DELAY = 0.5
@@ -17,27 +17,30 @@ if __name__ == '__main__':
     i2c = busio.I2C(board.SCL, board.SDA)
     display = HT16K33Segment(i2c)
 
-    # Get initial values
-    data = psutil.net_io_counters()
-    start_packets = data.packets_recv
+    # Read the network counters in the background
+    (metrics, static) = psutil_metrics(network=DELAY)
+    sampler = MetricsSampler({"network": metrics["network"]}).start()
+
+    # Get initial values, if the counters could be read
+    data = sampler.snapshot()["network"]
+    start_packets = None if data is None else data.packets_recv
     packets = 0
 
+    pacer = FramePacer(DELAY)
+
     while True:
-        # Get the CPU utilization and calculate
-        # the Binary-Coded Decimal (BCD) form
-        data = psutil.net_io_counters()
-        packets = data.packets_recv - start_packets
-        if packets > 9999:
-            start_packets = data.packets_recv
-            packets = 0
-
-        # Display the percentage as decimal digits
-        bcd = int(str(packets), 16)
-        display.set_number((bcd & 0xF000) >> 12, 0)
-        display.set_number((bcd & 0x0F00) >> 8, 1)
-        display.set_number((bcd & 0xF0) >> 4, 2)
-        display.set_number((bcd & 0x0F), 3)
-        display.update()
-
-        # Pause for breath
-        time.sleep(DELAY)
\ No newline at end of file
+        # Get the latest packet count, once the counters have been read
+        data = sampler.snapshot()["network"]
+        if data is not None:
+            if start_packets is None: start_packets = data.packets_recv
+            packets = data.packets_recv - start_packets
+            if packets > 9999:
+                start_packets = data.packets_recv
+                packets = 0
+
+            # Display the packet count as decimal digits
+            display.set_value(packets, pad="0")
+            display.update()
+
+        # Wait for the next frame
+        pacer.wait()
\ No newline at end of file
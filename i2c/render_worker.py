@@ -0,0 +1,324 @@
+import asyncio
+import threading
+
+
+class LockedI2C:
+    """
+    Wraps an I2C object so that transfers made by a render worker and by the drawing code,
+    eg. a command sent while a frame is going out, never interleave on the bus.
+    The worker holds the same lock for the whole of each frame it renders.
+    Everything other than a transfer is passed through to the wrapped bus.
+    """
+
+    def __init__(self, i2c, lock):
+        """
+        Args:
+            i2c (busio.I2C) The bus to write to
+            lock (threading.RLock) The lock to hold during each transfer
+        """
+        self.i2c = i2c
+        self.lock = lock
+
+    def writeto(self, address, buffer, **kwargs):
+        with self.lock: self.i2c.writeto(address, buffer, **kwargs)
+
+    def readfrom_into(self, address, buffer, **kwargs):
+        with self.lock: self.i2c.readfrom_into(address, buffer, **kwargs)
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer, **kwargs):
+        with self.lock: self.i2c.writeto_then_readfrom(address, out_buffer, in_buffer, **kwargs)
+
+    def __getattr__(self, name):
+        # Eg. 'max_transaction' and 'chunks()' from a TransferPlanner
+        return getattr(self.i2c, name)
+
+
+class RenderWorker:
+    """
+    Sends an SSD1306OLED's or HT16K33Segment's frames to the display from a background
+    thread, so that the code which draws them need not wait for the I2C bus.
+
+    Once started, the display's draw() or update() takes a snapshot of the buffer and
+    returns at once. If a new frame is drawn before the last one has gone out, the waiting
+    frame is brought up to date rather than queued behind it: the newest frame always wins
+    and the worker never falls behind. 'flush()' waits for the last frame to be sent.
+
+        display = SSD1306OLED(reset, i2c, 0x3D, 128, 64)
+        worker = RenderWorker(display).start()
+
+    Counters:
+        submitted  Frames drawn while the worker was running
+        sent       Frames written to the display
+        coalesced  Frames replaced by a newer one before they could be sent
+        dropped    Frames lost to an I2C error, or discarded by 'stop(flush=False)'.
+                   After an error, the next frame is sent in full
+    """
+
+    def __init__(self, display):
+        """
+        Args:
+            display (SSD1306OLED or HT16K33Segment) The display whose frames are to be sent
+        """
+        self.display = display
+        self.lock = threading.RLock()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.busy = False
+
+        # The frame waiting to be sent, and a sent one to re-use for the next snapshot
+        self.pending = None
+        self.spare = None
+
+        self.submitted = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.error = None
+        self.resync = False
+
+    def start(self):
+        """
+        Attach the worker to its display and start sending frames
+
+        Returns:
+            The worker
+        """
+        if self.running is True: return self
+        self.attach()
+        self.thread = threading.Thread(target=self.run, name="RenderWorker", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, flush=True):
+        """
+        Stop the worker and detach it from its display, whose draw() or update()
+        writes to the bus directly once more
+
+        Args:
+            flush (bool) Send any waiting frame first (True) or discard it (False). Default: True
+        """
+        if self.running is False: return
+        if flush is True: self.flush()
+        with self.condition:
+            if self.pending is not None:
+                self.dropped += 1
+                self.pending = None
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join()
+        self.thread = None
+        self.detach()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every frame drawn so far has been sent, or has failed
+
+        Args:
+            timeout (float) The longest time to wait, in seconds, or None to wait indefinitely. Default: None
+
+        Returns:
+            True if the worker is idle, or False if the timeout expired first
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending is None and self.busy is False, timeout)
+
+    def submit(self, data=True):
+        """
+        Called by the display's draw() or update(): take a snapshot of the display
+        buffer and hand it to the worker
+
+        Args:
+            data (bool) Take the buffer and any queued commands (True), or only the commands,
+                        as SSD1306OLED.command() does (False). Default: True
+        """
+        with self.condition:
+            self.capture(data)
+            self.condition.notify_all()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def attach(self):
+        # Serialise the display's own transfers, eg. commands, with the worker's
+        self.display.i2c = LockedI2C(self.display.i2c, self.lock)
+        self.display.worker = self
+        self.running = True
+
+    def detach(self):
+        self.display.worker = None
+        self.display.i2c = self.display.i2c.i2c
+
+    def capture(self, data=True):
+        # Snapshot the display into the waiting frame, if there is one, or the spare
+        if data is False:
+            # Commands only: they go with the waiting frame, or in a frame of their own
+            if self.pending is None:
+                self.pending = self.display.snapshot(self.spare, False)
+                self.spare = None
+            else:
+                self.display.snapshot(self.pending, False)
+            return
+        if self.resync is True:
+            # A frame failed part-way through, so send everything with this one
+            if hasattr(self.display, "mark_dirty"): self.display.mark_dirty()
+            self.resync = False
+        self.submitted += 1
+        if self.pending is not None:
+            self.coalesced += 1
+            self.display.snapshot(self.pending)
+        else:
+            self.pending = self.display.snapshot(self.spare)
+            self.spare = None
+
+    def render(self, frame):
+        # Send a frame, holding the bus for its duration. Returns the error, if any
+        try:
+            with self.lock: self.display.render(frame)
+        except Exception as err:
+            return err
+        return None
+
+    def finished(self, frame, error):
+        # Book-keeping once a frame has been rendered
+        if error is None:
+            self.sent += 1
+        else:
+            self.dropped += 1
+            self.error = error
+            self.resync = True
+        self.spare = frame
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending is not None or self.running is False)
+                if self.pending is None: return
+                frame = self.pending
+                self.pending = None
+                self.busy = True
+            error = self.render(frame)
+            with self.condition:
+                self.finished(frame, error)
+                self.busy = False
+                self.condition.notify_all()
+
+
+class AsyncRenderWorker(RenderWorker):
+    """
+    A RenderWorker for asyncio programs. Frames are sent by a task on the running event
+    loop, which hands each transfer to an executor thread so the loop is never blocked
+    by the bus. draw() and update() still return at once; await 'flush()' to wait for
+    the last frame to be sent.
+
+        worker = AsyncRenderWorker(display).start()
+        ...
+        await worker.stop()
+    """
+
+    def __init__(self, display, executor=None):
+        """
+        Args:
+            display (SSD1306OLED or HT16K33Segment) The display whose frames are to be sent
+            executor (concurrent.futures.Executor) Where to run transfers. Default: the loop's default executor
+        """
+        super().__init__(display)
+        self.executor = executor
+        self.task = None
+        self.wake = None
+        self.idle = None
+
+    def start(self):
+        """
+        Attach the worker to its display and start sending frames.
+        Must be called while the event loop is running
+
+        Returns:
+            The worker
+        """
+        if self.running is True: return self
+        self.wake = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.attach()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+        return self
+
+    async def stop(self, flush=True):
+        """
+        Stop the worker and detach it from its display
+
+        Args:
+            flush (bool) Send any waiting frame first (True) or discard it (False). Default: True
+        """
+        if self.running is False: return
+        if flush is True: await self.flush()
+        if self.pending is not None:
+            self.dropped += 1
+            self.pending = None
+        self.running = False
+        self.wake.set()
+        await self.task
+        self.task = None
+        self.detach()
+
+    async def flush(self, timeout=None):
+        """
+        Wait until every frame drawn so far has been sent, or has failed
+
+        Args:
+            timeout (float) The longest time to wait, in seconds, or None to wait indefinitely. Default: None
+
+        Returns:
+            True if the worker is idle, or False if the timeout expired first
+        """
+        try:
+            await asyncio.wait_for(self.idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def submit(self, data=True):
+        """
+        Called by the display's draw() or update() on the event loop's thread: take a
+        snapshot of the display buffer and hand it to the worker
+
+        Args:
+            data (bool) Take the buffer and any queued commands (True), or only the commands,
+                        as SSD1306OLED.command() does (False). Default: True
+        """
+        self.capture(data)
+        self.idle.clear()
+        self.wake.set()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            if self.pending is None:
+                if self.running is False: return
+                continue
+            frame = self.pending
+            self.pending = None
+            self.busy = True
+            error = await loop.run_in_executor(self.executor, self.render, frame)
+            self.finished(frame, error)
+            self.busy = False
+            if self.pending is None:
+                self.idle.set()
+            else:
+                self.wake.set()
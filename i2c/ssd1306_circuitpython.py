@@ -1,10 +1,40 @@
+def _flip_glyphs(charset):
+    # Reverse the bits of each glyph column, as SSD1306OLED.flip() does, and
+    # add the blank column that separates one character from the next
+    glyphs = []
+    for glyph in charset:
+        columns = bytearray(len(glyph) + 1)
+        for i in range(0, len(glyph)):
+            for bit in range(0, 8):
+                if glyph[i] & (1 << bit): columns[i] |= 1 << (7 - bit)
+        glyphs.append(bytes(columns))
+    return tuple(glyphs)
+
+
+class SSD1306Frame:
+    """
+    A copy of an SSD1306OLED's transmit buffer, dirty ranges and queued commands, made by
+    'SSD1306OLED.snapshot()' so that it can be sent by 'render()' while drawing continues.
+    It has the same attributes as the display itself, which render() reads from either
+    """
+
+    def __init__(self, size, pages, width):
+        self.tx_buffer = bytearray(size + 1)
+        self.buffer = memoryview(self.tx_buffer)[1:]
+        self.rows = [self.buffer[page * width:(page + 1) * width] for page in range(0, pages)]
+        self.dirty_lo = [width] * pages
+        self.dirty_hi = [-1] * pages
+        self.cmd_queue = bytearray(1)
+        self.cmd_starts = []
+
+
 class SSD1306OLED:
     """
     A simple driver for the I2C-connected Solomon SSD1306 controller chip and an OLED display.
     For example: https://www.adafruit.com/product/931
     This release is written for CircuitPython
 
-    Version:   1.0.1
+    Version:   1.1.0
     Author:    smittytone
     Copyright: 2020, Tony Smith
     Licence:   MIT
@@ -45,6 +75,20 @@ class SSD1306OLED:
     SSD1306_SETCOMPINS = 0xDA
     SSD1306_SETVCOMDETECT = 0xDB
 
+    # Partial updates: merge the dirty areas of neighbouring pages into a
+    # single address window unless that would send more than this many
+    # unchanged bytes. Each extra window costs two further I2C transactions
+    WINDOW_MERGE_THRESHOLD = 64
+
+    # Hardware scroll step intervals, in frames, and their command values
+    SCROLL_INTERVALS = {2: 0x07, 3: 0x04, 4: 0x05, 5: 0x00, 25: 0x06, 64: 0x01, 128: 0x02, 256: 0x03}
+
+    # A self-contained transaction: COLUMNADDR and PAGEADDR, each byte preceded by
+    # a single-command control byte (0x80), then a data control byte. Column and page
+    # values go at offsets 3, 5, 9 and 11. The data follows
+    CHUNK_HEADER = bytes([0x80, SSD1306_COLUMNADDR, 0x80, 0x00, 0x80, 0x00,
+                          0x80, SSD1306_PAGEADDR, 0x80, 0x00, 0x80, 0x00, SSD1306_WRITETOBUFFER])
+
     CHARSET = [
         [0x00, 0x00],                      # space - Ascii 32
         [0xfa],                            # !
@@ -144,32 +188,16 @@ class SSD1306OLED:
         [0x60, 0x90, 0x90, 0x60]           # Degrees sign - Ascii 127
     ]
 
-    COS_TABLE = [
-        0.000,0.035,0.070,0.105,0.140,0.174,0.208,0.243,0.276,0.310,0.343,0.376,0.408,0.439,0.471,0.501,0.531,0.561,0.589,0.617,0.644,
-        0.671,0.696,0.721,0.745,0.768,0.790,0.810,0.830,0.849,0.867,0.884,0.900,0.915,0.928,0.941,0.952,0.962,0.971,0.979,0.985,0.991,
-        0.995,0.998,1.000,1.000,0.999,0.997,0.994,0.990,0.984,0.977,0.969,0.960,0.949,0.938,0.925,0.911,0.896,0.880,0.863,0.845,0.826,
-        0.806,0.784,0.762,0.739,0.715,0.690,0.664,0.638,0.610,0.582,0.554,0.524,0.494,0.463,0.432,0.400,0.368,0.335,0.302,0.268,0.234,
-        0.200,0.166,0.131,0.096,0.062,0.027,-0.008,-0.043,-0.078,-0.113,-0.148,-0.182,-0.217,-0.251,-0.284,-0.318,-0.351,-0.383,-0.415,
-        -0.447,-0.478,-0.508,-0.538,-0.567,-0.596,-0.624,-0.651,-0.677,-0.702,-0.727,-0.750,-0.773,-0.795,-0.815,-0.835,-0.854,-0.872,
-        -0.888,-0.904,-0.918,-0.931,-0.944,-0.955,-0.964,-0.973,-0.981,-0.987,-0.992,-0.996,-0.998,-1.000,-1.000,-0.999,-0.997,-0.993,
-        -0.988,-0.982,-0.975,-0.967,-0.957,-0.947,-0.935,-0.922,-0.908,-0.893,-0.876,-0.859,-0.840,-0.821,-0.801,-0.779,-0.757,-0.733,
-        -0.709,-0.684,-0.658,-0.631,-0.604,-0.575,-0.547,-0.517,-0.487,-0.456,-0.424,-0.392,-0.360,-0.327,-0.294,-0.260,-0.226,-0.192,
-        -0.158,-0.123,-0.088,-0.053,-0.018]
-
-    SIN_TABLE = [
-        1.000,0.999,0.998,0.994,0.990,0.985,0.978,0.970,0.961,0.951,0.939,0.927,0.913,0.898,0.882,0.865,0.847,0.828,0.808,0.787,
-        0.765,0.742,0.718,0.693,0.667,0.641,0.614,0.586,0.557,0.528,0.498,0.467,0.436,0.404,0.372,0.339,0.306,0.272,0.238,0.204,
-        0.170,0.135,0.101,0.066,0.031,-0.004,-0.039,-0.074,-0.109,-0.144,-0.178,-0.213,-0.247,-0.280,-0.314,-0.347,-0.379,-0.412,
-        -0.443,-0.474,-0.505,-0.535,-0.564,-0.593,-0.620,-0.647,-0.674,-0.699,-0.724,-0.747,-0.770,-0.792,-0.813,-0.833,-0.852,
-        -0.870,-0.886,-0.902,-0.916,-0.930,-0.942,-0.953,-0.963,-0.972,-0.980,-0.986,-0.991,-0.995,-0.998,-1.000,-1.000,-0.999,
-        -0.997,-0.994,-0.989,-0.983,-0.976,-0.968,-0.959,-0.948,-0.936,-0.924,-0.910,-0.895,-0.878,-0.861,-0.843,-0.823,-0.803,
-        -0.782,-0.759,-0.736,-0.712,-0.687,-0.661,-0.635,-0.607,-0.579,-0.550,-0.520,-0.490,-0.459,-0.428,-0.396,-0.364,-0.331,
-        -0.298,-0.264,-0.230,-0.196,-0.162,-0.127,-0.092,-0.057,-0.022,0.013,0.048,0.083,0.117,0.152,0.187,0.221,0.255,0.288,
-        0.322,0.355,0.387,0.419,0.451,0.482,0.512,0.542,0.571,0.599,0.627,0.654,0.680,0.705,0.730,0.753,0.776,0.797,0.818,0.837,
-        0.856,0.874,0.890,0.906,0.920,0.933,0.945,0.956,0.966,0.974,0.981,0.988,0.992,0.996,0.999,1.000]
-
-
-    def __init__(self, reset_pin, i2c, address=0x3C, width=128, height=32):
+    # CHARSET converted to the display's bit order, with each glyph's trailing space column
+    GLYPHS = _flip_glyphs(CHARSET)
+
+    # bytes.translate() tables for text which is not aligned to a page: SHIFT_LOW[n]
+    # moves a column n pixels down within its page, SHIFT_HIGH[n] gives the part
+    # which spills into the next page
+    SHIFT_LOW = [bytes(((i << n) & 0xFF) for i in range(256)) for n in range(8)]
+    SHIFT_HIGH = [bytes((i >> (8 - n)) for i in range(256)) for n in range(8)]
+
+    def __init__(self, reset_pin, i2c, address=0x3C, width=128, height=32, double_buffer=False, text_cache_size=32):
         # Just in case it hasn't been imported by the caller
         import time
 
@@ -181,7 +209,85 @@ class SSD1306OLED:
         self.height = height
         self.x = 0
         self.y = 0
-        self.buffer = bytearray(width * int(height / 8))
+
+        # The transmit buffer holds the data control byte followed by the
+        # display buffer, so full-width areas can be sent straight from it.
+        # 'buffer' is a view onto the pixel data. Both live as long as the object
+        size = width * int(height / 8)
+        self.tx_buffer = bytearray(size + 1)
+        self.tx_buffer[0] = self.SSD1306_WRITETOBUFFER
+        self.buffer = memoryview(self.tx_buffer)[1:]
+        # A view of each page, made once so that whole pages can be compared
+        # and copied without making new views each frame
+        self.rows = [self.buffer[page * width:(page + 1) * width] for page in range(0, height // 8)]
+        self.blank = bytes(size)
+        self.ones = b"\xFF" * width
+        # A page's width of cleared and of set bytes, by color
+        self.fills = (memoryview(self.blank)[0:width], memoryview(self.ones))
+        self.scratch = bytearray(size + len(self.CHUNK_HEADER))
+        self.scratch[0:len(self.CHUNK_HEADER)] = self.CHUNK_HEADER
+
+        # Commands waiting to be sent, as one control-byte stream, and where each
+        # one starts. Set 'defer_commands' to hold runtime commands, eg. set_inverse(),
+        # until the next draw() or flush_commands(), rather than sending them at once
+        self.cmd_queue = bytearray(1)
+        self.cmd_starts = []
+        self.defer_commands = False
+
+        # Double-buffered mode keeps a copy of what was last sent to the
+        # panel, and changed areas are trimmed to the bytes which really differ.
+        # 'synced' records which pages of the copy are known to match the panel
+        self.shadow = bytearray(size) if double_buffer is True else None
+        self.shadow_rows = None
+        if self.shadow is not None:
+            shadow = memoryview(self.shadow)
+            self.shadow_rows = [shadow[page * width:(page + 1) * width] for page in range(0, height // 8)]
+        self.synced = [False] * (height // 8)
+
+        # True when the controller's address window is the whole screen and its pointer
+        # is back at the top left, as a full-frame write leaves them, so the next
+        # full-frame write can go without COLUMNADDR and PAGEADDR
+        self.window_home = False
+
+        # Rendered text, least recently used first, keyed by string and the text's
+        # offset within a page. Set 'text_cache_size' to 0 to disable the cache
+        self.text_cache = {}
+        self.text_cache_size = text_cache_size
+        self.text_cache_hits = 0
+        self.text_cache_misses = 0
+
+        # The pages being scrolled by the controller, as a (first, last, vertical) tuple, or None
+        self.scrolling = None
+
+        # The display RAM row shown at the top of the screen, and the number of
+        # lines written by print_line() since the terminal was last reset
+        self.start_line = 0
+        self.terminal_lines = 0
+
+        # Dirty tracking: the lowest and highest column changed in each page
+        # since the last render. A page is clean when its low mark exceeds
+        # its high mark
+        self.pages = height // 8
+        self.dirty_lo = [0] * self.pages
+        self.dirty_hi = [width - 1] * self.pages
+        # The marks for every page changed, and for every page clean, to copy in
+        self.all_lo = [0] * self.pages
+        self.all_hi = [width - 1] * self.pages
+        self.none_lo = [width] * self.pages
+        self.none_hi = [-1] * self.pages
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+
+        # A RenderWorker, or similar, which sends frames in the background. When set,
+        # draw() hands the frame to it rather than writing it out itself
+        self.worker = None
+
+        # A DisplayStats, while one is attached to measure the display
+        self.stats = None
+
+        # With no I2C object the display is an off-screen buffer, which can be drawn
+        # into, eg. by a DisplayClient, but has no panel to set up or send to
+        if i2c is None: return
 
         # Toggle the RST pin over 1ms + 10ms
         self.rst.value = True
@@ -190,27 +296,24 @@ class SSD1306OLED:
         time.sleep(0.01)
         self.rst.value = True
 
-        # Write the display settings
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_DISPLAYOFF]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SETDISPLAYCLOCKDIV, 0x80]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SETMULTIPLEX, self.height - 1]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SETDISPLAYOFFSET, 0x00]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SETSTARTLINE]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_CHARGEPUMP, 0x14]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_MEMORYMODE, 0x00]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SEGREMAP]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_COMSCANDEC]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SETCOMPINS, 0x02 if self.height == 32 or self.height == 16 else 0x12]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SETCONTRAST, 0x8F]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SETPRECHARGE, 0xF1]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_SETVCOMDETECT, 0x40]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_DISPLAYALLON_RESUME]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_NORMALDISPLAY]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_DISPLAYON]))
-
-        pages = (self.height // 8) - 1  # 0x03 if self.height == 64 else 0x07
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_COLUMNADDR, 0x00, self.width - 1]))
-        self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_PAGEADDR, 0x00, pages]))
+        # Queue the display settings: they go out in one transaction,
+        # ahead of the first frame, when the display is cleared below
+        self.queue_command(self.SSD1306_DISPLAYOFF)
+        self.queue_command(self.SSD1306_SETDISPLAYCLOCKDIV, 0x80)
+        self.queue_command(self.SSD1306_SETMULTIPLEX, self.height - 1)
+        self.queue_command(self.SSD1306_SETDISPLAYOFFSET, 0x00)
+        self.queue_command(self.SSD1306_SETSTARTLINE)
+        self.queue_command(self.SSD1306_CHARGEPUMP, 0x14)
+        self.queue_command(self.SSD1306_MEMORYMODE, 0x00)
+        self.queue_command(self.SSD1306_SEGREMAP)
+        self.queue_command(self.SSD1306_COMSCANDEC)
+        self.queue_command(self.SSD1306_SETCOMPINS, 0x02 if self.height == 32 or self.height == 16 else 0x12)
+        self.queue_command(self.SSD1306_SETCONTRAST, 0x8F)
+        self.queue_command(self.SSD1306_SETPRECHARGE, 0xF1)
+        self.queue_command(self.SSD1306_SETVCOMDETECT, 0x40)
+        self.queue_command(self.SSD1306_DISPLAYALLON_RESUME)
+        self.queue_command(self.SSD1306_NORMALDISPLAY)
+        self.queue_command(self.SSD1306_DISPLAYON)
 
         # Clear the display
         self.clear()
@@ -218,12 +321,46 @@ class SSD1306OLED:
 
     def clear(self):
         """
-        Clears the display buffer by creating a new one
+        Clears the display buffer in place
+
+        Returns:
+            The display object
+        """
+        self.buffer[:] = self.blank
+        self.dirty_lo[:] = self.all_lo
+        self.dirty_hi[:] = self.all_hi
+        return self
+
+    def mark_dirty(self, x=0, y=0, width=None, height=None):
+        """
+        Mark an area of the buffer as changed so that the next draw() sends it.
+        The drawing methods do this for you: call it after writing to 'buffer' directly
+
+        Args:
+            x (int) The start X co-ordinate. Default: 0
+            y (int) The start Y co-ordinate. Default: 0
+            width (int) The width of the area. Default: the whole display
+            height (int) The height of the area. Default: the whole display
 
         Returns:
             The display object
         """
-        self.buffer = bytearray(self.width * int(self.height / 8))
+        if width is None: width = self.width - x
+        if height is None: height = self.height - y
+        if x < 0:
+            width += x
+            x = 0
+        if y < 0:
+            height += y
+            y = 0
+        if x + width > self.width: width = self.width - x
+        if y + height > self.height: height = self.height - y
+        if width < 1 or height < 1: return self
+
+        x1 = x + width - 1
+        for page in range(y >> 3, ((y + height - 1) >> 3) + 1):
+            if x < self.dirty_lo[page]: self.dirty_lo[page] = x
+            if x1 > self.dirty_hi[page]: self.dirty_hi[page] = x1
         return self
 
     def set_inverse(self, is_inverse=True):
@@ -233,16 +370,222 @@ class SSD1306OLED:
         Args:
             is_inverse (bool): should the display be black-on-white (True) or white-on-black (False).
         """
-        if is_inverse is True:
-            self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_INVERTDISPLAY]));
+        self.command(self.SSD1306_INVERTDISPLAY if is_inverse is True else self.SSD1306_NORMALDISPLAY)
+
+    def queue_command(self, *values):
+        """
+        Add a command, and any parameters it takes, to the command queue. Queued commands
+        are sent together, in a single transaction, by 'flush_commands()', which is
+        called automatically before the next data is written to the display
+
+        Args:
+            values (int) The command byte and its parameters
+
+        Returns:
+            The display object
+        """
+        self.cmd_starts.append(len(self.cmd_queue))
+        self.cmd_queue.extend(values)
+        return self
+
+    def flush_commands(self):
+        """
+        Send any queued commands. If the I2C object limits the size of a transaction,
+        the queue is split between commands to fit
+
+        Returns:
+            The number of bytes written
+        """
+        return self.send_commands(self)
+
+    def command(self, *values):
+        """
+        Send a command, and any parameters it takes, to the display, or queue it if
+        'defer_commands' is set. If a worker is attached, the command is passed to it,
+        so that it goes out with the frame waiting to be sent rather than ahead of it
+
+        Args:
+            values (int) The command byte and its parameters
+        """
+        self.queue_command(*values)
+        if self.defer_commands is True: return
+        if self.worker is not None:
+            self.worker.submit(False)
+        else:
+            self.flush_commands()
+
+    def start_scroll(self, direction="left", start_page=0, end_page=None, interval=5, vertical=0):
+        """
+        Have the controller scroll a band of pages continuously, with no further I2C traffic.
+        The display RAM must not be written while it scrolls, so draw() sends nothing until
+        'stop_scroll()' is called, but drawing into the buffer continues as normal
+
+        Args:
+            direction (string) The way to scroll: 'left' or 'right'. Default: 'left'
+            start_page (int) The first page (row of 8 pixels) to scroll. Default: 0
+            end_page (int) The last page to scroll. Default: the bottom page
+            interval (int) The number of frames between scroll steps: the nearest of 2, 3, 4,
+                           5, 25, 64, 128 and 256 is used. Default: 5
+            vertical (int) Also scroll the whole display up by this many rows per step. Default: 0
+
+        Returns:
+            The display object
+        """
+        if direction not in ("left", "right"): return self
+        if end_page is None: end_page = self.pages - 1
+        if not 0 <= start_page <= end_page < self.pages: return self
+        interval = min(self.SCROLL_INTERVALS, key=lambda frames: abs(frames - interval))
+
+        # Scroll settings may only be changed while scrolling is off
+        if self.scrolling is not None: self.stop_scroll()
+        step = self.SCROLL_INTERVALS[interval]
+        if vertical == 0:
+            self.queue_command(self.SSD1306_LEFT_HORIZONTAL_SCROLL if direction == "left" else self.SSD1306_RIGHT_HORIZONTAL_SCROLL,
+                               0x00, start_page, step, end_page, 0x00, 0xFF)
+        else:
+            self.queue_command(self.SSD1306_SET_VERTICAL_SCROLL_AREA, 0x00, self.height)
+            self.queue_command(self.SSD1306_VERTICAL_AND_LEFT_HORIZONTAL_SCROLL if direction == "left" else self.SSD1306_VERTICAL_AND_RIGHT_HORIZONTAL_SCROLL,
+                               0x00, start_page, step, end_page, vertical % self.height)
+        self.command(self.SSD1306_ACTIVATE_SCROLL)
+        self.scrolling = (start_page, end_page, vertical)
+        return self
+
+    def stop_scroll(self):
+        """
+        Stop the controller scrolling. The scroll has moved the display RAM's contents,
+        so the scrolled area is marked to be sent again in full by the next draw(). After
+        a vertical scroll, the start line in use before it, eg. by print_line(), is restored
+
+        Returns:
+            The display object
+        """
+        if self.scrolling is None: return self
+        (start_page, end_page, vertical) = self.scrolling
+        if vertical != 0:
+            # A vertical scroll moves every page and leaves the start line offset,
+            # so put back the one the terminal's ring of pages depends on
+            (start_page, end_page) = (0, self.pages - 1)
+            self.queue_command(self.SSD1306_DEACTIVATE_SCROLL)
+            self.command(self.SSD1306_SETSTARTLINE | self.start_line)
+        else:
+            self.command(self.SSD1306_DEACTIVATE_SCROLL)
+        self.scrolling = None
+
+        for page in range(start_page, end_page + 1):
+            self.dirty_lo[page] = 0
+            self.dirty_hi[page] = self.width - 1
+            self.synced[page] = False
+        return self
+
+    def set_start_line(self, line=0):
+        """
+        Set which row of the display RAM appears at the top of the screen. Rows below it
+        follow, wrapping round to row 0, so this moves the whole picture up without
+        rewriting any of it. Drawing co-ordinates are unaffected: they address the RAM
+
+        Args:
+            line (int) The RAM row to show at the top of the screen. Default: 0
+
+        Returns:
+            The display object
+        """
+        line = line % self.height
+        self.command(self.SSD1306_SETSTARTLINE | line)
+        self.start_line = line
+        return self
+
+    def print_line(self, print_string=""):
+        """
+        Terminal mode: add a line of text to the bottom of the screen, scrolling the earlier
+        lines up once the screen is full. The display RAM is used as a ring of pages: each
+        new line overwrites only the oldest line's page, and the start line is moved so that
+        page appears at the bottom. A line costs one page of data and one command, which
+        go out in the same frame, so the new text never shows at the top of the screen
+
+        Args:
+            print_string (string) The text to print. Default: an empty line
+
+        Returns:
+            The display object
+        """
+        # Fill the screen from the top, then re-use the page at the top of the screen
+        if self.terminal_lines < self.pages:
+            page = self.terminal_lines
         else:
-            self.i2c.writeto(self.address, bytes([0x00, self.SSD1306_NORMALDISPLAY]));
+            page = self.start_line >> 3
+        self.terminal_lines += 1
+
+        self.fill_rect(0, page << 3, self.width, 8, 0)
+        if len(print_string) > 0:
+            # Keep the text on its own line, cutting off anything too long
+            columns = self.rasterise(print_string, 0)[0]
+            self.or_into_page(page, 0, columns[0:self.width])
+
+        # Scroll the new line into place at the bottom: the command is queued to go
+        # with the line's data, not sent after it
+        if self.terminal_lines > self.pages:
+            self.start_line = ((page + 1) << 3) % self.height
+            self.queue_command(self.SSD1306_SETSTARTLINE | self.start_line)
+        self.draw()
+        return self
+
+    def reset_terminal(self):
+        """
+        Terminal mode: clear the screen and start printing again from the top
+
+        Returns:
+            The display object
+        """
+        self.terminal_lines = 0
+        self.clear()
+        self.draw()
+        if self.start_line != 0: self.set_start_line(0)
+        return self
 
     def draw(self):
         """
-        Draw the current buffer contents on the screen
+        Draw the current buffer contents on the screen. If a worker is attached, the frame
+        is passed to it to send, and drawing can continue at once
+        """
+        if self.worker is not None:
+            self.worker.submit()
+        else:
+            self.render()
+
+    def snapshot(self, frame=None, data=True):
+        """
+        Take a copy of the buffer, with its dirty ranges and any queued commands, to send
+        later with 'render()'. The display's own dirty ranges and command queue are cleared.
+        While the controller is scrolling, dirty ranges are left for the display to send
+        once scrolling stops
+
+        Args:
+            frame (SSD1306Frame) A frame to re-use. Changes it holds but has not yet sent
+                                 are kept, so a frame which is still waiting to be sent
+                                 can be brought up to date. Default: a new frame
+            data (bool) Take the buffer and its dirty ranges as well as the commands (True),
+                        or only the commands, leaving the drawing for the next draw() (False).
+                        Default: True
+
+        Returns:
+            The frame
         """
-        self.render()
+        if frame is None: frame = SSD1306Frame(len(self.buffer), self.pages, self.width)
+        if data is True: frame.tx_buffer[:] = self.tx_buffer
+
+        if data is True and self.scrolling is None:
+            for page in range(0, self.pages):
+                if self.dirty_lo[page] < frame.dirty_lo[page]: frame.dirty_lo[page] = self.dirty_lo[page]
+                if self.dirty_hi[page] > frame.dirty_hi[page]: frame.dirty_hi[page] = self.dirty_hi[page]
+            self.clean(self)
+
+        if len(self.cmd_starts) > 0:
+            offset = len(frame.cmd_queue) - 1
+            for start in self.cmd_starts: frame.cmd_starts.append(start + offset)
+            frame.cmd_queue.extend(memoryview(self.cmd_queue)[1:])
+            del self.cmd_queue[1:]
+            self.cmd_starts = []
+        return frame
 
     def home(self):
         """
@@ -300,11 +643,20 @@ class SSD1306OLED:
 
         # Write the buffer byte back
         self.buffer[byte] = value
+
+        # Record the change
+        page = y >> 3
+        if x < self.dirty_lo[page]: self.dirty_lo[page] = x
+        if x > self.dirty_hi[page]: self.dirty_hi[page] = x
         return self
 
     def line(self, x, y, tox, toy, thick=1, color=1):
         """
-        Draw a line between the specified co-ordnates
+        Draw a line between the specified co-ordnates, inclusive. Lines are clipped to the
+        screen. Thicker lines grow downwards when they are closer to horizontal, and to the
+        right when they are closer to vertical. To draw a chart, or any other run of joined
+        lines, use polyline(): a line() call per segment is slower than the original
+        driver's line(), which drew a single pixel of each short, steep segment
 
         Args:
             x (int) The start X co-ordinate in the range 0 - 127
@@ -318,30 +670,155 @@ class SSD1306OLED:
             The display object
         """
         # Make sure we have a thickness of at least one pixel
-        if thick < 1: thick = 1;
+        if thick < 1: thick = 1
 
-        # If necessary swap x and tox so we always scan L-R
-        if x > tox:
-            a = x;
-            x = tox;
-            tox = a
+        # A thin line which starts and ends on the screen needs no clipping
+        if thick == 1 and 0 <= x < self.width and 0 <= tox < self.width and 0 <= y < self.height and 0 <= toy < self.height:
+            return self.thin_line(x, y, tox, toy, color)
 
-        # Calculate the line gradient
-        m = float(toy - y) / float(tox - x);
-        dy = 0
+        # Find the part of the line that can appear on the screen. The clip area has
+        # a pixel's margin because rows near an edge start before the line crosses it
+        ends = self.clip_line(x, y, tox, toy, -thick, -thick, self.width, self.height)
+        if ends is None: return self
+
+        # Integer Bresenham, stepping a whole run of pixels along the major axis at a
+        # time and drawing each run, 'thick' pixels deep, as a single span. The walk
+        # starts where the visible part begins, with the error term it would have
+        # had there, so clipping never moves a pixel
+        dx = abs(tox - x)
+        dy = abs(toy - y)
+        sx = 1 if tox >= x else -1
+        sy = 1 if toy >= y else -1
+        if dx >= dy:
+            (first, last) = self.clip_steps(abs(ends[0] - x), abs(ends[2] - x), dx)
+            steps = max(0, -(((dx >> 1) - first * dy) // dx)) if dx > 0 else 0
+            err = (dx >> 1) - first * dy + steps * dx
+            x += sx * first
+            y += sy * steps
+            remaining = last - first + 1
+            while True:
+                # The run ends at the pixel where the error term goes negative
+                run = err // dy + 1 if dy > 0 else remaining
+                if run > remaining: run = remaining
+                left = x if sx > 0 else x - run + 1
+                if thick == 1 and 0 <= y < self.height:
+                    # A thin run is one masked span within a page
+                    right = left + run
+                    if left < 0: left = 0
+                    if right > self.width: right = self.width
+                    if right > left: self.span(y >> 3, left, right - left, 1 << (y & 7), color)
+                else:
+                    self.fill_rect(left, y, run, thick, color)
+                remaining -= run
+                if remaining == 0: break
+                x += sx * run
+                y += sy
+                err += dx - run * dy
+        else:
+            (first, last) = self.clip_steps(abs(ends[1] - y), abs(ends[3] - y), dy)
+            steps = max(0, -(((dy >> 1) - first * dx) // dy))
+            err = (dy >> 1) - first * dx + steps * dy
+            y += sy * first
+            x += sx * steps
+            remaining = last - first + 1
+            while True:
+                run = err // dx + 1 if dx > 0 else remaining
+                if run > remaining: run = remaining
+                top = y if sy > 0 else y - run + 1
+                if thick == 1 and 0 <= x < self.width:
+                    # A thin run is a masked byte in each page it crosses
+                    bottom = top + run - 1
+                    if top < 0: top = 0
+                    if bottom >= self.height: bottom = self.height - 1
+                    while top <= bottom:
+                        page = top >> 3
+                        end = min(bottom, (page << 3) + 7)
+                        self.span(page, x, 1, (0xFF << (top & 7)) & (0xFF >> (7 - (end & 7))), color)
+                        top = end + 1
+                else:
+                    self.fill_rect(x, top, thick, run, color)
+                remaining -= run
+                if remaining == 0: break
+                y += sy * run
+                x += sx
+                err += dy - run * dx
+        return self
+
+    def polyline(self, points, color=1):
+        """
+        Draw one-pixel lines joining a series of points, eg. a chart. The pixels are the
+        same as line() draws for each pair of points in turn, but when every point is on
+        the screen the lines are built up a column at a time and written a page at a time
+
+        Args:
+            points (list) The (x, y) co-ordinates of the points, in order
+            color (int) The color of the pixels: 1 for set, 0 for clear. Default: 1
 
-        # Run for 'thick' times to generate thickness
-        for j in range(0, thick):
-            # Run from x to tox, calculating the y offset at each point
-            for i in range(x, tox):
-                dy = y + int(m * (i - x)) + j;
-                if i >= 0 and i < self.width and dy >= 0 and dy < self.height:
-                    self.plot(i, dy, color)
+        Returns:
+            The display object
+        """
+        if len(points) == 0: return self
+        if len(points) == 1: return self.line(*points[0], *points[0], 1, color)
+        width = self.width
+        height = self.height
+        for (x, y) in points:
+            if x < 0 or x >= width or y < 0 or y >= height:
+                # Some lines need clipping
+                for i in range(1, len(points)): self.line(*points[i - 1], *points[i], 1, color)
+                return self
+
+        # Each column's pixels, one bit per row, from the top
+        columns = [0] * width
+        (x, y) = points[0]
+        (left, right) = (x, x)
+        for (tox, toy) in points[1:]:
+            if tox < left: left = tox
+            if tox > right: right = tox
+            dx = abs(tox - x)
+            dy = abs(toy - y)
+            sx = 1 if tox >= x else -1
+            sy = 1 if toy >= y else -1
+            (px, py) = (x, y)
+            if dx >= dy:
+                err = dx >> 1
+                remaining = dx + 1
+                while True:
+                    run = err // dy + 1 if dy > 0 else remaining
+                    if run > remaining: run = remaining
+                    bit = 1 << py
+                    for i in (range(px, px + run) if sx > 0 else range(px - run + 1, px + 1)): columns[i] |= bit
+                    remaining -= run
+                    if remaining == 0: break
+                    px += sx * run
+                    py += sy
+                    err += dx - run * dy
+            else:
+                err = dy >> 1
+                remaining = dy + 1
+                while True:
+                    run = err // dx + 1 if dx > 0 else remaining
+                    if run > remaining: run = remaining
+                    columns[px] |= ((1 << run) - 1) << (py if sy > 0 else py - run + 1)
+                    remaining -= run
+                    if remaining == 0: break
+                    py += sy * run
+                    px += sx
+                    err += dy - run * dx
+            (x, y) = (tox, toy)
+
+        # Each column's bits are its page bytes, so every 'pages'th byte of the columns
+        # laid end to end is one page's row of bytes
+        pages = self.pages
+        data = b"".join([column.to_bytes(pages, "little") for column in columns[left:right + 1]])
+        for page in range(0, pages):
+            row = data[page::pages].rstrip(b"\x00")
+            trimmed = row.lstrip(b"\x00")
+            self.or_into_page(page, left + len(row) - len(trimmed), trimmed, color)
         return self
 
     def circle(self, x, y, radius, color=1, fill=False):
         """
-        Draw a circle at the specified co-ordnates
+        Draw a circle at the specified co-ordnates. Pixels off the screen are skipped
 
         Args:
             x (int) The centre X co-ordinate in the range 0 - 127
@@ -353,27 +830,85 @@ class SSD1306OLED:
         Returns:
             The display object
         """
-        for i in range(0, 180):
-            a = x - int(radius * self.SIN_TABLE[i])
-            b = y - int(radius * self.COS_TABLE[i])
+        if radius < 0: return self
 
-            if a >= 0 and a < self.width and b >= 0 and b < self.height:
-                self.plot(a, b, color)
+        # Midpoint circle over one octant, noting for each row below the centre
+        # the nearest and furthest outline pixels from the centre line
+        inner = [radius + 1] * (radius + 1)
+        outer = [-1] * (radius + 1)
+        dx = radius
+        dy = 0
+        err = 1 - radius
+        while dy <= dx:
+            # Each octant point also gives the point mirrored in the diagonal
+            if dx < inner[dy]: inner[dy] = dx
+            if dx > outer[dy]: outer[dy] = dx
+            if dy < inner[dx]: inner[dx] = dy
+            if dy > outer[dx]: outer[dx] = dy
+            dy += 1
+            if err < 0:
+                err += 2 * dy + 1
+            else:
+                dx -= 1
+                err += 2 * (dy - dx) + 1
+        return self.draw_rows(x, y, inner, outer, color, fill)
 
-                if fill is True:
-                    if a > x:
-                        j = x
-                        while True:
-                            self.plot(j, b, color)
-                            j += 1
-                            if j >= a: break
-                    else:
-                        j = a + 1
-                        while True:
-                            self.plot(j, b, color)
-                            j += 1
-                            if j > x: break
-        return self
+    def ellipse(self, x, y, x_radius, y_radius, color=1, fill=False):
+        """
+        Draw an ellipse, aligned to the axes, at the specified co-ordnates. Pixels off the screen are skipped
+
+        Args:
+            x (int) The centre X co-ordinate in the range 0 - 127
+            y (int) The centre Y co-ordinate in the range 0 - 32 or 64, depending on model
+            x_radius (int) The horizontal radius of the ellipse
+            y_radius (int) The vertical radius of the ellipse
+            color (int) The color of the pixel: 1 for set, 0 for clear. Default: 1
+            fill (bool) Should the ellipse be solid (true) or outline (false). Default: false
+
+        Returns:
+            The display object
+        """
+        if x_radius < 0 or y_radius < 0: return self
+        if y_radius == 0: return self.hline(x - x_radius, y, 2 * x_radius + 1, color)
+
+        # Midpoint ellipse over one quadrant, noting for each row below the centre
+        # the nearest and furthest outline pixels from the centre line. The
+        # decision values are scaled by four to keep them integers
+        inner = [x_radius + 1] * (y_radius + 1)
+        outer = [-1] * (y_radius + 1)
+        a2 = x_radius * x_radius
+        b2 = y_radius * y_radius
+        dx = 0
+        dy = y_radius
+
+        # Region 1: the slope is shallower than -1, so step along x
+        err = 4 * b2 - 4 * a2 * y_radius + a2
+        while b2 * dx < a2 * dy:
+            if dx < inner[dy]: inner[dy] = dx
+            if dx > outer[dy]: outer[dy] = dx
+            dx += 1
+            if err < 0:
+                err += 4 * b2 * (2 * dx + 1)
+            else:
+                dy -= 1
+                err += 4 * b2 * (2 * dx + 1) - 8 * a2 * dy
+
+        # Region 2: step along y
+        err = b2 * (2 * dx + 1) * (2 * dx + 1) + 4 * a2 * (dy - 1) * (dy - 1) - 4 * a2 * b2
+        while dy >= 0:
+            if dx < inner[dy]: inner[dy] = dx
+            if dx > outer[dy]: outer[dy] = dx
+            dy -= 1
+            if err > 0:
+                err += 4 * a2 * (1 - 2 * dy)
+            else:
+                dx += 1
+                err += 8 * b2 * dx + 4 * a2 * (1 - 2 * dy)
+
+        # A very flat ellipse reaches its centre row before its x radius, and
+        # the outline then runs along that row to the end
+        outer[0] = x_radius
+        return self.draw_rows(x, y, inner, outer, color, fill)
 
     def rect(self, x, y, width, height, fill=False):
         """
@@ -394,14 +929,80 @@ class SSD1306OLED:
         if x + width > self.width: width = self.width - x
         if y < 0: y = 0
         if y + height > self.height: height = self.height - y
+        if width < 1 or height < 1: return self
+
+        # An outline rectangle is a filled one with its interior cleared
+        self.fill_rect(x, y, width, height)
+        if fill is False: self.fill_rect(x + 1, y + 1, width - 2, height - 2, 0)
+        return self
+
+    def fill_rect(self, x, y, width, height, color=1):
+        """
+        Fill a rectangle, clipped to the screen. Each page the rectangle covers is
+        written a byte at a time: whole bytes where the page is fully covered, masked
+        bytes at the top and bottom edges
+
+        Args:
+            x (int) The start X co-ordinate
+            y (int) The start Y co-ordinate
+            width (int) The width of the rectangle
+            height (int) The height of the rectangle
+            color (int) The color of the pixels: 1 for set, 0 for clear. Default: 1
+
+        Returns:
+            The display object
+        """
+        # Clip to the screen
+        if x < 0:
+            width += x
+            x = 0
+        if y < 0:
+            height += y
+            y = 0
+        if x + width > self.width: width = self.width - x
+        if y + height > self.height: height = self.height - y
+        if width < 1 or height < 1: return self
 
-        for i in range(y, y + height):
-            for j in range(x, x + width):
-                self.plot(j, i)
-                if fill is False and x < j < x + width - 1 and y < i < y + height - 1:
-                    self.plot(j, i, 0)
+        y1 = y + height - 1
+        first = y >> 3
+        last = y1 >> 3
+        for page in range(first, last + 1):
+            mask = 0xFF
+            if page == first: mask &= (0xFF << (y & 7)) & 0xFF
+            if page == last: mask &= 0xFF >> (7 - (y1 & 7))
+            self.span(page, x, width, mask, color)
         return self
 
+    def hline(self, x, y, width, color=1):
+        """
+        Draw a horizontal line, clipped to the screen
+
+        Args:
+            x (int) The start X co-ordinate
+            y (int) The Y co-ordinate
+            width (int) The length of the line in pixels
+            color (int) The color of the pixels: 1 for set, 0 for clear. Default: 1
+
+        Returns:
+            The display object
+        """
+        return self.fill_rect(x, y, width, 1, color)
+
+    def vline(self, x, y, height, color=1):
+        """
+        Draw a vertical line, clipped to the screen
+
+        Args:
+            x (int) The X co-ordinate
+            y (int) The start Y co-ordinate
+            height (int) The length of the line in pixels
+            color (int) The color of the pixels: 1 for set, 0 for clear. Default: 1
+
+        Returns:
+            The display object
+        """
+        return self.fill_rect(x, y, 1, height, color)
+
     def text(self, print_string=None):
         """
         Write a line of text at the current cursor co-ordinates
@@ -418,41 +1019,46 @@ class SSD1306OLED:
 
         x = self.x
         y = self.y
+        (low, high) = self.rasterise(print_string, y & 7)
+        offset = 0
+        while True:
+            # Write as much as fits on this line
+            room = self.width - x
+            page = y >> 3
+            self.or_into_page(page, x, low[offset:offset + room])
+            if high is not None and page + 1 < self.pages:
+                self.or_into_page(page + 1, x, high[offset:offset + room])
+            offset += room
 
-        for i in range(0, len(print_string)):
-            asc = ord(print_string[i]) - 32
-            glyph = self.CHARSET[asc]
+            # Right side hit, so move to next text line
+            if offset >= len(low) or y + 8 >= self.height: break
+            x = 0
+            y += 8
+        return self
 
-            for j in range(0, len(glyph) + 1):
-                # j adds to x
-                if j == len(glyph) and x < 128:
-                    c = 0x00
-                else:
-                    c = self.flip(glyph[j])
-                z = -1
-                for k in range(0, 8):
-                    # k adds to y
-                    # z is the bit value in y; deals with y + k extending
-                    # beyond byte boundary
-                    if ((y + k) % 8) == 0 and k != 0:
-                        z = 0
-                    else:
-                        z += 1
-
-                    b = self.coords_to_index(x , y + k)
-                    v = self.buffer[b]
-                    if c & (1 << z) != 0: v = v | (1 << z)
-                    self.buffer[b] = v
-
-                # Move on one pixel
-                x += 1
-                if x > 127:
-                    # Right side hit, so move to next text line
-                    if y + 8 < self.height:
-                        x = 0
-                        y += 8
-                    else:
-                        break
+    def blit(self, columns, x, y):
+        """
+        OR a strip of 8-pixel-high columns into the buffer, each byte one column with
+        its least significant bit at the top. The strip must fit within the display's width
+
+        Args:
+            columns (bytes) The column data
+            x (int) The X co-ordinate of the strip's first column
+            y (int) The Y co-ordinate of the strip's top row
+
+        Returns:
+            The display object
+        """
+        page = y >> 3
+        shift = y & 7
+        if shift == 0:
+            # Byte-aligned: each column is exactly one buffer byte
+            self.or_into_page(page, x, columns)
+        else:
+            # Straddling two pages: split each column between them
+            self.or_into_page(page, x, columns.translate(self.SHIFT_LOW[shift]))
+            if page + 1 < self.pages:
+                self.or_into_page(page + 1, x, columns.translate(self.SHIFT_HIGH[shift]))
         return self
 
     def length_of_string(self, print_string):
@@ -467,22 +1073,350 @@ class SSD1306OLED:
         """
         length = 0
         if print_string is None or len(print_string) == 0: return -1
-        for i in range(0, len(print_string)):
-            asc = ord(print_string[i]) - 32
-            glyph = self.CHARSET[asc]
-            length += (len(glyph) + 1)
+        for char in print_string:
+            length += len(self.GLYPHS[ord(char) - 32])
         return length
 
     # ***** PRIVATE FUNCTIONS *****
 
-    def render(self):
+    def render(self, frame=None):
+        """
+        Write the changed areas of a frame out to I2C: the display's own buffer, or a
+        copy of it made by 'snapshot()'. Each area is sent through a COLUMNADDR/PAGEADDR
+        window, or, when that would cost more, the whole frame goes in one write; nothing
+        is sent if nothing has changed. Afterwards 'bytes_sent' holds the number of bytes
+        written for this frame, and 'bytes_saved' how many fewer that was than a plain
+        full-frame write, or 0 if it was no fewer
+
+        Args:
+            frame (SSD1306Frame) The frame to send. Default: the display itself
+        """
+        if frame is None: frame = self
+        if self.i2c is None:
+            self.send_commands(frame)
+            self.clean(frame)
+            return
+
+        # Leave everything to send once scrolling stops
+        if self.scrolling is not None:
+            self.send_commands(frame)
+            if frame is not self:
+                # Scrolling began after the frame was taken, so its changes are lost: send the lot later
+                self.mark_dirty()
+                self.clean(frame)
+            self.bytes_sent = 0
+            self.bytes_saved = len(frame.buffer) + 1
+            return
+
+        if self.shadow is not None: self.trim_dirty(frame)
+
+        # An I2C object with a 'max_transaction' attribute, eg. a TransferPlanner,
+        # gets self-contained transactions no bigger than that, so any one
+        # of them can be re-sent on its own
+        limit = getattr(self.i2c, "max_transaction", False)
+        sent = 0
+        width = self.width
+        if limit is not False: sent += self.send_commands(frame)
+        for window in self.plan_windows(frame):
+            if limit is False:
+                sent += self.write_window(frame, window)
+            else:
+                for chunk in self.split_window(window, limit):
+                    sent += self.write_chunk(frame, chunk)
+
+            # Record what the panel now holds
+            if self.shadow is None: continue
+            (x0, x1, p0, p1) = window
+            if x0 == 0 and x1 == width - 1:
+                for page in range(p0, p1 + 1):
+                    self.shadow_rows[page][:] = frame.rows[page]
+                    self.synced[page] = True
+            else:
+                for page in range(p0, p1 + 1):
+                    start = page * width
+                    self.shadow[start + x0:start + x1 + 1] = frame.buffer[start + x0:start + x1 + 1]
+
+        # Send anything still queued, eg. when no data has changed
+        sent += self.send_commands(frame)
+
+        # Everything is now clean
+        self.clean(frame)
+        self.bytes_sent = sent
+        self.bytes_saved = max(0, len(frame.buffer) + 1 - sent)
+
+    def clean(self, frame):
+        """
+        Mark every page of a frame as unchanged
+
+        Args:
+            frame (SSD1306Frame) The frame, or the display itself
+        """
+        frame.dirty_lo[:] = self.none_lo
+        frame.dirty_hi[:] = self.none_hi
+
+    def send_commands(self, frame):
+        """
+        Send a frame's queued commands, splitting them between commands to fit if
+        the I2C object limits the size of a transaction
+
+        Args:
+            frame (SSD1306Frame) The frame, or the display itself
+
+        Returns:
+            The number of bytes written
+        """
+        if len(frame.cmd_starts) == 0: return 0
+        queue = frame.cmd_queue
+        if self.i2c is None:
+            # An off-screen buffer has nowhere to send them
+            del queue[1:]
+            frame.cmd_starts = []
+            return 0
+        limit = getattr(self.i2c, "max_transaction", None)
+        sent = 0
+        if limit is None or len(queue) <= limit:
+            self.i2c.writeto(self.address, queue)
+            sent = len(queue)
+        else:
+            # Gather whole commands into pieces which fit
+            starts = frame.cmd_starts
+            first = 1
+            for i in range(0, len(starts)):
+                end = starts[i + 1] if i + 1 < len(starts) else len(queue)
+                if end - first + 1 > limit and starts[i] > first:
+                    sent += self.write_commands(queue, first, starts[i])
+                    first = starts[i]
+            sent += self.write_commands(queue, first, len(queue))
+        del queue[1:]
+        frame.cmd_starts = []
+        return sent
+
+    def write_commands(self, queue, start, end):
+        """
+        Send part of a command queue as a transaction of its own. The byte before the
+        part is borrowed to hold the command control byte
+
+        Args:
+            queue (bytearray) The command queue
+            start (int) The queue index of the first command byte to send
+            end (int) The queue index after the last command byte to send
+
+        Returns:
+            The number of bytes written
+        """
+        saved = queue[start - 1]
+        queue[start - 1] = 0x00
+        self.i2c.writeto(self.address, queue, start=start - 1, end=end)
+        queue[start - 1] = saved
+        return end - start + 1
+
+    def write_window(self, frame, window):
+        """
+        Set the display's address window, then write the window's contents to it
+
+        Args:
+            frame (SSD1306Frame) The frame, or the display itself
+            window (tuple) The first column, last column, first page and last page
+
+        Returns:
+            The number of bytes written
+        """
+        (x0, x1, p0, p1) = window
+        whole = x0 == 0 and x1 == self.width - 1 and p0 == 0 and p1 == self.pages - 1
+        if whole is False or self.window_home is False:
+            frame.cmd_starts.append(len(frame.cmd_queue))
+            frame.cmd_queue.extend((self.SSD1306_COLUMNADDR, x0, x1))
+            frame.cmd_starts.append(len(frame.cmd_queue))
+            frame.cmd_queue.extend((self.SSD1306_PAGEADDR, p0, p1))
+        sent = self.send_commands(frame)
+
+        # Until the write completes, the pointer's position is unknown
+        self.window_home = False
+
+        # The controller's address pointer wraps within the window,
+        # so the data is sent page by page
+        count = (x1 - x0 + 1) * (p1 - p0 + 1)
+        if x0 == 0 and x1 == self.width - 1:
+            # Full-width pages are contiguous in the transmit buffer, so
+            # borrow the byte before them to hold the control byte
+            tx_buffer = frame.tx_buffer
+            start = p0 * self.width
+            saved = tx_buffer[start]
+            tx_buffer[start] = self.SSD1306_WRITETOBUFFER
+            self.i2c.writeto(self.address, tx_buffer, start=start, end=start + count + 1)
+            tx_buffer[start] = saved
+        else:
+            # Gather the window's rows into the scratch buffer, after its control byte
+            start = len(self.CHUNK_HEADER)
+            self.gather(frame, window, start)
+            self.i2c.writeto(self.address, self.scratch, start=start - 1, end=start + count)
+        # Writing the whole window returns the pointer to its start
+        self.window_home = whole
+        return sent + count + 1
+
+    def write_chunk(self, frame, window):
+        """
+        Write a window's address and contents as a single transaction
+
+        Args:
+            frame (SSD1306Frame) The frame, or the display itself
+            window (tuple) The first column, last column, first page and last page
+
+        Returns:
+            The number of bytes written
+        """
+        (x0, x1, p0, p1) = window
+        header = len(self.CHUNK_HEADER)
+        self.window_home = False
+        self.scratch[3] = x0
+        self.scratch[5] = x1
+        self.scratch[9] = p0
+        self.scratch[11] = p1
+        count = self.gather(frame, window, header)
+        self.i2c.writeto(self.address, self.scratch, start=0, end=header + count)
+        return header + count
+
+    def split_window(self, window, limit):
+        """
+        Divide a window into pieces which fit into transactions of at most 'limit' bytes,
+        including the addressing header. Pieces are whole pages where possible, otherwise
+        runs of columns within a page
+
+        Args:
+            window (tuple) The first column, last column, first page and last page
+            limit (int) The largest transaction size, or None for no limit
+
+        Returns:
+            A list of (first column, last column, first page, last page) tuples
+        """
+        (x0, x1, p0, p1) = window
+        if limit is None: return [window]
+        room = limit - len(self.CHUNK_HEADER)
+        span = x1 - x0 + 1
+        chunks = []
+        if span <= room:
+            rows = room // span
+            for page in range(p0, p1 + 1, rows):
+                chunks.append((x0, x1, page, min(page + rows - 1, p1)))
+        else:
+            for page in range(p0, p1 + 1):
+                for column in range(x0, x1 + 1, room):
+                    chunks.append((column, min(column + room - 1, x1), page, page))
+        return chunks
+
+    def gather(self, frame, window, index):
         """
-        Write the display buffer out to I2C
+        Copy a window's rows, page by page, into the scratch buffer
+
+        Args:
+            frame (SSD1306Frame) The frame, or the display itself
+            window (tuple) The first column, last column, first page and last page
+            index (int) Where in the scratch buffer to put the first byte
+
+        Returns:
+            The number of bytes copied
+        """
+        (x0, x1, p0, p1) = window
+        span = x1 - x0 + 1
+        first = index
+        for page in range(p0, p1 + 1):
+            start = page * self.width + x0
+            self.scratch[index:index + span] = frame.buffer[start:start + span]
+            index += span
+        return index - first
+
+    def trim_dirty(self, frame):
+        """
+        Double-buffered mode: shrink each of a frame's dirty ranges to the bytes which differ
+        from those last sent to the panel. Pages which do not differ become clean
+
+        Args:
+            frame (SSD1306Frame) The frame, or the display itself
+        """
+        width = self.width
+        shadow = self.shadow
+        for page in range(0, self.pages):
+            lo = frame.dirty_lo[page]
+            hi = frame.dirty_hi[page]
+            if lo > hi or self.synced[page] is False: continue
+            row = frame.rows[page]
+            if lo == 0 and hi == width - 1:
+                # A whole page, eg. after clear(): compare the views made in advance
+                same = row == self.shadow_rows[page]
+            else:
+                start = page * width
+                same = row[lo:hi + 1] == shadow[start + lo:start + hi + 1]
+            if same is True:
+                frame.dirty_lo[page] = width
+                frame.dirty_hi[page] = -1
+                continue
+            row = self.shadow_rows[page]
+            buffer = frame.rows[page]
+            while buffer[lo] == row[lo]: lo += 1
+            while buffer[hi] == row[hi]: hi -= 1
+            frame.dirty_lo[page] = lo
+            frame.dirty_hi[page] = hi
+
+    def plan_windows(self, frame):
         """
-        buffer = bytearray(len(self.buffer) + 1)
-        buffer[0] = self.SSD1306_WRITETOBUFFER
-        buffer[1:] = self.buffer
-        self.i2c.writeto(self.address, bytes(buffer))
+        Gather a frame's dirty areas into as few address windows as is worthwhile.
+        Neighbouring dirty pages are combined into one window spanning both pages' column
+        ranges, unless doing so would mean sending more than WINDOW_MERGE_THRESHOLD
+        unchanged bytes. If the windows would cost more to send than the whole frame,
+        eg. after a full clear and redraw, the whole frame is sent instead
+
+        Args:
+            frame (SSD1306Frame) The frame, or the display itself
+
+        Returns:
+            A list of (first column, last column, first page, last page) tuples
+        """
+        pages = self.pages
+        dirty_lo = frame.dirty_lo
+        dirty_hi = frame.dirty_hi
+        whole = (0, self.width - 1, 0, pages - 1)
+        # Every page changed across its width, eg. after clear()
+        if dirty_lo.count(0) == pages and dirty_hi.count(self.width - 1) == pages: return [whole]
+
+        windows = []
+        p0 = None
+        threshold = self.WINDOW_MERGE_THRESHOLD
+        for page in range(0, pages):
+            lo = dirty_lo[page]
+            hi = dirty_hi[page]
+            if lo > hi: continue
+            if p0 is not None:
+                left = x0 if x0 < lo else lo
+                right = x1 if x1 > hi else hi
+                merged = (right - left + 1) * (page - p0 + 1)
+                apart = (x1 - x0 + 1) * (p1 - p0 + 1) + (hi - lo + 1)
+                if merged <= apart + threshold:
+                    (x0, x1, p1) = (left, right, page)
+                    continue
+                windows.append((x0, x1, p0, p1))
+            (x0, x1, p0, p1) = (lo, hi, page, page)
+        if p0 is not None: windows.append((x0, x1, p0, p1))
+
+        if len(windows) > 0 and windows[0] != whole:
+            cost = sum(self.window_cost(window) for window in windows)
+            if cost >= self.window_cost(whole): return [whole]
+        return windows
+
+    def window_cost(self, window):
+        """
+        Args:
+            window (tuple) The first column, last column, first page and last page
+
+        Returns:
+            The number of bytes it takes to address and write the window
+        """
+        (x0, x1, p0, p1) = window
+        count = (x1 - x0 + 1) * (p1 - p0 + 1)
+        limit = getattr(self.i2c, "max_transaction", False)
+        if limit is not False: return count + len(self.CHUNK_HEADER) * len(self.split_window(window, limit))
+        if self.window_home is True and count == len(self.buffer): return count + 1
+        # COLUMNADDR and PAGEADDR after their control byte, then the data's control byte
+        return count + 8
 
     def coords_to_index(self, x, y):
         """
@@ -505,6 +1439,309 @@ class SSD1306OLED:
         x = idx - (y << 4)
         return (x, y)
 
+    def rasterise(self, print_string, shift):
+        """
+        Get a string's pixel columns, from the text cache if they are there
+
+        Args:
+            print_string (string) The text to render
+            shift (int) How far down its page, in pixels, the text starts
+
+        Returns:
+            A tuple: the columns for the text's first page, and for the page below
+            it, or None if the text is aligned to a page
+        """
+        key = (print_string, shift)
+        cache = self.text_cache
+        strips = cache.pop(key, None)
+        if strips is not None:
+            # Re-insert the entry to mark it as the most recently used
+            self.text_cache_hits += 1
+            cache[key] = strips
+            return strips
+
+        # Assemble the string's pixel columns from the pre-flipped glyphs
+        self.text_cache_misses += 1
+        columns = b"".join([self.GLYPHS[ord(char) - 32] for char in print_string])
+        if shift == 0:
+            strips = (columns, None)
+        else:
+            strips = (columns.translate(self.SHIFT_LOW[shift]), columns.translate(self.SHIFT_HIGH[shift]))
+
+        if self.text_cache_size > 0:
+            if len(cache) >= self.text_cache_size: del cache[next(iter(cache))]
+            cache[key] = strips
+        return strips
+
+    def draw_rows(self, x, y, inner, outer, color, fill):
+        """
+        Draw a shape which is symmetrical about both axes through (x, y) from the extent
+        of its outline in each row below the centre. Each row is drawn as horizontal
+        spans, so every pixel is written exactly once
+
+        Args:
+            x (int) The centre X co-ordinate
+            y (int) The centre Y co-ordinate
+            inner (list) For each row, the outline's nearest pixel to the vertical axis
+            outer (list) For each row, the outline's furthest pixel from the vertical axis
+            color (int) The color of the pixels: 1 for set, 0 for clear
+            fill (bool) Fill the shape (True) or draw its outline (False)
+
+        Returns:
+            The display object
+        """
+        width = self.width
+        for row in range(0, len(outer)):
+            far = outer[row]
+            if far < 0: continue
+            near = 0 if fill is True else inner[row]
+            if near == 0:
+                spans = ((x - far, x + far),)
+            else:
+                spans = ((x - far, x - near), (x + near, x + far))
+            for line in ((y + row, y - row) if row > 0 else (y,)):
+                if line < 0 or line >= self.height: continue
+                for (left, right) in spans:
+                    # Clip each span to the screen and write it into its page
+                    if left < 0: left = 0
+                    if right >= width: right = width - 1
+                    if right >= left: self.span(line >> 3, left, right - left + 1, 1 << (line & 7), color)
+        return self
+
+    def thin_line(self, x, y, tox, toy, color):
+        """
+        Draw a one-pixel line whose ends are both on the screen. This is the same
+        Bresenham walk as line() takes, but each run is written straight into the
+        buffer and its page's dirty marks, which matters for short segments, eg. charts
+
+        Returns:
+            The display object
+        """
+        buffer = self.buffer
+        width = self.width
+        dirty_lo = self.dirty_lo
+        dirty_hi = self.dirty_hi
+        dx = tox - x
+        dy = toy - y
+        if dy == 0:
+            # Horizontal: a single span
+            self.span(y >> 3, x if dx > 0 else tox, abs(dx) + 1, 1 << (y & 7), color)
+            return self
+
+        if -1 <= dx <= 1:
+            # Vertical, or steep and one column wide at each end: one run per column.
+            # The bits of each run, one per row, are its page bytes in turn
+            if dy > 0:
+                split = dy + 1 if dx == 0 else (dy >> 1) + 1
+                first = ((1 << split) - 1) << y
+                second = ((1 << (dy + 1 - split)) - 1) << (y + split)
+                (top, bottom) = (y, toy)
+            else:
+                split = 1 - dy if dx == 0 else (-dy >> 1) + 1
+                first = ((1 << split) - 1) << (y + 1 - split)
+                second = ((1 << (1 - dy - split)) - 1) << toy
+                (top, bottom) = (toy, y)
+            left = x if dx >= 0 else tox
+            right = tox if dx >= 0 else x
+            index = (top >> 3) * width + x
+            shift = top & 0xF8
+            for page in range(top >> 3, (bottom >> 3) + 1):
+                a = (first >> shift) & 0xFF
+                b = (second >> shift) & 0xFF
+                if color == 1:
+                    if a: buffer[index] |= a
+                    if b: buffer[index + dx] |= b
+                else:
+                    if a: buffer[index] &= ~a
+                    if b: buffer[index + dx] &= ~b
+                if left < dirty_lo[page]: dirty_lo[page] = left
+                if right > dirty_hi[page]: dirty_hi[page] = right
+                index += width
+                shift += 8
+            return self
+
+        sx = 1 if dx > 0 else -1
+        sy = 1 if dy > 0 else -1
+        dx = abs(dx)
+        dy = abs(dy)
+        if dx >= dy:
+            err = dx >> 1
+            remaining = dx + 1
+            while True:
+                run = err // dy + 1
+                if run > remaining: run = remaining
+                left = x if sx > 0 else x - run + 1
+                if run < 4:
+                    # A short run: a few bytes in one page
+                    page = y >> 3
+                    index = page * width + left
+                    mask = 1 << (y & 7)
+                    if color == 1:
+                        for i in range(index, index + run): buffer[i] |= mask
+                    else:
+                        for i in range(index, index + run): buffer[i] &= ~mask
+                    if left < dirty_lo[page]: dirty_lo[page] = left
+                    if left + run - 1 > dirty_hi[page]: dirty_hi[page] = left + run - 1
+                else:
+                    self.span(y >> 3, left, run, 1 << (y & 7), color)
+                remaining -= run
+                if remaining == 0: return self
+                x += sx * run
+                y += sy
+                err += dx - run * dy
+        else:
+            err = dy >> 1
+            remaining = dy + 1
+            while True:
+                # Each run is a column of pixels: a masked byte in each page it crosses
+                run = err // dx + 1
+                if run > remaining: run = remaining
+                top = y if sy > 0 else y - run + 1
+                bottom = top + run - 1
+                page = top >> 3
+                index = page * width + x
+                mask = (0xFF << (top & 7)) & 0xFF
+                while True:
+                    if page == bottom >> 3: mask &= 0xFF >> (7 - (bottom & 7))
+                    if color == 1:
+                        buffer[index] |= mask
+                    else:
+                        buffer[index] &= ~mask
+                    if x < dirty_lo[page]: dirty_lo[page] = x
+                    if x > dirty_hi[page]: dirty_hi[page] = x
+                    if page == bottom >> 3: break
+                    page += 1
+                    index += width
+                    mask = 0xFF
+                remaining -= run
+                if remaining == 0: return self
+                y += sy * run
+                x += sx
+                err += dy - run * dx
+
+    def clip_line(self, x, y, tox, toy, left, top, right, bottom):
+        """
+        Cohen-Sutherland clipping of a line to a rectangle, in integer maths
+
+        Returns:
+            The clipped line's end points as a tuple (x, y, tox, toy),
+            or None if no part of the line is inside the rectangle
+        """
+        def outcode(px, py):
+            code = 0
+            if px < left: code |= 1
+            elif px > right: code |= 2
+            if py < top: code |= 4
+            elif py > bottom: code |= 8
+            return code
+
+        def divide(n, d):
+            # Integer division, rounded to nearest
+            if d < 0:
+                n = -n
+                d = -d
+            return (2 * n + d) // (2 * d)
+
+        code = outcode(x, y)
+        to_code = outcode(tox, toy)
+        for i in range(0, 4):
+            if code | to_code == 0: return (x, y, tox, toy)
+            if code & to_code != 0: return None
+
+            # Move whichever end is outside onto the edge it lies beyond
+            out = code if code != 0 else to_code
+            if out & 4:
+                px = x + divide((tox - x) * (top - y), toy - y)
+                py = top
+            elif out & 8:
+                px = x + divide((tox - x) * (bottom - y), toy - y)
+                py = bottom
+            elif out & 1:
+                py = y + divide((toy - y) * (left - x), tox - x)
+                px = left
+            else:
+                py = y + divide((toy - y) * (right - x), tox - x)
+                px = right
+
+            if out == code:
+                x = px
+                y = py
+                code = outcode(x, y)
+            else:
+                tox = px
+                toy = py
+                to_code = outcode(tox, toy)
+        return (x, y, tox, toy) if code | to_code == 0 else None
+
+    def clip_steps(self, first, last, length):
+        """
+        Order the first and last visible steps along a line's major axis, and widen them
+        by one step each way to absorb rounding in the clipped end points
+
+        Returns:
+            The first and last steps to draw as a tuple
+        """
+        if first > last: (first, last) = (last, first)
+        return (max(0, first - 1), min(length, last + 1))
+
+    def span(self, page, x, count, mask, color):
+        """
+        Set or clear the bits in 'mask' across a run of bytes in one page of the buffer.
+        Calling function should check for valid co-ordinates first
+
+        Args:
+            page (int) The page (row of bytes) to write to
+            x (int) The first column to write
+            count (int) The number of columns to write
+            mask (int) The bits to change in each byte
+            color (int) 1 to set the bits, 0 to clear them
+        """
+        buffer = self.buffer
+        start = page * self.width + x
+        end = start + count
+        if mask == 0xFF and count > 1:
+            # Whole bytes: copy them in
+            if count == self.width:
+                self.rows[page][:] = self.fills[1 if color == 1 else 0]
+            else:
+                buffer[start:end] = self.fills[1 if color == 1 else 0][0:count]
+        elif count < 4:
+            # A few bytes, eg. part of a line: one at a time is quickest
+            if color == 1:
+                for i in range(start, end): buffer[i] |= mask
+            else:
+                mask = ~mask & 0xFF
+                for i in range(start, end): buffer[i] &= mask
+        else:
+            # Part bytes: combine them with the run, all at once
+            value = int.from_bytes(buffer[start:end], "little")
+            pattern = int.from_bytes(bytes([mask]) * count, "little")
+            value = value | pattern if color == 1 else value & ~pattern
+            buffer[start:end] = value.to_bytes(count, "little")
+        if x < self.dirty_lo[page]: self.dirty_lo[page] = x
+        if x + count - 1 > self.dirty_hi[page]: self.dirty_hi[page] = x + count - 1
+
+    def or_into_page(self, page, x, data, color=1):
+        """
+        OR a run of bytes into one page of the buffer, starting at the specified column
+
+        Args:
+            page (int) The page (row of bytes) to write to
+            x (int) The first column to write
+            data (bytes) The bytes to combine with the buffer
+            color (int) 1 to set the bits set in 'data', 0 to clear them. Default: 1
+        """
+        count = len(data)
+        if count == 0: return
+        start = page * self.width + x
+        end = start + count
+        value = int.from_bytes(self.buffer[start:end], "little")
+        pattern = int.from_bytes(data, "little")
+        value = value | pattern if color == 1 else value & ~pattern
+        self.buffer[start:end] = value.to_bytes(count, "little")
+        if x < self.dirty_lo[page]: self.dirty_lo[page] = x
+        if x + count - 1 > self.dirty_hi[page]: self.dirty_hi[page] = x + count - 1
+
     def flip(self, value):
         """
         Rotates the character array from the saved state
@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+
+"""
+A virtual SSD1306 panel, for checking what the driver sends without hardware.
+
+SSD1306Emulator decodes the byte stream written to the controller: control bytes,
+commands and their parameters, and display data. It keeps its own model of the
+panel's display RAM (GDDRAM), following the memory addressing mode, COLUMNADDR and
+PAGEADDR windows, the start line, inversion and hardware scrolling. Attach it to a
+SimulatedI2C at the display's address:
+
+    bus = SimulatedI2C()
+    panel = SSD1306Emulator(128, 64)
+    bus.attach(0x3D, panel)
+    display = SSD1306OLED(SimulatedPin(), bus, 0x3D, 128, 64)
+    ...
+    display.draw()
+    assert panel.matches(display)
+    panel.save("screen.png")
+
+Every data byte which leaves GDDRAM unchanged is counted in 'redundant_bytes':
+bandwidth a smarter update could have saved.
+
+Run an example script on a virtual panel, rather than an MCP2221, to see how
+it uses the bus and what it draws:
+
+    python3 ssd1306_emulator.py boxes_128x64.py --frames 50 --png boxes.png
+"""
+
+# IMPORTS
+import sys
+import zlib
+import struct
+
+# CONSTANTS
+# The number of parameter bytes each command takes, if any
+ARGUMENTS = {0x20: 1, 0x21: 2, 0x22: 2, 0x26: 6, 0x27: 6, 0x29: 5, 0x2A: 5, 0x81: 1, 0x8D: 1,
+             0xA3: 2, 0xA8: 1, 0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+
+# Memory addressing modes
+HORIZONTAL = 0
+VERTICAL = 1
+PAGE = 2
+
+
+# CLASSES
+class SSD1306Emulator:
+    """
+    Decodes SSD1306 I2C traffic into a model of the panel
+    """
+
+    def __init__(self, width=128, height=64):
+        """
+        Args:
+            width (int) The panel's width in pixels. Default: 128
+            height (int) The panel's height in pixels. Default: 64
+        """
+        self.width = width
+        self.height = height
+        self.pages = height // 8
+        self.gddram = bytearray(width * self.pages)
+
+        # Controller state, as at power-on
+        self.mode = PAGE
+        self.column = 0
+        self.page = 0
+        self.column_window = (0, width - 1)
+        self.page_window = (0, self.pages - 1)
+        self.start_line = 0
+        self.inverted = False
+        self.display_on = False
+        self.all_on = False
+        self.seg_remap = False
+        self.com_scan_dec = False
+        self.settings = {}
+        self.scroll = None
+        self.scrolling = False
+        self.scroll_offset = 0
+        self.pending = []
+
+        self.reset_counters()
+
+    def reset_counters(self):
+        """
+        Zero the traffic counters
+        """
+        self.transfers = 0
+        self.control_bytes = 0
+        self.command_bytes = 0
+        self.data_bytes = 0
+        self.redundant_bytes = 0
+        self.scroll_writes = 0
+        self.unknown_commands = 0
+
+    def write(self, data):
+        """
+        Decode one I2C write to the controller. Called by SimulatedI2C
+
+        Args:
+            data (bytes) The bytes written, after the address
+        """
+        self.transfers += 1
+        index = 0
+        while index < len(data):
+            control = data[index]
+            index += 1
+            self.control_bytes += 1
+            is_data = control & 0x40 != 0
+            if control & 0x80:
+                # Continuation bit set: one byte, then another control byte
+                if index < len(data):
+                    self.data(data[index]) if is_data else self.command(data[index])
+                    index += 1
+            else:
+                # Every remaining byte is of the same kind
+                for value in data[index:]:
+                    self.data(value) if is_data else self.command(value)
+                break
+
+    def command(self, value):
+        """
+        Take one command or parameter byte, carrying out the command once it is complete
+
+        Args:
+            value (int) The byte
+        """
+        self.command_bytes += 1
+        self.pending.append(value)
+        if len(self.pending) <= ARGUMENTS.get(self.pending[0], 0): return
+        (opcode, args) = (self.pending[0], self.pending[1:])
+        self.pending = []
+
+        if opcode == 0x20:
+            self.mode = args[0] & 0x03
+        elif opcode == 0x21:
+            self.column_window = (args[0] & 0x7F, args[1] & 0x7F)
+            self.column = self.column_window[0]
+        elif opcode == 0x22:
+            self.page_window = (args[0] & 0x07, args[1] & 0x07)
+            self.page = self.page_window[0]
+        elif opcode <= 0x0F:
+            self.column = (self.column & 0xF0) | opcode
+        elif opcode <= 0x1F:
+            self.column = (self.column & 0x0F) | ((opcode & 0x0F) << 4)
+        elif 0xB0 <= opcode <= 0xB7:
+            self.page = opcode & 0x07
+        elif 0x40 <= opcode <= 0x7F:
+            # Setting the start line also ends any offset left by a vertical scroll
+            self.start_line = opcode & 0x3F
+            self.scroll_offset = 0
+        elif opcode in (0xA6, 0xA7):
+            self.inverted = opcode == 0xA7
+        elif opcode in (0xAE, 0xAF):
+            self.display_on = opcode == 0xAF
+        elif opcode in (0xA4, 0xA5):
+            self.all_on = opcode == 0xA5
+        elif opcode in (0xA0, 0xA1):
+            self.seg_remap = opcode == 0xA1
+        elif opcode in (0xC0, 0xC8):
+            self.com_scan_dec = opcode == 0xC8
+        elif opcode in (0x26, 0x27, 0x29, 0x2A):
+            # Direction, first page, last page and rows per step
+            self.scroll = (-1 if opcode in (0x27, 0x2A) else 1, args[1] & 0x07, args[3] & 0x07,
+                           args[4] & 0x3F if opcode in (0x29, 0x2A) else 0)
+        elif opcode == 0x2F:
+            self.scrolling = self.scroll is not None
+        elif opcode == 0x2E:
+            self.scrolling = False
+            self.scroll_offset = 0
+        elif opcode in ARGUMENTS or opcode == 0xE3:
+            # Timing and power settings, which do not affect the picture
+            self.settings[opcode] = args
+        else:
+            self.unknown_commands += 1
+
+    def data(self, value):
+        """
+        Write one byte to GDDRAM at the address pointer, then move the pointer on
+
+        Args:
+            value (int) The byte
+        """
+        self.data_bytes += 1
+        if self.scrolling is True: self.scroll_writes += 1
+        index = self.page * self.width + self.column
+        if index < len(self.gddram):
+            if self.gddram[index] == value:
+                self.redundant_bytes += 1
+            else:
+                self.gddram[index] = value
+
+        (c0, c1) = self.column_window
+        (p0, p1) = self.page_window
+        if self.mode == HORIZONTAL:
+            self.column += 1
+            if self.column > c1:
+                self.column = c0
+                self.page = self.page + 1 if self.page < p1 else p0
+        elif self.mode == VERTICAL:
+            self.page += 1
+            if self.page > p1:
+                self.page = p0
+                self.column = self.column + 1 if self.column < c1 else c0
+        else:
+            # Page mode: the column pointer wraps within the page
+            self.column += 1
+            if self.column >= self.width: self.column = 0
+
+    def step_scroll(self, steps=1):
+        """
+        Advance an active hardware scroll, as the controller does every few frames
+
+        Args:
+            steps (int) The number of scroll steps. Default: 1
+        """
+        if self.scrolling is False: return
+        (direction, first, last, rows) = self.scroll
+        width = self.width
+        for step in range(0, steps):
+            for page in range(first, last + 1):
+                start = page * width
+                row = self.gddram[start:start + width]
+                if direction > 0:
+                    self.gddram[start:start + width] = row[-1:] + row[:-1]
+                else:
+                    self.gddram[start:start + width] = row[1:] + row[:1]
+            self.scroll_offset = (self.scroll_offset + rows) % self.height
+
+    def matches(self, display):
+        """
+        Returns:
+            True if GDDRAM holds exactly the display's buffer, otherwise False
+        """
+        return self.gddram == display.buffer
+
+    def pixels(self):
+        """
+        The picture on the panel, allowing for the start line, inversion and orientation.
+        The driver's SEGREMAP and COMSCANDEC settings show GDDRAM column 0 on the left
+        and row 0 at the top
+
+        Returns:
+            A list of rows, each a bytearray of 0 (dark) and 1 (lit) values
+        """
+        rows = []
+        for y in range(0, self.height):
+            row = bytearray(self.width)
+            if self.display_on is True:
+                line = (y + self.start_line + self.scroll_offset) % self.height
+                if self.com_scan_dec is False: line = self.height - 1 - line
+                start = (line >> 3) * self.width
+                bit = 1 << (line & 7)
+                for x in range(0, self.width):
+                    column = x if self.seg_remap is True else self.width - 1 - x
+                    lit = self.all_on is True or self.gddram[start + column] & bit != 0
+                    row[x] = 1 if lit is not self.inverted else 0
+            rows.append(row)
+        return rows
+
+    def to_pbm(self):
+        """
+        Returns:
+            The picture as a binary PBM image, lit pixels white
+        """
+        data = bytearray(("P4\n{} {}\n".format(self.width, self.height)).encode("ascii"))
+        for row in self.pixels(): data.extend(self.pack(row, 0))
+        return bytes(data)
+
+    def to_png(self, scale=1):
+        """
+        Args:
+            scale (int) Draw each pixel as a square this many pixels across. Default: 1
+
+        Returns:
+            The picture as a 1-bit greyscale PNG image, lit pixels white
+        """
+        def chunk(kind, body):
+            return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+        raw = bytearray()
+        for row in self.pixels():
+            wide = bytes(value for value in row for i in range(0, scale))
+            line = b"\x00" + self.pack(wide, 1)
+            for i in range(0, scale): raw.extend(line)
+        header = struct.pack(">IIBBBBB", self.width * scale, self.height * scale, 1, 0, 0, 0, 0)
+        return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(bytes(raw), 9)) + chunk(b"IEND", b"")
+
+    def save(self, path, scale=1):
+        """
+        Write the picture to a file, as a PNG if the name ends '.png', otherwise as a PBM
+
+        Args:
+            path (string) The file to write
+            scale (int) For PNGs, the size of each pixel. Default: 1
+        """
+        with open(path, "wb") as file:
+            file.write(self.to_png(scale) if path.lower().endswith(".png") else self.to_pbm())
+
+    def report(self):
+        """
+        Returns:
+            A summary of the traffic decoded so far
+        """
+        wasted = 100 * self.redundant_bytes / self.data_bytes if self.data_bytes > 0 else 0
+        text = "{} transfers: {} control, {} command and {} data bytes; {} data bytes redundant ({:.1f}%)".format(
+            self.transfers, self.control_bytes, self.command_bytes, self.data_bytes, self.redundant_bytes, wasted)
+        if self.scroll_writes > 0: text += "; {} bytes written while scrolling".format(self.scroll_writes)
+        if self.unknown_commands > 0: text += "; {} unknown commands".format(self.unknown_commands)
+        return text
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def pack(self, row, lit):
+        # Pack a row of 0/1 values into bytes, most significant bit first,
+        # setting a bit wherever the value equals 'lit'
+        packed = bytearray((len(row) + 7) >> 3)
+        for x in range(0, len(row)):
+            if row[x] == lit: packed[x >> 3] |= 0x80 >> (x & 7)
+        return bytes(packed)
+
+
+class FrameLimit(Exception):
+    pass
+
+
+def run_example(path, frames=20, width=128, height=64, verify=True):
+    """
+    Run an example script against virtual hardware: a SimulatedI2C bus with an emulated
+    panel at 0x3C and 0x3D. Each call to time.sleep() ends a frame, and the script is
+    stopped after 'frames' of them. A display which sends its frames from a RenderWorker
+    has its worker flushed at the end of each frame, and stopped at the end of the run,
+    so every frame reaches the panel. With 'verify' set, after every render the panel is
+    checked against the frame sent, to show that partial updates are pixel-identical to
+    a full redraw
+
+    Args:
+        path (string) The script to run
+        frames (int) The number of frames to run for. Default: 20
+        width (int) The panel's width. Default: 128
+        height (int) The panel's height. Default: 64
+        verify (bool) Check the panel after every draw(). Default: True
+
+    Returns:
+        A (panel, bus, mismatches) tuple
+    """
+    import time
+    import types
+    import runpy
+    from mcp2221_sim import SimulatedI2C, SimulatedPin
+    from ssd1306_circuitpython import SSD1306OLED
+
+    bus = SimulatedI2C(record=False)
+    panel = SSD1306Emulator(width, height)
+    bus.attach(0x3C, panel)
+    bus.attach(0x3D, panel)
+
+    # Virtual versions of the CircuitPython modules the examples import
+    board = types.ModuleType("board")
+    for name in ("SCL", "SDA", "G0", "G1", "G2", "G3"): setattr(board, name, name)
+    busio = types.ModuleType("busio")
+    busio.I2C = lambda scl, sda, frequency=100000: bus
+    digitalio = types.ModuleType("digitalio")
+    digitalio.DigitalInOut = lambda pin: SimulatedPin()
+    digitalio.Direction = types.SimpleNamespace(INPUT="input", OUTPUT="output")
+
+    mismatches = [0]
+    render = SSD1306OLED.render
+
+    def checked_render(display, frame=None):
+        target = display if frame is None else frame
+        # A frame which carries only commands, eg. from command() with a worker, has no picture to check
+        drawn = any(lo <= hi for (lo, hi) in zip(target.dirty_lo, target.dirty_hi))
+        render(display, frame)
+        if drawn and display.scrolling is None and not panel.matches(target): mismatches[0] += 1
+
+    # The displays the script creates, so their workers can be flushed
+    displays = []
+    init = SSD1306OLED.__init__
+
+    def tracked_init(display, *args, **kwargs):
+        init(display, *args, **kwargs)
+        displays.append(display)
+
+    def settle():
+        for display in displays:
+            if display.worker is not None: display.worker.flush()
+
+    count = [0]
+    sleep = time.sleep
+
+    def frame_sleep(seconds):
+        settle()
+        count[0] += 1
+        if count[0] >= frames: raise FrameLimit()
+
+    saved = {name: sys.modules.get(name) for name in ("board", "busio", "digitalio")}
+    sys.modules.update(board=board, busio=busio, digitalio=digitalio)
+    time.sleep = frame_sleep
+    SSD1306OLED.__init__ = tracked_init
+    if verify is True: SSD1306OLED.render = checked_render
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except FrameLimit:
+        pass
+    finally:
+        # Send the last frame before the panel is looked at
+        for display in displays:
+            if display.worker is not None: display.worker.stop()
+        SSD1306OLED.__init__ = init
+        SSD1306OLED.render = render
+        time.sleep = sleep
+        for (name, module) in saved.items():
+            if module is None:
+                del sys.modules[name]
+            else:
+                sys.modules[name] = module
+    return (panel, bus, mismatches[0])
+
+
+# START
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Run SSD1306 example scripts on a virtual panel")
+    parser.add_argument("scripts", nargs="+", help="the example scripts to run")
+    parser.add_argument("--frames", type=int, default=20, help="frames to run each script for (default: 20)")
+    parser.add_argument("--height", type=int, default=64, help="the panel's height (default: 64)")
+    parser.add_argument("--png", help="save the final picture of the last script here")
+    args = parser.parse_args()
+
+    for script in args.scripts:
+        (panel, bus, mismatches) = run_example(script, args.frames, 128, args.height)
+        print(script)
+        print("  " + panel.report())
+        print("  {:.1f} ms simulated bus time; {} frames differed from the driver's buffer".format(bus.elapsed * 1000, mismatches))
+        if args.png is not None: panel.save(args.png, 4)
@@ -0,0 +1,458 @@
+"""
+Widgets for SSD1306OLED which redraw only what changes.
+
+A Screen holds a set of widgets, each with a fixed area of the display. Widgets
+draw themselves straight into the display buffer, and only when they change: a
+Label is drawn once, a ValueField only when its text differs from what is shown,
+and a BarGauge only across the part of the bar which has grown or shrunk. Each
+Screen.draw() repaints the widgets which have changed, sends the frame, and
+returns the areas repainted, so nothing else is re-rasterised or sent.
+
+    screen = Screen(display)
+    screen.add(Label(display, 0, 0, "CPU:"))
+    cpu = screen.add(ValueField(display, 30, 0, 40, "{:.0f}%"))
+    while True:
+        cpu.set(psutil.cpu_percent())
+        screen.draw()
+
+StripChart plots a stream of readings, eg. CPU utilization, as a chart which
+moves on one column per reading. Each reading is drawn as a single column of
+bytes, straight into the display buffer: the chart never needs replotting. It
+can be used with or without a Screen.
+
+    chart = StripChart(display, 0, 32, 128, 32, maximum=100)
+    while True:
+        chart.push(psutil.cpu_percent())
+        display.draw()
+
+By default the chart sweeps: it stays put and the newest reading replaces the
+oldest, just ahead of a blank cursor column, like an oscilloscope trace, so only
+two columns are sent: a few bytes per reading, whatever the chart's size. With
+'sweep=False' the chart scrolls instead: the columns already drawn are moved one
+to the left, within each page of the buffer, and the newest reading goes in at
+the right. Every column changes, so the chart's whole area is sent on the next
+draw(), eg. 512 bytes per reading for a 128x32 chart.
+"""
+
+
+# CLASSES
+class Widget:
+    """
+    An area of an SSD1306OLED which redraws itself when it has changed. Subclasses
+    provide 'paint()'
+    """
+
+    def __init__(self, display, x, y, width, height):
+        """
+        Args:
+            display (SSD1306OLED) The display to draw on
+            x (int) The X co-ordinate of the widget's left edge
+            y (int) The Y co-ordinate of the widget's top edge
+            width (int) The width of the widget in pixels
+            height (int) The height of the widget in pixels
+        """
+        if x < 0 or y < 0 or width < 1 or height < 1 or x + width > display.width or y + height > display.height:
+            raise ValueError("widget ({}, {}, {}, {}) does not fit the display".format(x, y, width, height))
+        self.display = display
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        # Whether the widget must be painted at the next refresh()
+        self.invalid = True
+
+    def invalidate(self):
+        """
+        Paint the whole widget again at the next refresh(), eg. after the display has been cleared
+
+        Returns:
+            The widget
+        """
+        self.invalid = True
+        return self
+
+    def refresh(self):
+        """
+        Paint the widget into the display buffer if it has changed
+
+        Returns:
+            The (x, y, width, height) area painted, or None if the widget had not changed
+        """
+        if self.invalid is False: return None
+        self.invalid = False
+        return self.paint()
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def paint(self):
+        # Draw the widget. Returns the area drawn
+        self.display.fill_rect(self.x, self.y, self.width, self.height, 0)
+        return (self.x, self.y, self.width, self.height)
+
+
+class Label(Widget):
+    """
+    A line of text. It is drawn once, and again only if its text is changed
+    """
+
+    def __init__(self, display, x, y, text, width=None, align="left"):
+        """
+        Args:
+            display (SSD1306OLED) The display to draw on
+            x (int) The X co-ordinate of the label's left edge
+            y (int) The Y co-ordinate of the top of the text
+            text (string) The text to show
+            width (int) The width of the label in pixels; longer text is cut off. Default: the width of 'text'
+            align (string) Where the text sits within the width: 'left' or 'right'. Default: 'left'
+        """
+        if width is None: width = max(1, display.length_of_string(text))
+        super().__init__(display, x, y, width, 8)
+        self.text = text
+        self.align = align
+
+    def set_text(self, text):
+        """
+        Change the label's text. It is redrawn at the next refresh() only if the text differs
+
+        Args:
+            text (string) The text to show
+
+        Returns:
+            The label
+        """
+        if text != self.text:
+            self.text = text
+            self.invalid = True
+        return self
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def paint(self):
+        display = self.display
+        display.fill_rect(self.x, self.y, self.width, self.height, 0)
+        if len(self.text) > 0:
+            columns = display.rasterise(self.text, 0)[0][0:self.width]
+            x = self.x + self.width - len(columns) if self.align == "right" else self.x
+            display.blit(columns, x, self.y)
+        return (self.x, self.y, self.width, self.height)
+
+
+class ValueField(Label):
+    """
+    A value shown as text. Its text is formatted whenever the value is set, but it is
+    redrawn only if the text has changed
+    """
+
+    def __init__(self, display, x, y, width, format="{}", align="left"):
+        """
+        Args:
+            display (SSD1306OLED) The display to draw on
+            x (int) The X co-ordinate of the field's left edge
+            y (int) The Y co-ordinate of the top of the text
+            width (int) The width of the field in pixels; longer text is cut off
+            format (string) The format string which turns a value into text. Default: '{}'
+            align (string) Where the text sits within the width: 'left' or 'right'. Default: 'left'
+        """
+        super().__init__(display, x, y, "", width, align)
+        self.format = format
+        self.value = None
+
+    def set(self, value):
+        """
+        Show a new value
+
+        Args:
+            value (any) The value, passed to the field's format string
+
+        Returns:
+            The field
+        """
+        self.value = value
+        return self.set_text(self.format.format(value))
+
+
+class BarGauge(Widget):
+    """
+    A horizontal bar, filled from the left in proportion to a value. When the value
+    changes, only the part of the bar which changes is drawn
+    """
+
+    def __init__(self, display, x, y, width, height, minimum=0, maximum=100):
+        """
+        Args:
+            display (SSD1306OLED) The display to draw on
+            x (int) The X co-ordinate of the gauge's left edge
+            y (int) The Y co-ordinate of the gauge's top edge
+            width (int) The width of the gauge, including its one-pixel border
+            height (int) The height of the gauge, including its one-pixel border
+            minimum (float) The value shown by an empty bar. Default: 0
+            maximum (float) The value shown by a full bar. Default: 100
+        """
+        if width < 3 or height < 3: raise ValueError("a gauge must be at least 3 pixels wide and high")
+        super().__init__(display, x, y, width, height)
+        self.minimum = minimum
+        self.maximum = maximum
+        # The length of the bar within the border, as set and as drawn
+        self.length = 0
+        self.drawn = None
+
+    def set(self, value):
+        """
+        Show a new value. Values outside the gauge's range show as an empty or full bar
+
+        Args:
+            value (float) The value
+
+        Returns:
+            The gauge
+        """
+        span = self.maximum - self.minimum
+        fraction = (value - self.minimum) / span if span != 0 else 0
+        if fraction < 0: fraction = 0
+        if fraction > 1: fraction = 1
+        length = int(fraction * (self.width - 2) + 0.5)
+        if length != self.length:
+            self.length = length
+            self.invalid = True
+        return self
+
+    def invalidate(self):
+        """
+        Paint the whole gauge, border and all, at the next refresh()
+
+        Returns:
+            The gauge
+        """
+        self.drawn = None
+        return super().invalidate()
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def paint(self):
+        display = self.display
+        (x, y, height) = (self.x + 1, self.y + 1, self.height - 2)
+        if self.drawn is None:
+            display.rect(self.x, self.y, self.width, self.height)
+            display.fill_rect(x, y, self.length, height)
+            self.drawn = self.length
+            return (self.x, self.y, self.width, self.height)
+
+        # Grow or shrink the bar from its end
+        start = min(self.length, self.drawn)
+        count = abs(self.length - self.drawn)
+        display.fill_rect(x + start, y, count, height, 1 if self.length > self.drawn else 0)
+        self.drawn = self.length
+        return (x + start, y, count, height)
+
+
+class Screen:
+    """
+    A set of widgets on one SSD1306OLED, repainted only where they have changed
+    """
+
+    def __init__(self, display):
+        """
+        Args:
+            display (SSD1306OLED) The display the widgets draw on
+        """
+        self.display = display
+        self.widgets = []
+        # The areas repainted by the last draw()
+        self.regions = []
+
+    def add(self, widget):
+        """
+        Add a widget. It is painted at the next draw()
+
+        Args:
+            widget (Widget) The widget
+
+        Returns:
+            The widget
+        """
+        self.widgets.append(widget)
+        widget.invalidate()
+        return widget
+
+    def remove(self, widget):
+        """
+        Remove a widget, blanking its area at the next draw()
+
+        Args:
+            widget (Widget) The widget
+        """
+        self.widgets.remove(widget)
+        self.display.fill_rect(widget.x, widget.y, widget.width, widget.height, 0)
+        self.regions.append((widget.x, widget.y, widget.width, widget.height))
+
+    def invalidate(self):
+        """
+        Repaint every widget at the next draw(), eg. after the display has been cleared
+        """
+        for widget in self.widgets: widget.invalidate()
+
+    def draw(self):
+        """
+        Paint the widgets which have changed, then draw the display, which sends only
+        the areas painted and anything drawn outside the widgets
+
+        Returns:
+            A list of the (x, y, width, height) areas repainted
+        """
+        regions = []
+        for widget in self.widgets:
+            region = widget.refresh()
+            if region is not None: regions.append(region)
+        self.regions = regions
+        self.display.draw()
+        return regions
+
+
+class StripChart(Widget):
+    """
+    A chart of recent readings, one column per reading, in an area of an SSD1306OLED.
+    Unlike other widgets, it draws each reading at once, as it is pushed
+    """
+
+    def __init__(self, display, x, y, width, height, minimum=0, maximum=100, fill=False, sweep=True):
+        """
+        Args:
+            display (SSD1306OLED) The display to draw on
+            x (int) The X co-ordinate of the chart's left edge
+            y (int) The Y co-ordinate of the chart's top edge. Must be a multiple of 8
+            width (int) The width of the chart in pixels: the number of readings shown
+            height (int) The height of the chart in pixels. Must be a multiple of 8
+            minimum (float) The reading shown at the bottom of the chart. Default: 0
+            maximum (float) The reading shown at the top of the chart. Default: 100
+            fill (bool) Fill the area under the trace (True) or draw the trace alone (False). Default: False
+            sweep (bool) Overwrite the oldest reading at a moving cursor (True) or scroll (False). Default: True
+        """
+        if x < 0 or y < 0 or width < 2 or height < 8 or x + width > display.width or y + height > display.height:
+            raise ValueError("chart ({}, {}, {}, {}) does not fit the display".format(x, y, width, height))
+        if y % 8 != 0 or height % 8 != 0:
+            raise ValueError("chart ({}, {}, {}, {}) is not aligned to 8-pixel pages".format(x, y, width, height))
+
+        super().__init__(display, x, y, width, height)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.fill = fill
+        self.sweep = sweep
+
+        # The start of each of the chart's rows of bytes in the display buffer
+        self.rows = [page * display.width + x for page in range(y >> 3, (y + height) >> 3)]
+        # Each column's pixels, as a bit pattern with the chart's top row in bit 0,
+        # in screen order; the row of the last reading, for joining the trace up;
+        # and, in sweep mode, the column the next reading goes into
+        self.columns = [0] * width
+        self.last = None
+        self.cursor = 0
+        self.readings = 0
+        # The area changed by pushes since the last refresh(), for a Screen
+        self.region = None
+        self.invalid = False
+
+    def push(self, value):
+        """
+        Add a reading to the chart. Call the display's draw() to show it
+
+        Args:
+            value (float) The reading. Readings outside the chart's range are drawn at its edge
+
+        Returns:
+            The chart
+        """
+        row = self.row_of(value)
+        if self.fill is True:
+            bits = ((1 << (self.height - row)) - 1) << row
+        else:
+            # Join the trace to the last reading with a vertical run of pixels
+            top = row if self.last is None else min(row, self.last)
+            bottom = row if self.last is None else max(row, self.last)
+            bits = ((1 << (bottom - top + 1)) - 1) << top
+        self.last = row
+        self.readings += 1
+
+        if self.sweep is True:
+            column = self.cursor
+            self.columns[column] = bits
+            self.write_column(column, bits)
+            self.cursor = column + 1 if column + 1 < self.width else 0
+            count = 1
+            if column + 1 < self.width:
+                # Blank the column ahead, to show where the trace is being drawn
+                self.columns[column + 1] = 0
+                self.write_column(column + 1, 0)
+                count = 2
+            self.display.mark_dirty(self.x + column, self.y, count, self.height)
+            self.changed((self.x + column, self.y, count, self.height))
+        else:
+            # Move every column one to the left, a row of bytes at a time
+            buffer = self.display.buffer
+            last = self.width - 1
+            for start in self.rows: buffer[start:start + last] = buffer[start + 1:start + self.width]
+            del self.columns[0]
+            self.columns.append(bits)
+            self.write_column(last, bits)
+            self.display.mark_dirty(self.x, self.y, self.width, self.height)
+            self.changed((self.x, self.y, self.width, self.height))
+        return self
+
+    def clear(self):
+        """
+        Remove every reading from the chart
+
+        Returns:
+            The chart
+        """
+        self.columns = [0] * self.width
+        self.last = None
+        self.cursor = 0
+        return self.redraw()
+
+    def redraw(self):
+        """
+        Draw the whole chart again, eg. after the display has been cleared
+
+        Returns:
+            The chart
+        """
+        for column in range(0, self.width): self.write_column(column, self.columns[column])
+        self.display.mark_dirty(self.x, self.y, self.width, self.height)
+        self.changed((self.x, self.y, self.width, self.height))
+        return self
+
+    # ***** PRIVATE FUNCTIONS *****
+
+    def paint(self):
+        # The chart is drawn as readings are pushed, so report what they changed,
+        # unless the whole chart is wanted, eg. after the display was cleared
+        region = self.region
+        self.region = None
+        if region is None:
+            self.redraw()
+            region = self.region
+            self.region = None
+            self.invalid = False
+        return region
+
+    def changed(self, region):
+        # Note an area drawn by push() or redraw(), for the next refresh()
+        if self.region is not None and self.region != region:
+            region = (self.x, self.y, self.width, self.height)
+        self.region = region
+        self.invalid = True
+
+    def row_of(self, value):
+        # The chart row, 0 at the top, at which to plot a reading
+        span = self.maximum - self.minimum
+        fraction = (value - self.minimum) / span if span != 0 else 0
+        if fraction < 0: fraction = 0
+        if fraction > 1: fraction = 1
+        return self.height - 1 - int(fraction * (self.height - 1) + 0.5)
+
+    def write_column(self, column, bits):
+        # Write one column's bit pattern into the buffer, a byte per page
+        buffer = self.display.buffer
+        for start in self.rows:
+            buffer[start + column] = bits & 0xFF
+            bits >>= 8
@@ -0,0 +1,5 @@
+# The drivers and tools are plain scripts in the i2c directory, imported by name
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,82 @@
+"""
+Checks of DisplayStats' figures when frames are rendered on another thread, and when writes fail
+"""
+
+# IMPORTS
+import threading
+import unittest
+from display_stats import DisplayStats, CountingI2C
+from htk1633segment_circuitpython import HT16K33Segment
+
+
+# CLASSES
+class GateI2C:
+    # Holds writes made on the 'render' thread until released
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def writeto(self, address, buffer, start=0, end=None):
+        if threading.current_thread().name == "render":
+            self.entered.set()
+            self.release.wait(5)
+
+
+class FailingI2C:
+    def writeto(self, address, buffer, start=0, end=None):
+        raise OSError("no ACK")
+
+
+class DisplayStatsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.i2c = GateI2C()
+        self.display = HT16K33Segment(self.i2c)
+        self.stats = DisplayStats().attach(self.display)
+
+    def render_elsewhere(self, during):
+        # Render a frame on another thread, calling 'during' while it is on the bus
+        thread = threading.Thread(target=self.display.render, name="render")
+        thread.start()
+        self.assertTrue(self.i2c.entered.wait(5))
+        during()
+        self.i2c.release.set()
+        thread.join()
+
+    def test_frame_counts_only_the_rendering_threads_transfers(self):
+        self.display.mark_dirty()
+        before = (self.stats.transactions, self.stats.bytes)
+        self.render_elsewhere(lambda: self.display.i2c.writeto(0x70, b"\x21\x00\x00"))
+        self.assertEqual(self.stats.frames, 1)
+        self.assertEqual(self.stats.frame_transactions, self.stats.transactions - before[0] - 1)
+        self.assertEqual(self.stats.frame_bytes, self.stats.bytes - before[1] - 3)
+        self.assertGreater(self.stats.frame_bytes, 0)
+
+    def test_render_on_another_thread_is_not_taken_from_drawing_time(self):
+        self.display.mark_dirty()
+        self.stats.local.depth = 1
+        try:
+            self.render_elsewhere(lambda: None)
+        finally:
+            self.stats.local.depth = 0
+        self.assertEqual(self.stats.primitive_time, 0.0)
+
+    def test_render_within_a_drawing_method_is_taken_from_drawing_time(self):
+        self.i2c.release.set()
+        wrapped = self.stats.wrap_primitive("redraw", lambda: self.display.render())
+        wrapped()
+        self.assertGreaterEqual(self.stats.primitive_time, 0.0)
+        self.assertLessEqual(self.stats.primitive_time, self.stats.render_time)
+
+    def test_failed_writes_are_not_counted(self):
+        stats = DisplayStats()
+        i2c = CountingI2C(FailingI2C(), stats)
+        with self.assertRaises(OSError): i2c.writeto(0x70, b"\x21")
+        self.assertEqual((stats.transactions, stats.bytes), (0, 0))
+        i2c = CountingI2C(GateI2C(), stats)
+        i2c.writeto(0x70, bytearray(17), start=1, end=9)
+        self.assertEqual((stats.transactions, stats.bytes), (1, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Checks of the numbers and text HT16K33Segment and HT16K33SegmentChain put on their digits
+"""
+
+# IMPORTS
+import unittest
+from htk1633segment_circuitpython import HT16K33Segment, HT16K33SegmentChain
+
+
+# CLASSES
+class NullI2C:
+    # Accepts and ignores every write
+    def writeto(self, address, buffer, start=0, end=None):
+        pass
+
+
+class RecordingI2C:
+    # Keeps every write, with the address it went to
+    def __init__(self):
+        self.writes = []
+
+    def writeto(self, address, buffer, start=0, end=None):
+        self.writes.append((address, bytes(buffer[start:end])))
+
+
+# FUNCTIONS
+def shown(glyphs):
+    # The text a run of glyphs shows, with '.' after each digit whose point is lit
+    text = {glyph: char for (char, glyph) in HT16K33Segment.segments.items() if char not in "ABCDEF"}
+    return "".join(text.get(glyph & 0x7F, "?") + ("." if glyph & 0x80 else "") for glyph in glyphs)
+
+
+class SetValueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.display = HT16K33Segment(NullI2C())
+
+    def value(self, *args):
+        self.display.set_value(*args)
+        return shown(self.display.buffer[pos] for pos in self.display.pos)
+
+    def test_numbers(self):
+        self.assertEqual(self.value(42), "  42")
+        self.assertEqual(self.value(42, None, "0"), "0042")
+        self.assertEqual(self.value(-5), "  -5")
+        self.assertEqual(self.value(-5, None, "0"), "-005")
+        self.assertEqual(self.value(-123), "-123")
+        self.assertEqual(self.value(12345), "----")
+        self.assertEqual(self.value(-1234), "----")
+
+    def test_floats(self):
+        self.assertEqual(self.value(0.5), "0.500")
+        self.assertEqual(self.value(3.14159), "3.142")
+        self.assertEqual(self.value(12.5), "12.50")
+        self.assertEqual(self.value(-12.5), "-12.5")
+        self.assertEqual(self.value(-9.999), "-10.0")
+
+    def test_negative_fractions_keep_the_sign_in_front(self):
+        self.assertEqual(self.value(-0.5), "-0.50")
+        self.assertEqual(self.value(-0.5, None, "0"), "-0.50")
+        self.assertEqual(self.value(-0.26, 1), " -0.3")
+
+    def test_negative_values_which_round_to_zero_take_no_sign(self):
+        self.assertEqual(self.value(-0.0004), " 0.00")
+        self.assertEqual(self.value(-0.04, 1), "  0.0")
+        self.assertEqual(self.value(-0.04, 1, "0"), "000.0")
+
+
+class ChainSetValueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.chain = HT16K33SegmentChain(NullI2C(), (0x70, 0x71))
+
+    def value(self, *args):
+        self.chain.set_value(*args)
+        return shown(module.buffer[pos] for module in self.chain.modules for pos in module.pos)
+
+    def test_negative_fractions(self):
+        self.assertEqual(self.value(-0.5), "   -0.500")
+        self.assertEqual(self.value(-0.5, None, "0"), "-0000.500")
+        self.assertEqual(self.value(-0.0004), "    0.000")
+        self.assertEqual(self.value(-0.04, 1, "0"), "0000000.0")
+
+    def test_numbers_across_modules(self):
+        self.assertEqual(self.value(-1234567), "-1234567")
+        self.assertEqual(self.value(-12345678), "--------")
+        self.assertEqual(self.value(123456), "  123456")
+
+
+class BlinkRateTests(unittest.TestCase):
+
+    def test_rates_set_the_datasheet_codes(self):
+        i2c = RecordingI2C()
+        display = HT16K33Segment(i2c)
+        for (rate, command) in ((0, 0x81), (2, 0x83), (1, 0x85), (0.5, 0x87)):
+            del i2c.writes[:]
+            display.set_blink_rate(rate)
+            self.assertEqual(i2c.writes, [(0x70, bytes([command]))])
+            self.assertEqual(display.blink_rate, rate)
+
+    def test_other_rates_are_ignored(self):
+        i2c = RecordingI2C()
+        display = HT16K33Segment(i2c)
+        del i2c.writes[:]
+        display.set_blink_rate(3)
+        self.assertEqual(i2c.writes, [])
+        self.assertEqual(display.blink_rate, 0)
+
+    def test_chain_sends_one_write_per_module_which_needs_it(self):
+        i2c = RecordingI2C()
+        chain = HT16K33SegmentChain(i2c, (0x70, 0x71, 0x72))
+        chain.set_blink_rate(0.5, 1)
+        del i2c.writes[:]
+        chain.set_blink_rate(0.5)
+        self.assertEqual(i2c.writes, [(0x70, bytes([0x87])), (0x72, bytes([0x87]))])
+        del i2c.writes[:]
+        chain.set_blink_rate(0.5)
+        self.assertEqual(i2c.writes, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Checks that TraceRecorder's traces read back as recorded, including from several buses
+"""
+
+# IMPORTS
+import os
+import tempfile
+import unittest
+from i2c_trace import TraceRecorder, read_trace, WRITE, READ
+from mcp2221_sim import SimulatedI2C
+
+
+# CLASSES
+class TraceTests(unittest.TestCase):
+
+    def setUp(self):
+        (handle, self.path) = tempfile.mkstemp(suffix=".trace")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_transfers_read_back(self):
+        recorder = TraceRecorder(SimulatedI2C(), self.path)
+        recorder.writeto(0x3C, b"\x00\xAF")
+        recorder.readfrom_into(0x70, bytearray(2))
+        recorder.close()
+        records = read_trace(self.path)
+        self.assertEqual([(op, address, payload) for (stamp, op, address, payload) in records],
+                         [(WRITE, 0x3C, b"\x00\xAF"), (READ, 0x70, b"\x00\x00")])
+
+    def test_shared_recorders_keep_every_bus(self):
+        first = TraceRecorder(SimulatedI2C(), self.path)
+        second = TraceRecorder(SimulatedI2C(), self.path, first)
+        first.writeto(0x3C, b"\x01")
+        second.writeto(0x70, b"\x02")
+        first.writeto(0x3C, b"\x03")
+        second.close()
+        first.close()
+        records = read_trace(self.path)
+        self.assertEqual([(address, payload) for (stamp, op, address, payload) in records],
+                         [(0x3C, b"\x01"), (0x70, b"\x02"), (0x3C, b"\x03")])
+        stamps = [stamp for (stamp, op, address, payload) in records]
+        self.assertEqual(stamps, sorted(stamps))
+        self.assertEqual((first.records, second.records), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Checks of the snapshots MetricsSampler gives, including metrics whose readings fail
+"""
+
+# IMPORTS
+import unittest
+from metrics_sampler import MetricsSampler
+
+
+# CLASSES
+class Failing:
+    # A metric which raises until 'fail' is cleared, then counts its readings
+    def __init__(self):
+        self.fail = True
+        self.count = 0
+
+    def __call__(self):
+        if self.fail is True: raise OSError("no counters")
+        self.count += 1
+        return self.count
+
+
+class SnapshotTests(unittest.TestCase):
+
+    def test_every_metric_is_in_the_first_snapshot(self):
+        metric = Failing()
+        sampler = MetricsSampler({"good": (lambda: 42, 1.0), "bad": (metric, 1.0)}, {"cores": lambda: 8})
+        self.assertEqual(sampler.snapshot(), {"good": None, "bad": None, "cores": 8})
+        sampler.sample(0)
+        self.assertEqual(sampler.snapshot(), {"good": 42, "bad": None, "cores": 8})
+        self.assertEqual(sampler.errors, 1)
+        self.assertEqual(sampler.recent("bad"), [])
+
+    def test_a_failed_metric_takes_its_first_good_reading(self):
+        metric = Failing()
+        sampler = MetricsSampler({"bad": (metric, 1.0)})
+        sampler.sample(0)
+        first = sampler.snapshot()
+        metric.fail = False
+        sampler.sample(1)
+        self.assertEqual(sampler.snapshot()["bad"], 1)
+        self.assertEqual(first["bad"], None)
+        # A later failure keeps the last good reading
+        metric.fail = True
+        sampler.sample(2)
+        self.assertEqual(sampler.snapshot()["bad"], 1)
+
+    def test_added_metrics_are_seeded(self):
+        sampler = MetricsSampler()
+        before = sampler.snapshot()
+        sampler.add("late", lambda: 7, 1.0)
+        self.assertEqual(sampler.snapshot(), {"late": None})
+        self.assertEqual(before, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
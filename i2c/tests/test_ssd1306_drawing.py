@@ -0,0 +1,196 @@
+"""
+Checks of SSD1306OLED's shape rasterisers against simple reference plots
+"""
+
+# IMPORTS
+import random
+import unittest
+from ssd1306_circuitpython import SSD1306OLED
+
+
+# FUNCTIONS
+def lit_pixels(display):
+    # The set of pixels set in the display buffer
+    return set((x, y) for y in range(0, display.height) for x in range(0, display.width)
+               if display.buffer[(y >> 3) * display.width + x] & (1 << (y & 7)))
+
+
+def reference_ellipse(x, y, x_radius, y_radius):
+    # Textbook two-region midpoint ellipse, in floating point, plotting all four
+    # quadrants point by point. A flat ellipse's outline runs along its centre row
+    # out to the x radius
+    points = set()
+    def plot(dx, dy):
+        for (sx, sy) in ((1, 1), (1, -1), (-1, 1), (-1, -1)): points.add((x + sx * dx, y + sy * dy))
+
+    a2 = x_radius * x_radius
+    b2 = y_radius * y_radius
+    dx = 0
+    dy = y_radius
+    plot(dx, dy)
+    p1 = b2 - a2 * y_radius + a2 / 4
+    px = 0
+    py = 2 * a2 * dy
+    while px < py:
+        dx += 1
+        px += 2 * b2
+        if p1 < 0:
+            p1 += b2 + px
+        else:
+            dy -= 1
+            py -= 2 * a2
+            p1 += b2 + px - py
+        plot(dx, dy)
+    p2 = b2 * (dx + 0.5) ** 2 + a2 * (dy - 1) ** 2 - a2 * b2
+    while dy > 0:
+        dy -= 1
+        py -= 2 * a2
+        if p2 > 0:
+            p2 += a2 - py
+        else:
+            dx += 1
+            px += 2 * b2
+            p2 += a2 - py + px
+        plot(dx, dy)
+    while dx < x_radius:
+        dx += 1
+        plot(dx, 0)
+    return points
+
+
+def reference_line(x, y, tox, toy, width=128, height=64):
+    # Textbook Bresenham, a pixel at a time, keeping the pixels on the screen
+    points = set()
+    dx = abs(tox - x)
+    dy = abs(toy - y)
+    sx = 1 if tox >= x else -1
+    sy = 1 if toy >= y else -1
+    if dx >= dy:
+        err = dx >> 1
+        for i in range(0, dx + 1):
+            points.add((x, y))
+            x += sx
+            err -= dy
+            if err < 0:
+                y += sy
+                err += dx
+    else:
+        err = dy >> 1
+        for i in range(0, dy + 1):
+            points.add((x, y))
+            y += sy
+            err -= dx
+            if err < 0:
+                x += sx
+                err += dy
+    return set((px, py) for (px, py) in points if 0 <= px < width and 0 <= py < height)
+
+
+def filled(points):
+    # Every pixel between the leftmost and rightmost outline pixels of each row
+    rows = {}
+    for (x, y) in points:
+        (left, right) = rows.get(y, (x, x))
+        rows[y] = (min(left, x), max(right, x))
+    return set((x, y) for (y, (left, right)) in rows.items() for x in range(left, right + 1))
+
+
+# CLASSES
+class EllipseTests(unittest.TestCase):
+
+    def setUp(self):
+        self.display = SSD1306OLED(None, None, width=128, height=64)
+
+    def draw(self, x_radius, y_radius, fill=False):
+        self.display.buffer[:] = self.display.blank
+        self.display.ellipse(64, 32, x_radius, y_radius, 1, fill)
+        return lit_pixels(self.display)
+
+    def test_outlines_match_reference(self):
+        for x_radius in range(0, 64):
+            for y_radius in range(0, 32):
+                with self.subTest(x_radius=x_radius, y_radius=y_radius):
+                    self.assertEqual(self.draw(x_radius, y_radius), reference_ellipse(64, 32, x_radius, y_radius))
+
+    def test_fills_match_reference(self):
+        for x_radius in range(0, 64, 3):
+            for y_radius in (0, 1, 2, 3, 5, 8, 13, 21, 31):
+                with self.subTest(x_radius=x_radius, y_radius=y_radius):
+                    self.assertEqual(self.draw(x_radius, y_radius, True), filled(reference_ellipse(64, 32, x_radius, y_radius)))
+
+    def test_flat_ellipse_reaches_x_radius(self):
+        self.display.ellipse(64, 10, 20, 1)
+        row = [x for (x, y) in lit_pixels(self.display) if y == 10]
+        self.assertEqual((min(row), max(row)), (44, 84))
+
+    def test_thin_ellipses_span_both_radii(self):
+        for (x_radius, y_radius) in ((63, 1), (63, 2), (40, 2), (1, 31), (2, 31)):
+            with self.subTest(x_radius=x_radius, y_radius=y_radius):
+                lit = self.draw(x_radius, y_radius)
+                self.assertEqual(min(x for (x, y) in lit), 64 - x_radius)
+                self.assertEqual(max(x for (x, y) in lit), 64 + x_radius)
+                self.assertEqual(min(y for (x, y) in lit), 32 - y_radius)
+                self.assertEqual(max(y for (x, y) in lit), 32 + y_radius)
+
+    def test_clipped_ellipse_matches_reference(self):
+        self.display.ellipse(4, 60, 30, 12)
+        expected = set((x, y) for (x, y) in reference_ellipse(4, 60, 30, 12) if 0 <= x < 128 and 0 <= y < 64)
+        self.assertEqual(lit_pixels(self.display), expected)
+
+
+class LineTests(unittest.TestCase):
+
+    def setUp(self):
+        self.display = SSD1306OLED(None, None, width=128, height=64)
+        self.random = random.Random(1)
+
+    def segments(self, count):
+        # On-screen lines, steep lines one or two columns wide, and lines running off the screen
+        for i in range(0, count):
+            if i % 3 == 0:
+                x = self.random.randint(0, 127)
+                yield (x, self.random.randint(0, 63), min(127, max(0, x + self.random.randint(-1, 1))), self.random.randint(0, 63))
+            elif i % 3 == 1:
+                yield (self.random.randint(0, 127), self.random.randint(0, 63), self.random.randint(0, 127), self.random.randint(0, 63))
+            else:
+                yield (self.random.randint(-40, 167), self.random.randint(-20, 83), self.random.randint(-40, 167), self.random.randint(-20, 83))
+
+    def clean(self):
+        # Clear the buffer and its dirty marks
+        self.display.buffer[:] = self.display.blank
+        self.display.dirty_lo = [128] * 8
+        self.display.dirty_hi = [-1] * 8
+
+    def test_lines_match_reference(self):
+        for segment in self.segments(3000):
+            with self.subTest(segment=segment):
+                self.clean()
+                self.display.line(*segment)
+                lit = lit_pixels(self.display)
+                self.assertEqual(lit, reference_line(*segment))
+                for (x, y) in lit: self.assertTrue(self.display.dirty_lo[y >> 3] <= x <= self.display.dirty_hi[y >> 3])
+                self.display.line(*segment, 1, 0)
+                self.assertEqual(lit_pixels(self.display), set())
+
+    def test_polyline_matches_lines(self):
+        for count in (1, 2, 3, 5, 20, 128):
+            for offscreen in (False, True):
+                with self.subTest(count=count, offscreen=offscreen):
+                    if count == 128:
+                        points = [(x, self.random.randint(0, 63)) for x in range(0, 128)]
+                    else:
+                        points = [(self.random.randint(0, 127), self.random.randint(0, 63)) for i in range(0, count)]
+                    if offscreen: points[-1] = (140, -3)
+                    expected = set()
+                    for i in range(0, len(points)): expected |= reference_line(*points[max(0, i - 1)], *points[i])
+                    self.clean()
+                    self.display.polyline(points)
+                    lit = lit_pixels(self.display)
+                    self.assertEqual(lit, expected)
+                    for (x, y) in lit: self.assertTrue(self.display.dirty_lo[y >> 3] <= x <= self.display.dirty_hi[y >> 3])
+                    self.display.polyline(points, 0)
+                    self.assertEqual(lit_pixels(self.display), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,254 @@
+"""
+Checks that what SSD1306OLED sends puts its buffer on an emulated panel, with and without a RenderWorker
+"""
+
+# IMPORTS
+import os
+import sys
+import asyncio
+import tempfile
+import textwrap
+import unittest
+from mcp2221_sim import SimulatedI2C, SimulatedPin
+from render_worker import RenderWorker, AsyncRenderWorker
+from multiprocessing import resource_tracker
+from display_server import DisplayServer, DisplayClient
+from ssd1306_circuitpython import SSD1306OLED
+from ssd1306_emulator import SSD1306Emulator, run_example
+
+
+# CONSTANTS
+EXAMPLES = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A script which draws one more column of page 0 each frame, sending its frames
+# from a RenderWorker
+WORKER_SCRIPT = textwrap.dedent('''
+    import time
+    import board
+    import busio
+    import digitalio
+    from ssd1306_circuitpython import SSD1306OLED
+    from render_worker import RenderWorker
+
+    i2c = busio.I2C(board.SCL, board.SDA)
+    display = SSD1306OLED(digitalio.DigitalInOut(board.G0), i2c, 0x3D, 128, 64)
+    RenderWorker(display).start()
+    column = 0
+    while True:
+        display.fill_rect(column, 0, 1, 8, 1).draw()
+        column += 1
+        time.sleep(0.5)
+''')
+
+
+# CLASSES
+class EmulatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = SimulatedI2C(record=False)
+        self.panel = SSD1306Emulator(128, 64)
+        self.bus.attach(0x3D, self.panel)
+        self.display = SSD1306OLED(SimulatedPin(), self.bus, 0x3D, 128, 64)
+
+    def test_partial_updates_match_the_buffer(self):
+        self.display.draw()
+        self.assertTrue(self.panel.matches(self.display))
+        for (x, y, width, height) in ((3, 5, 20, 9), (100, 40, 28, 24), (0, 0, 1, 1), (60, 30, 7, 2)):
+            self.display.fill_rect(x, y, width, height, 1).draw()
+            self.assertTrue(self.panel.matches(self.display))
+        self.display.clear().draw()
+        self.assertEqual(bytes(self.panel.gddram), bytes(1024))
+
+    def test_worker_frames_reach_the_panel(self):
+        worker = RenderWorker(self.display).start()
+        try:
+            for i in range(0, 20): self.display.fill_rect(i * 6, i * 3, 5, 4, 1).draw()
+            worker.flush()
+            self.assertTrue(self.panel.matches(self.display))
+        finally:
+            worker.stop()
+
+    def test_full_redraws_cost_no_more_than_one_write(self):
+        self.display.fill_rect(0, 0, 128, 64, 1).draw()
+        for i in range(0, 3):
+            self.display.clear().fill_rect(0, 0, 128, 64, i % 2).draw()
+            self.assertEqual(self.display.bytes_sent, 1025)
+            self.assertEqual(self.display.bytes_saved, 0)
+            self.assertTrue(self.panel.matches(self.display))
+
+    def test_changes_across_the_frame_go_as_one_write(self):
+        self.display.draw()
+        for page in range(0, 8):
+            self.display.plot(page, page * 8 + 1)
+            self.display.plot(127 - page, page * 8 + 1)
+        self.display.draw()
+        self.assertEqual(self.display.bytes_sent, 1025)
+        self.assertEqual(self.display.bytes_saved, 0)
+        self.assertTrue(self.panel.matches(self.display))
+        # The next small change is still addressed correctly
+        self.display.plot(64, 33).draw()
+        self.assertTrue(self.panel.matches(self.display))
+
+    def watch_start_line(self):
+        # Record the panel's start line as each data write reaches it
+        seen = []
+        write = self.panel.write
+
+        def watched(data):
+            if data[0] == 0x40: seen.append(self.panel.start_line)
+            write(data)
+
+        self.panel.write = watched
+        return seen
+
+    def check_terminal(self):
+        seen = self.watch_start_line()
+        for i in range(0, 8): self.display.print_line("Line {}".format(i))
+        for i in range(8, 20):
+            del seen[:]
+            self.display.print_line("Line {}".format(i))
+            if self.display.worker is not None: self.display.worker.flush()
+            # The new line's data only reaches the panel once its page is at the bottom
+            self.assertEqual(seen, [self.display.start_line])
+            self.assertEqual(self.panel.start_line, self.display.start_line)
+            self.assertTrue(self.panel.matches(self.display))
+
+    def test_print_line_scrolls_with_its_data(self):
+        self.check_terminal()
+
+    def test_print_line_scrolls_with_its_data_from_a_worker(self):
+        worker = RenderWorker(self.display).start()
+        try:
+            self.check_terminal()
+        finally:
+            worker.stop()
+
+    def test_commands_wait_for_the_worker(self):
+        worker = RenderWorker(self.display).start()
+        try:
+            with worker.lock:
+                # The worker cannot send while the bus is held, so the frame waits,
+                # and the command must wait with it
+                self.display.fill_rect(0, 0, 10, 10, 1).draw()
+                self.display.set_inverse(True)
+                self.assertFalse(self.panel.inverted)
+            worker.flush()
+            self.assertTrue(self.panel.inverted)
+            self.assertTrue(self.panel.matches(self.display))
+            self.assertEqual(worker.error, None)
+        finally:
+            worker.stop()
+
+    def expected_pixels(self):
+        # What the panel should show: the buffer's rows, from the display's start line
+        rows = []
+        for y in range(0, 64):
+            line = (y + self.display.start_line) % 64
+            start = (line >> 3) * 128
+            rows.append([(self.display.buffer[start + x] >> (line & 7)) & 1 for x in range(0, 128)])
+        return rows
+
+    def test_stopping_a_vertical_scroll_keeps_the_terminal(self):
+        for i in range(0, 11): self.display.print_line("Line {}".format(i))
+        line = self.display.start_line
+        self.assertNotEqual(line, 0)
+        self.display.start_scroll("left", vertical=1)
+        self.panel.step_scroll(5)
+        self.display.stop_scroll()
+        self.display.draw()
+        self.assertEqual(self.display.start_line, line)
+        self.assertEqual((self.panel.start_line, self.panel.scroll_offset), (line, 0))
+        self.assertTrue(self.panel.matches(self.display))
+        self.assertEqual([list(row) for row in self.panel.pixels()], self.expected_pixels())
+        # The terminal carries on in order
+        self.display.print_line("Line 11")
+        self.assertEqual([list(row) for row in self.panel.pixels()], self.expected_pixels())
+
+    def test_pixels_follow_the_buffer(self):
+        self.display.plot(0, 0)
+        self.display.plot(127, 63)
+        self.display.draw()
+        rows = self.panel.pixels()
+        self.assertEqual(sum(sum(row) for row in rows), 2)
+        self.assertEqual((rows[0][0], rows[63][127], rows[0][1]), (1, 1, 0))
+
+
+class AsyncWorkerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = SimulatedI2C(record=False)
+        self.panel = SSD1306Emulator(128, 64)
+        self.bus.attach(0x3D, self.panel)
+        self.display = SSD1306OLED(SimulatedPin(), self.bus, 0x3D, 128, 64)
+
+    def test_commands_go_through_the_worker(self):
+        async def session():
+            worker = AsyncRenderWorker(self.display).start()
+            try:
+                self.display.fill_rect(0, 0, 10, 10, 1).draw()
+                self.display.set_inverse(True)
+                # Nothing is sent until the loop runs the worker
+                self.assertFalse(self.panel.inverted)
+                for i in range(0, 12): self.display.print_line("Line {}".format(i))
+                await worker.flush()
+            finally:
+                await worker.stop()
+            self.assertEqual(worker.error, None)
+
+        asyncio.run(session())
+        self.assertTrue(self.panel.inverted)
+        self.assertEqual(self.panel.start_line, self.display.start_line)
+        self.assertTrue(self.panel.matches(self.display))
+
+
+class DisplayClientTests(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = SimulatedI2C(record=False)
+        self.panel = SSD1306Emulator(128, 64)
+        self.bus.attach(0x3D, self.panel)
+        name = "ssd1306-test-{}".format(os.getpid())
+        self.server = DisplayServer(SSD1306OLED(SimulatedPin(), self.bus, 0x3D, 128, 64), [(0, 0, 128, 32)], name)
+        self.client = DisplayClient(0, name)
+
+    def tearDown(self):
+        self.client.close()
+        if sys.version_info < (3, 13):
+            # The client unregistered the block from this process's resource tracker,
+            # which the server's unlink() expects to find it in
+            resource_tracker.register(self.server.memory._name, "shared_memory")
+        self.server.close()
+
+    def test_commands_are_refused_and_drawing_continues(self):
+        display = self.client.display
+        display.fill_rect(0, 0, 8, 8, 1)
+        with self.assertRaises(RuntimeError): display.set_inverse(True)
+        display.draw()
+        self.server.tick()
+        self.assertFalse(self.panel.inverted)
+        self.assertEqual(bytes(self.panel.gddram[0:9]), b"\xFF" * 8 + b"\x00")
+
+
+class RunExampleTests(unittest.TestCase):
+
+    def test_boxes_example(self):
+        (panel, bus, mismatches) = run_example(os.path.join(EXAMPLES, "boxes_128x64.py"), frames=15)
+        self.assertEqual(mismatches, 0)
+        self.assertGreater(bus.transactions, 1)
+
+    def test_worker_example_sends_every_frame(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "worker_script.py")
+            with open(path, "w") as file: file.write(WORKER_SCRIPT)
+            (panel, bus, mismatches) = run_example(path, frames=30)
+        self.assertEqual(mismatches, 0)
+        # Every frame was sent, rather than being overtaken by the next
+        self.assertGreaterEqual(bus.transactions, 28)
+        # The display's reset takes two of the 30 sleeps, so 28 columns were drawn,
+        # and the last of them reached the panel
+        self.assertEqual(bytes(panel.gddram[0:28]), b"\xFF" * 28)
+        self.assertEqual(bytes(panel.gddram[28:]), bytes(1024 - 28))
+
+
+if __name__ == "__main__":
+    unittest.main()